@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento de GestorFinanzas.
+
+Los datos se generan con generador.py en un directorio aparte, nunca en data/.
+Para ejecutarlos: python -m benchmarks.ejecutar --help
+"""
@@ -0,0 +1,478 @@
+"""
+Prueba de carga de sesiones concurrentes contra usuarios.db.
+
+Lanza N trabajadores (hilos o procesos) que repiten durante un tiempo una
+mezcla de operaciones de sesión sobre una copia temporal de los datos:
+    login     autenticar_usuario de un usuario al azar
+    registro  registrar_usuario con un email nuevo
+    consulta  cargar el resumen anual y una página de gastos del usuario
+    gasto     agregar_gasto en la BD del usuario
+    admin     obtener_todos_usuarios y obtener_estadisticas_admin
+
+Informa de operaciones por segundo, latencias (p50, p95, p99 y máxima) y
+errores de cada operación, separando los "database is locked".
+
+Uso:
+    python -m benchmarks.carga --trabajadores 8 --duracion 10
+    python -m benchmarks.carga --modo procesos --trabajadores 4 --mezcla login=90,admin=10
+    python -m benchmarks.carga --origen data
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+# Agregar el directorio raíz al path para poder importar desde src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.almacenamiento import Almacenamiento
+
+try:
+    from .generador import PASSWORD, GeneradorDatos
+    from .ejecutar import RESULTADOS_DIR, _commit_actual
+except ImportError:
+    from generador import PASSWORD, GeneradorDatos
+    from ejecutar import RESULTADOS_DIR, _commit_actual
+
+
+# Mezclas predefinidas: operación -> peso
+MEZCLAS = {
+    'realista': {'login': 50, 'consulta': 30, 'gasto': 10, 'registro': 5, 'admin': 5},
+    'login': {'login': 100},
+    'escritura': {'login': 40, 'registro': 30, 'gasto': 30},
+}
+
+# Mensaje de SQLite cuando se agota la espera por el bloqueo de escritura
+MENSAJE_BLOQUEO = "database is locked"
+
+# Sesiones (BDs de usuario abiertas) que mantiene cada trabajador
+SESIONES_POR_TRABAJADOR = 8
+
+
+def leer_mezcla(texto: str) -> Dict[str, int]:
+    """
+    Interpreta --mezcla: el nombre de una mezcla predefinida u 'op=peso,...'.
+
+    Raises:
+        ValueError: Si la operación no existe o ningún peso es positivo
+    """
+    if texto in MEZCLAS:
+        return dict(MEZCLAS[texto])
+
+    mezcla = {}
+    for parte in texto.split(','):
+        operacion, _, peso = parte.partition('=')
+        operacion = operacion.strip()
+        if operacion not in OPERACIONES:
+            raise ValueError(f"Operación desconocida: {operacion}")
+        mezcla[operacion] = int(peso or 1)
+
+    if not any(peso > 0 for peso in mezcla.values()):
+        raise ValueError("La mezcla no tiene ninguna operación con peso positivo")
+    return mezcla
+
+
+class SalidaErrores(io.TextIOBase):
+    """
+    Sustituye a sys.stdout para atribuir a cada operación lo que imprime.
+
+    Database informa de sus errores con print() y devuelve False/None; aquí
+    se anotan (sin mostrarlos) los mensajes escritos por el hilo mientras
+    ejecuta una operación.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self._local = threading.local()
+
+    def empezar(self):
+        """Empieza a recoger los mensajes del hilo actual."""
+        self._local.mensajes = []
+
+    def terminar(self) -> List[str]:
+        """Deja de recoger y devuelve los mensajes del hilo actual."""
+        mensajes, self._local.mensajes = getattr(self._local, 'mensajes', None) or [], None
+        return mensajes
+
+    def write(self, texto: str) -> int:
+        mensajes = getattr(self._local, 'mensajes', None)
+        if mensajes is None:
+            return self.original.write(texto)
+        if texto.strip():
+            mensajes.append(texto)
+        return len(texto)
+
+    def flush(self):
+        self.original.flush()
+
+
+def _instalar_salida() -> SalidaErrores:
+    """Instala (una vez por proceso) la SalidaErrores en sys.stdout."""
+    if not isinstance(sys.stdout, SalidaErrores):
+        sys.stdout = SalidaErrores(sys.stdout)
+    return sys.stdout
+
+
+def preparar_datos(directorio: str, usuarios: int = 50, gastos: int = 1000,
+                   origen: str = None, semilla: int = 0) -> List[Tuple[int, str]]:
+    """
+    Crea los datos sobre los que se lanza la carga.
+
+    Con `origen` se copia ese directorio de datos (por ejemplo data/) y se
+    pone la contraseña PASSWORD a todos sus usuarios, solo en la copia. Si
+    no, se generan `usuarios` usuarios sintéticos con `gastos` gastos cada uno.
+
+    Args:
+        directorio: Directorio (vacío o inexistente) donde dejar los datos
+        usuarios: Usuarios sintéticos a generar
+        gastos: Gastos por usuario sintético
+        origen: Directorio de datos a copiar en lugar de generar
+        semilla: Semilla de los datos generados
+
+    Returns:
+        Lista de (id, email) de los usuarios activos
+    """
+    if origen:
+        shutil.copytree(origen, directorio, dirs_exist_ok=True)
+        with Database(almacenamiento=Almacenamiento(directorio)) as db:
+            conn = db.get_usuarios_connection()
+            with conn:
+                conn.execute("UPDATE usuarios SET password_hash = ?", (db.hash_password(PASSWORD),))
+    else:
+        # Se genera en cada ejecución; las consultas usan el año actual
+        generador = GeneradorDatos(directorio, anio_final=datetime.now().year, semilla=semilla)
+        for usuario_id in generador.crear_usuarios(usuarios):
+            generador.poblar(usuario_id, gastos)
+
+    with Database(almacenamiento=Almacenamiento(directorio)) as db:
+        cursor = db.get_usuarios_connection().cursor()
+        cursor.execute("SELECT id, email FROM usuarios WHERE activo = 1 ORDER BY id")
+        return cursor.fetchall()
+
+
+class Sesiones:
+    """BDs de usuario abiertas por un trabajador, como las de sesiones vivas."""
+
+    def __init__(self, almacenamiento: Almacenamiento, maximo: int = SESIONES_POR_TRABAJADOR):
+        self.almacenamiento = almacenamiento
+        self.maximo = maximo
+        self._abiertas: 'OrderedDict[int, Database]' = OrderedDict()
+
+    def abrir(self, usuario_id: int) -> Database:
+        """Devuelve la Database del usuario, abriéndola si hace falta."""
+        db = self._abiertas.pop(usuario_id, None)
+        if db is None:
+            db = Database(usuario_id=usuario_id, almacenamiento=self.almacenamiento)
+            if len(self._abiertas) >= self.maximo:
+                _, antigua = self._abiertas.popitem(last=False)
+                antigua.close()
+        self._abiertas[usuario_id] = db
+        return db
+
+    def cerrar(self):
+        """Cierra todas las sesiones."""
+        for db in self._abiertas.values():
+            db.close()
+        self._abiertas.clear()
+
+
+def _login(ctx) -> Tuple[bool, str]:
+    _, email = ctx['azar'].choice(ctx['usuarios'])
+    return ctx['db'].autenticar_usuario(email, PASSWORD) is not None, ""
+
+
+def _registro(ctx) -> Tuple[bool, str]:
+    ctx['altas'] += 1
+    email = f"carga_{os.getpid()}_{ctx['indice']}_{ctx['altas']}@benchmark.local"
+    return ctx['db'].registrar_usuario(f"Carga {ctx['altas']}", email, PASSWORD)
+
+
+def _consulta(ctx) -> Tuple[bool, str]:
+    usuario_id, _ = ctx['azar'].choice(ctx['usuarios'])
+    db = ctx['sesiones'].abrir(usuario_id)
+    anio = ctx['anio']
+    db.obtener_resumen_anual(anio)
+    db.obtener_gastos_mes_pagina(ctx['azar'].randint(1, 12), anio)
+    return True, ""
+
+
+def _gasto(ctx) -> Tuple[bool, str]:
+    usuario_id, _ = ctx['azar'].choice(ctx['usuarios'])
+    db = ctx['sesiones'].abrir(usuario_id)
+    categoria_id = db.obtener_categorias()[0][0]
+    fecha = f"{ctx['anio']}-{ctx['azar'].randint(1, 12):02d}-15"
+    return db.agregar_gasto("Carga", 9.99, categoria_id, fecha), ""
+
+
+def _admin(ctx) -> Tuple[bool, str]:
+    ctx['db'].obtener_todos_usuarios()
+    ctx['db'].obtener_estadisticas_admin()
+    return True, ""
+
+
+# Operación -> función(ctx) que devuelve (éxito, mensaje)
+OPERACIONES = {
+    'login': _login,
+    'registro': _registro,
+    'consulta': _consulta,
+    'gasto': _gasto,
+    'admin': _admin,
+}
+
+
+def trabajador(directorio: str, usuarios: List[Tuple[int, str]], mezcla: Dict[str, int],
+               duracion: float, indice: int, semilla: int = 0,
+               almacenamiento: Almacenamiento = None) -> Dict:
+    """
+    Repite operaciones de la mezcla durante `duracion` segundos.
+
+    Args:
+        directorio: Directorio de datos preparado con preparar_datos()
+        usuarios: Lista de (id, email) entre los que elegir
+        mezcla: Operación -> peso
+        duracion: Segundos de carga
+        indice: Número del trabajador (para la semilla y los emails nuevos)
+        semilla: Semilla de la elección de operaciones y usuarios
+        almacenamiento: Almacenamiento compartido (hilos); si es None se abre
+            uno propio y se cierra al terminar (procesos)
+
+    Returns:
+        Diccionario {'latencias': {op: [ms]}, 'errores': {op: n}, 'bloqueos': {op: n}}
+    """
+    salida = _instalar_salida()
+    propio = almacenamiento is None
+    if propio:
+        almacenamiento = Almacenamiento(directorio)
+
+    azar = random.Random(semilla * 1_000_003 + indice)
+    ctx = {
+        'azar': azar,
+        'usuarios': usuarios,
+        'indice': indice,
+        'altas': 0,
+        'anio': datetime.now().year,
+        'db': Database(almacenamiento=almacenamiento),
+        'sesiones': Sesiones(almacenamiento),
+    }
+    operaciones = list(mezcla)
+    pesos = [mezcla[operacion] for operacion in operaciones]
+    resultado = {
+        'latencias': {operacion: [] for operacion in operaciones},
+        'errores': {operacion: 0 for operacion in operaciones},
+        'bloqueos': {operacion: 0 for operacion in operaciones},
+    }
+
+    fin = time.perf_counter() + duracion
+    try:
+        while time.perf_counter() < fin:
+            operacion = azar.choices(operaciones, pesos)[0]
+            salida.empezar()
+            inicio = time.perf_counter()
+            try:
+                exito, mensaje = OPERACIONES[operacion](ctx)
+            except sqlite3.Error as e:
+                exito, mensaje = False, str(e)
+            resultado['latencias'][operacion].append((time.perf_counter() - inicio) * 1000)
+
+            mensajes = salida.terminar()
+            if not exito or mensajes:
+                resultado['errores'][operacion] += 1
+                if any(MENSAJE_BLOQUEO in texto for texto in mensajes + [mensaje or ""]):
+                    resultado['bloqueos'][operacion] += 1
+    finally:
+        ctx['sesiones'].cerrar()
+        ctx['db'].close()
+        if propio:
+            almacenamiento.cerrar()
+
+    return resultado
+
+
+def resumir(parciales: List[Dict], duracion: float) -> Dict:
+    """
+    Junta los resultados de los trabajadores.
+
+    Returns:
+        Diccionario con 'total' y 'operaciones' {op: métricas}
+    """
+    operaciones = {}
+    todas = []
+    errores = bloqueos = 0
+    for operacion in sorted({op for parcial in parciales for op in parcial['latencias']}):
+        latencias = sorted(ms for parcial in parciales for ms in parcial['latencias'].get(operacion, ()))
+        errores_op = sum(parcial['errores'].get(operacion, 0) for parcial in parciales)
+        bloqueos_op = sum(parcial['bloqueos'].get(operacion, 0) for parcial in parciales)
+        operaciones[operacion] = _metricas(latencias, errores_op, bloqueos_op, duracion)
+        todas.extend(latencias)
+        errores += errores_op
+        bloqueos += bloqueos_op
+
+    return {'total': _metricas(sorted(todas), errores, bloqueos, duracion), 'operaciones': operaciones}
+
+
+def _metricas(latencias: List[float], errores: int, bloqueos: int, duracion: float) -> Dict:
+    """Métricas de una lista ordenada de latencias."""
+    veces = len(latencias)
+    if veces >= 2:
+        cuantiles = statistics.quantiles(latencias, n=100, method='inclusive')
+        p50, p95, p99 = cuantiles[49], cuantiles[94], cuantiles[98]
+    else:
+        p50 = p95 = p99 = latencias[0] if latencias else 0.0
+
+    return {
+        'veces': veces,
+        'ops_s': round(veces / duracion, 1) if duracion else 0.0,
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'max_ms': round(latencias[-1], 3) if latencias else 0.0,
+        'errores': errores,
+        'bloqueos': bloqueos,
+        'tasa_bloqueos': round(bloqueos / veces, 5) if veces else 0.0,
+    }
+
+
+def ejecutar_carga(directorio: str, usuarios: List[Tuple[int, str]], mezcla: Dict[str, int],
+                   trabajadores: int = 4, duracion: float = 10, modo: str = 'hilos',
+                   semilla: int = 0) -> Dict:
+    """
+    Lanza los trabajadores y resume sus resultados.
+
+    Args:
+        directorio: Directorio de datos preparado con preparar_datos()
+        usuarios: Lista de (id, email) de preparar_datos()
+        mezcla: Operación -> peso
+        trabajadores: Número de hilos o procesos
+        duracion: Segundos de carga
+        modo: 'hilos' (un almacenamiento compartido) o 'procesos'
+        semilla: Semilla de la elección de operaciones y usuarios
+
+    Returns:
+        Resumen de resumir()
+
+    Raises:
+        ValueError: Si el modo no existe
+    """
+    if modo not in ('hilos', 'procesos'):
+        raise ValueError(f"Modo desconocido: {modo}")
+
+    almacenamiento = Almacenamiento(directorio) if modo == 'hilos' else None
+    pool = ThreadPoolExecutor if modo == 'hilos' else ProcessPoolExecutor
+
+    # Los procesos instalan su propia SalidaErrores; los hilos comparten esta
+    salida_original = sys.stdout
+    if modo == 'hilos':
+        _instalar_salida()
+
+    inicio = time.perf_counter()
+    try:
+        with pool(max_workers=trabajadores) as ejecutor:
+            futuros = [
+                ejecutor.submit(trabajador, directorio, usuarios, mezcla, duracion, indice,
+                                semilla, almacenamiento)
+                for indice in range(trabajadores)
+            ]
+            parciales = [futuro.result() for futuro in futuros]
+    finally:
+        sys.stdout = salida_original
+        if almacenamiento is not None:
+            almacenamiento.cerrar()
+    transcurrido = time.perf_counter() - inicio
+
+    return resumir(parciales, transcurrido)
+
+
+def imprimir(resumen: Dict):
+    """Muestra el resumen como tabla."""
+    print(f"{'operación':<10} {'veces':>8} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'máx ms':>9} {'errores':>8} {'locked':>7}")
+    filas = list(resumen['operaciones'].items()) + [('TOTAL', resumen['total'])]
+    for operacion, datos in filas:
+        print(f"{operacion:<10} {datos['veces']:>8} {datos['ops_s']:>9} {datos['p50_ms']:>9} "
+              f"{datos['p95_ms']:>9} {datos['p99_ms']:>9} {datos['max_ms']:>9} "
+              f"{datos['errores']:>8} {datos['bloqueos']:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de sesiones de GestorFinanzas")
+    parser.add_argument('--trabajadores', type=int, default=4, help="Hilos o procesos concurrentes")
+    parser.add_argument('--modo', choices=('hilos', 'procesos'), default='hilos')
+    parser.add_argument('--duracion', type=float, default=10, help="Segundos de carga")
+    parser.add_argument('--mezcla', default='realista',
+                        help=f"{', '.join(MEZCLAS)} u 'op=peso,...' (ops: {', '.join(OPERACIONES)})")
+    parser.add_argument('--usuarios', type=int, default=50, help="Usuarios sintéticos")
+    parser.add_argument('--gastos', type=int, default=1000, help="Gastos por usuario sintético")
+    parser.add_argument('--origen', help="Directorio de datos a copiar (p. ej. data) en lugar de generar")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    try:
+        mezcla = leer_mezcla(args.mezcla)
+    except ValueError as e:
+        parser.error(str(e))
+
+    temporal = tempfile.mkdtemp(prefix="carga_")
+    try:
+        print("Preparando datos...")
+        usuarios = preparar_datos(temporal, args.usuarios, args.gastos, args.origen, args.semilla)
+        print(f"{len(usuarios)} usuarios; {args.trabajadores} {args.modo} durante {args.duracion} s")
+        resumen = ejecutar_carga(temporal, usuarios, mezcla, args.trabajadores,
+                                 args.duracion, args.modo, args.semilla)
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    imprimir(resumen)
+
+    commit = _commit_actual()
+    resultado = {
+        'version': 1,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'entorno': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'parametros': {
+            'trabajadores': args.trabajadores,
+            'modo': args.modo,
+            'duracion': args.duracion,
+            'mezcla': mezcla,
+            'usuarios': len(usuarios),
+            'gastos': None if args.origen else args.gastos,
+            'origen': args.origen,
+        },
+        'resumen': resumen,
+    }
+
+    salida = args.salida
+    if salida is None:
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+        salida = os.path.join(RESULTADOS_DIR, f"carga_{marca}_{commit or 'sin_commit'}.json")
+
+    with open(salida, 'w', encoding='utf-8') as fichero:
+        json.dump(resultado, fichero, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+    return resultado
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Compara dos ficheros de resultados de benchmarks/ejecutar.py.
+
+Uso:
+    python -m benchmarks.comparar antes.json despues.json [--umbral 1.2]
+
+Muestra la mediana de cada medición en ambos ficheros y su cociente. Sale con
+código 1 si alguna medición empeora más que el umbral, para poder usarlo en
+integración continua.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+
+def _mediana(medicion: Dict):
+    """Devuelve la mediana (o el tiempo total) de una medición, si la tiene."""
+    return medicion.get('mediana_ms', medicion.get('total_ms'))
+
+
+def comparar(antes: Dict, despues: Dict, umbral: float = 1.2) -> List[Tuple]:
+    """
+    Compara las mediciones comunes de dos ejecuciones.
+
+    Args:
+        antes: Resultados de referencia
+        despues: Resultados nuevos
+        umbral: Cociente despues/antes a partir del cual se marca una regresión
+
+    Returns:
+        Lista de tuplas (escala, medicion, antes_ms, despues_ms, cociente, regresion)
+    """
+    filas = []
+    for escala, datos in despues['escalas'].items():
+        referencia = antes['escalas'].get(escala)
+        if referencia is None:
+            continue
+        for nombre, medicion in sorted(datos['tiempos'].items()):
+            previa = referencia['tiempos'].get(nombre)
+            if previa is None:
+                continue
+            ms_antes, ms_despues = _mediana(previa), _mediana(medicion)
+            if not ms_antes or ms_despues is None:
+                continue
+            cociente = ms_despues / ms_antes
+            filas.append((escala, nombre, ms_antes, ms_despues, cociente, cociente > umbral))
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks")
+    parser.add_argument('antes', help="Resultados de referencia")
+    parser.add_argument('despues', help="Resultados nuevos")
+    parser.add_argument('--umbral', type=float, default=1.2,
+                        help="Cociente a partir del cual se considera regresión")
+    args = parser.parse_args(argv)
+
+    with open(args.antes, encoding='utf-8') as fichero:
+        antes = json.load(fichero)
+    with open(args.despues, encoding='utf-8') as fichero:
+        despues = json.load(fichero)
+
+    print(f"{antes.get('commit')} -> {despues.get('commit')}")
+    filas = comparar(antes, despues, args.umbral)
+    for escala, nombre, ms_antes, ms_despues, cociente, regresion in filas:
+        marca = "  <-- REGRESIÓN" if regresion else ""
+        print(f"{escala:>5} {nombre:<55} {ms_antes:>10.3f} {ms_despues:>10.3f} "
+              f"x{cociente:5.2f}{marca}")
+
+    return 1 if any(fila[5] for fila in filas) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Ejecuta los benchmarks de GestorFinanzas y guarda los tiempos en JSON.
+
+Para cada escala se genera (o reutiliza) un conjunto de datos sintéticos y se
+mide:
+    - cada método público Database.obtener_*, con la caché vacía y, si el
+      método está cacheado, también servido desde la caché;
+    - las operaciones masivas: inserción por lotes, recorrido del año,
+      exportación e importación CSV y alta de usuarios en lote;
+    - las consultas que lanza cada vista al mostrarse.
+
+Uso:
+    python -m benchmarks.ejecutar --escala 10k --escala 100k --usuarios 5
+    python -m benchmarks.comparar antes.json despues.json
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+# Agregar el directorio raíz al path para poder importar desde src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.almacenamiento import Almacenamiento
+from src.exportacion import exportar_anio
+from src.importacion import ConfiguracionCSV, importar_csv
+
+try:
+    from .generador import ANIO_FINAL, ESCALAS, GeneradorDatos
+except ImportError:
+    from generador import ANIO_FINAL, ESCALAS, GeneradorDatos
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Datos generados (se reutilizan entre ejecuciones) y resultados
+DATOS_DIR = os.path.join(BENCHMARKS_DIR, "datos")
+RESULTADOS_DIR = os.path.join(BENCHMARKS_DIR, "resultados")
+
+# Mes usado en los métodos que piden uno
+MES = 6
+
+# Usuarios que se dan de alta en masivas.registrar_usuarios_lote
+USUARIOS_LOTE = 1000
+
+# Consultas que lanza cada vista al mostrarse por primera vez
+CARGAS_VISTAS: Dict[str, Callable[[Database, int, int], object]] = {
+    'VistaGastosMensual': lambda db, mes, anio: (
+        db.obtener_gastos_mes_pagina(mes, anio),
+        db.obtener_ingresos_mes(mes, anio),
+        db.obtener_balance_mes(mes, anio),
+    ),
+    'VistaComparacionAnual': lambda db, mes, anio: db.obtener_resumen_anual(anio),
+    'VistaEstadisticas': lambda db, mes, anio: db.obtener_resumen_anual(anio)['categorias'],
+    'VistaGestionCategorias': lambda db, mes, anio: db.obtener_uso_categorias(),
+    'VistaAdministracion': lambda db, mes, anio: (
+        db.obtener_estadisticas_admin(),
+        db.obtener_todos_usuarios(),
+    ),
+}
+
+
+def medir(funcion: Callable, repeticiones: int, preparar: Callable = None) -> Dict:
+    """
+    Mide varias ejecuciones de una función.
+
+    Args:
+        funcion: Función sin argumentos a medir
+        repeticiones: Número de ejecuciones
+        preparar: Función que se llama antes de cada ejecución, fuera del tiempo
+
+    Returns:
+        Diccionario con mediana_ms, minimo_ms, maximo_ms y repeticiones
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'mediana_ms': round(statistics.median(tiempos), 4),
+        'minimo_ms': round(min(tiempos), 4),
+        'maximo_ms': round(max(tiempos), 4),
+        'repeticiones': repeticiones,
+    }
+
+
+def _argumentos(funcion, valores: Dict):
+    """
+    Obtiene los argumentos con los que llamar a un método obtener_*.
+
+    Returns:
+        Diccionario de argumentos, o None si falta alguno obligatorio
+    """
+    argumentos = {}
+    for nombre, parametro in list(inspect.signature(funcion).parameters.items())[1:]:
+        if nombre in valores:
+            argumentos[nombre] = valores[nombre]
+        elif parametro.default is inspect.Parameter.empty:
+            return None
+    return argumentos
+
+
+def medir_metodos(db: Database, valores: Dict, repeticiones: int) -> Dict:
+    """Mide cada método público obtener_* de Database."""
+    resultados = {}
+    for nombre, funcion in inspect.getmembers(Database, inspect.isfunction):
+        if not nombre.startswith('obtener_'):
+            continue
+
+        argumentos = _argumentos(funcion, valores)
+        if argumentos is None:
+            resultados[f"metodos.{nombre}"] = {'omitido': 'argumentos desconocidos'}
+            continue
+
+        metodo = getattr(db, nombre)
+        llamada = lambda: metodo(**argumentos)
+        resultados[f"metodos.{nombre}"] = medir(llamada, repeticiones, preparar=db.cache.vaciar)
+
+        # Los métodos cacheados también se miden servidos desde la caché
+        if hasattr(funcion, '__wrapped__'):
+            llamada()
+            resultados[f"metodos.{nombre}.cache"] = medir(llamada, repeticiones)
+
+    return resultados
+
+
+def medir_vistas(db: Database, anio: int, repeticiones: int) -> Dict:
+    """Mide las consultas de carga de cada vista, con la caché vacía."""
+    return {
+        f"vistas.{vista}": medir(lambda: cargar(db, MES, anio), repeticiones,
+                                 preparar=db.cache.vaciar)
+        for vista, cargar in CARGAS_VISTAS.items()
+    }
+
+
+def medir_masivas(generador: GeneradorDatos, db: Database, usuario_id: int,
+                  repeticiones: int) -> Dict:
+    """Mide el recorrido del año, la exportación e importación CSV y las altas en lote."""
+    anio = generador.anio_final
+    resultados = {}
+
+    filas = sum(1 for _ in db.iterar_gastos_anio(anio))
+    resultados['masivas.iterar_gastos_anio'] = medir(
+        lambda: sum(1 for _ in db.iterar_gastos_anio(anio)), repeticiones
+    )
+    resultados['masivas.iterar_gastos_anio']['filas'] = filas
+
+    temporal = tempfile.mkdtemp(prefix="benchmark_")
+    try:
+        ruta = os.path.join(temporal, "gastos.csv")
+        resultados['masivas.exportar_csv'] = medir(
+            lambda: exportar_anio(db, anio, ruta, 'csv'), repeticiones
+        )
+        resultados['masivas.exportar_csv']['filas'] = filas
+
+        # Se importa en un usuario aparte que se borra al terminar
+        config = ConfiguracionCSV(
+            columnas={'fecha': 'fecha', 'descripcion': 'descripcion', 'cantidad': 'cantidad',
+                      'categoria': 'categoria', 'metodo_pago': 'metodo_pago'},
+            tipo='gastos'
+        )
+        destino_id = usuario_id + 1_000_000
+
+        def borrar_destino():
+            generador.almacenamiento.eliminar_usuario(destino_id)
+
+        def importar():
+            with generador.abrir(destino_id, perfil='carga_masiva') as destino:
+                importar_csv(destino, ruta, config)
+
+        resultados['masivas.importar_csv'] = medir(importar, repeticiones, preparar=borrar_destino)
+        resultados['masivas.importar_csv']['filas'] = filas
+        borrar_destino()
+
+        # Cada repetición da de alta USUARIOS_LOTE usuarios en un directorio vacío
+        def registrar():
+            almacenamiento = Almacenamiento(tempfile.mkdtemp(dir=temporal))
+            try:
+                with Database(almacenamiento=almacenamiento) as altas:
+                    altas.registrar_usuarios_lote(
+                        (f"Usuario {i}", f"usuario{i}@benchmark.local", "benchmark")
+                        for i in range(USUARIOS_LOTE)
+                    )
+            finally:
+                almacenamiento.cerrar()
+
+        resultados['masivas.registrar_usuarios_lote'] = medir(registrar, repeticiones)
+        resultados['masivas.registrar_usuarios_lote']['filas'] = USUARIOS_LOTE
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    return resultados
+
+
+def ejecutar_escala(escala: str, usuarios: int, repeticiones: int, directorio: str,
+                    anios: int, semilla: int, anio_final: int = ANIO_FINAL) -> Dict:
+    """
+    Genera (o reutiliza) los datos de una escala y ejecuta todas las mediciones.
+
+    Returns:
+        Diccionario con 'datos' (filas generadas) y 'tiempos'
+    """
+    generador = GeneradorDatos(
+        # Cada combinación de parámetros tiene su propio directorio de datos
+        os.path.join(directorio, f"{escala}_{anio_final}_{anios}a_s{semilla}"),
+        anio_final=anio_final, anios=anios, semilla=semilla
+    )
+    ids = generador.crear_usuarios(usuarios)
+
+    datos = {'usuarios': len(ids), 'anio_final': generador.anio_final, 'anios': anios}
+    tiempos = {}
+    for usuario_id in ids:
+        inicio = time.perf_counter()
+        poblado = generador.poblar(usuario_id, ESCALAS[escala])
+        segundos = time.perf_counter() - inicio
+        if usuario_id == ids[0]:
+            datos.update(poblado)
+            if not poblado['reutilizada']:
+                filas = poblado['gastos'] + poblado['ingresos']
+                tiempos['masivas.agregar_lote'] = {
+                    'total_ms': round(segundos * 1000, 1),
+                    'filas': filas,
+                    'filas_s': round(filas / segundos),
+                }
+        print(f"  [{escala}] usuario {usuario_id}: {poblado}")
+
+    usuario_id = ids[0]
+    with generador.abrir(usuario_id) as db:
+        datos['tamano_bytes'] = os.path.getsize(db.db_name)
+
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT id FROM gastos LIMIT 1")
+        gasto_id = cursor.fetchone()[0]
+        cursor.execute("SELECT id FROM ingresos LIMIT 1")
+        fila = cursor.fetchone()
+
+        valores = {
+            'mes': MES,
+            'anio': generador.anio_final,
+            'usuario_id': usuario_id,
+            'categoria_nombre': db.obtener_categorias()[0][1],
+            'gasto_id': gasto_id,
+            'ingreso_id': fila[0] if fila else None,
+        }
+
+        print(f"  [{escala}] métodos obtener_*")
+        tiempos.update(medir_metodos(db, valores, repeticiones))
+        print(f"  [{escala}] vistas")
+        tiempos.update(medir_vistas(db, generador.anio_final, repeticiones))
+        print(f"  [{escala}] operaciones masivas")
+        tiempos.update(medir_masivas(generador, db, usuario_id, max(1, repeticiones // 5)))
+
+    return {'datos': datos, 'tiempos': tiempos}
+
+
+def _commit_actual():
+    """Devuelve el hash del commit actual, o None si no hay git."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de GestorFinanzas")
+    parser.add_argument('--escala', action='append', choices=sorted(ESCALAS),
+                        help="Gastos por usuario (se puede repetir; por defecto 10k)")
+    parser.add_argument('--usuarios', type=int, default=1, help="Usuarios a generar")
+    parser.add_argument('--anios', type=int, default=3, help="Años de datos por usuario")
+    parser.add_argument('--anio-final', type=int, default=ANIO_FINAL,
+                        help=f"Último año con datos (por defecto {ANIO_FINAL})")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla de los datos")
+    parser.add_argument('--repeticiones', type=int, default=20,
+                        help="Ejecuciones de cada medición")
+    parser.add_argument('--datos', default=DATOS_DIR,
+                        help="Directorio de los datos generados (se reutilizan)")
+    parser.add_argument('--salida', help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    commit = _commit_actual()
+    resultado = {
+        'version': 1,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'entorno': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+        },
+        'parametros': {
+            'usuarios': args.usuarios,
+            'anios': args.anios,
+            'anio_final': args.anio_final,
+            'semilla': args.semilla,
+            'repeticiones': args.repeticiones,
+        },
+        'escalas': {},
+    }
+
+    for escala in args.escala or ['10k']:
+        print(f"Escala {escala}")
+        resultado['escalas'][escala] = ejecutar_escala(
+            escala, args.usuarios, args.repeticiones, args.datos, args.anios, args.semilla,
+            args.anio_final
+        )
+
+    salida = args.salida
+    if salida is None:
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+        salida = os.path.join(RESULTADOS_DIR, f"{marca}_{commit or 'sin_commit'}.json")
+
+    with open(salida, 'w', encoding='utf-8') as fichero:
+        json.dump(resultado, fichero, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+    return resultado
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Generador de datos sintéticos para los benchmarks.
+
+Crea usuarios con varios años de gastos e ingresos repartidos de forma
+realista (más gastos pequeños de alimentación y transporte que de hogar,
+una nómina al mes...). Todo sale de un random.Random con semilla, así que la
+misma escala y semilla producen siempre los mismos datos y los resultados de
+dos commits se pueden comparar.
+
+Las bases de datos se crean en un directorio propio, no en data/.
+"""
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+# Agregar el directorio raíz al path para poder importar desde src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.almacenamiento import Almacenamiento
+
+
+# Último año con datos por defecto. Es fijo, no el año actual, para que los
+# mismos parámetros generen siempre los mismos datos y los resultados de
+# distintas fechas se puedan comparar
+ANIO_FINAL = 2026
+
+# Gastos por usuario de cada escala
+ESCALAS = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+# Ingresos generados por cada gasto
+PROPORCION_INGRESOS = 0.1
+
+# Contraseña de todos los usuarios generados
+PASSWORD = "benchmark"
+
+# Categoría por defecto -> (peso, importe medio, descripciones)
+PERFIL_CATEGORIAS = {
+    "Alimentación": (30, 25.0, ["Supermercado", "Panadería", "Frutería", "Restaurante"]),
+    "Transporte": (20, 18.0, ["Gasolina", "Metro", "Taxi", "Parking"]),
+    "Servicios": (8, 60.0, ["Luz", "Agua", "Internet", "Teléfono"]),
+    "Entretenimiento": (12, 30.0, ["Cine", "Concierto", "Suscripción", "Libro"]),
+    "Salud": (5, 45.0, ["Farmacia", "Dentista", "Óptica"]),
+    "Educación": (3, 80.0, ["Curso", "Material", "Matrícula"]),
+    "Hogar": (7, 120.0, ["Alquiler", "Muebles", "Reparación", "Limpieza"]),
+    "Otros": (15, 20.0, ["Regalo", "Varios", "Donación"]),
+}
+
+# Fuente -> (peso, importe medio)
+PERFIL_FUENTES = {
+    "Salario": (50, 2200.0),
+    "Freelance": (20, 400.0),
+    "Inversiones": (10, 150.0),
+    "Venta": (10, 80.0),
+    "Regalo": (5, 100.0),
+    "Otros": (5, 50.0),
+}
+
+
+def _fechas(anio_final: int, anios: int) -> List[str]:
+    """Devuelve todas las fechas YYYY-MM-DD de los años indicados."""
+    dia = date(anio_final - anios + 1, 1, 1)
+    fin = date(anio_final, 12, 31)
+    fechas = []
+    while dia <= fin:
+        fechas.append(dia.isoformat())
+        dia += timedelta(days=1)
+    return fechas
+
+
+def _importe(rng: random.Random, media: float) -> float:
+    """Importe positivo con la cola larga típica de los gastos."""
+    return round(max(0.5, rng.lognormvariate(0, 0.75) * media * 0.75), 2)
+
+
+def generar_gastos(n: int, categorias: List[Tuple], anio_final: int, anios: int = 3,
+                   semilla: int = 0) -> Iterator[Tuple]:
+    """
+    Genera gastos listos para Database.agregar_gastos_lote.
+
+    Args:
+        n: Número de gastos
+        categorias: Categorías de la BD, tuplas (id, nombre, descripcion)
+        anio_final: Último año con datos
+        anios: Años de datos hasta anio_final incluido
+        semilla: Semilla del generador
+
+    Yields:
+        Tuplas (descripcion, cantidad, categoria_id, fecha, metodo_pago)
+    """
+    rng = random.Random(semilla)
+    fechas = _fechas(anio_final, anios)
+
+    perfiles = []
+    for cat_id, nombre, _ in categorias:
+        peso, media, descripciones = PERFIL_CATEGORIAS.get(nombre, (5, 30.0, [nombre]))
+        perfiles.append((peso, cat_id, media, descripciones))
+    pesos = [perfil[0] for perfil in perfiles]
+
+    for perfil in rng.choices(perfiles, weights=pesos, k=n):
+        _, cat_id, media, descripciones = perfil
+        yield (
+            rng.choice(descripciones),
+            _importe(rng, media),
+            cat_id,
+            rng.choice(fechas),
+            'tarjeta' if rng.random() < 0.65 else 'efectivo'
+        )
+
+
+def generar_ingresos(n: int, anio_final: int, anios: int = 3,
+                     semilla: int = 0) -> Iterator[Tuple]:
+    """
+    Genera ingresos listos para Database.agregar_ingresos_lote.
+
+    Args:
+        n: Número de ingresos
+        anio_final: Último año con datos
+        anios: Años de datos hasta anio_final incluido
+        semilla: Semilla del generador
+
+    Yields:
+        Tuplas (descripcion, cantidad, fuente, fecha)
+    """
+    rng = random.Random(semilla + 1)
+    fechas = _fechas(anio_final, anios)
+    fuentes = list(PERFIL_FUENTES.items())
+    pesos = [perfil[0] for _, perfil in fuentes]
+
+    for fuente, (_, media) in rng.choices(fuentes, weights=pesos, k=n):
+        yield (f"Ingreso {fuente.lower()}", _importe(rng, media), fuente, rng.choice(fechas))
+
+
+class GeneradorDatos:
+    """Crea un entorno de usuarios y datos sintéticos en un directorio."""
+
+    def __init__(self, directorio: str, anio_final: int = None, anios: int = 3,
+                 semilla: int = 0):
+        """
+        Args:
+            directorio: Directorio donde se crean usuarios.db y usuarios/
+            anio_final: Último año con datos (por defecto ANIO_FINAL)
+            anios: Años de datos por usuario
+            semilla: Semilla de los datos generados
+        """
+        self.directorio = os.path.abspath(directorio)
+        self.anio_final = anio_final or ANIO_FINAL
+        self.anios = anios
+        self.semilla = semilla
+
+        # Las BDs del benchmark viven en su directorio, no en data/
+        self.almacenamiento = Almacenamiento(self.directorio)
+
+    def abrir(self, usuario_id: int = None, perfil: str = 'interactivo') -> Database:
+        """Abre la BD del directorio del benchmark (la de un usuario si se indica)."""
+        return Database(usuario_id=usuario_id, perfil=perfil, almacenamiento=self.almacenamiento)
+
+    def crear_usuarios(self, cantidad: int) -> List[int]:
+        """
+        Registra usuarios en usuarios.db, todos con la contraseña PASSWORD.
+
+        Los usuarios que ya existan (mismo email) se reutilizan.
+
+        Args:
+            cantidad: Número de usuarios
+
+        Returns:
+            IDs de los usuarios, en orden
+        """
+        with self.abrir() as db:
+            db.registrar_usuarios_lote(
+                (f"Usuario {i}", f"usuario{i}@benchmark.local", PASSWORD)
+                for i in range(1, cantidad + 1)
+            )
+
+            cursor = db.get_usuarios_connection().cursor()
+            cursor.execute(
+                "SELECT id FROM usuarios WHERE email LIKE '%@benchmark.local' ORDER BY id LIMIT ?",
+                (cantidad,)
+            )
+            return [fila[0] for fila in cursor.fetchall()]
+
+    def poblar(self, usuario_id: int, gastos: int, ingresos: int = None) -> Dict:
+        """
+        Llena la BD de un usuario con gastos e ingresos sintéticos.
+
+        Si la BD ya tiene gastos no se toca, para reutilizar los datos entre
+        ejecuciones (generar millones de filas lleva su tiempo).
+
+        Args:
+            usuario_id: Usuario a poblar
+            gastos: Número de gastos
+            ingresos: Número de ingresos (por defecto PROPORCION_INGRESOS * gastos)
+
+        Returns:
+            Diccionario {'gastos': int, 'ingresos': int, 'reutilizada': bool}
+        """
+        if ingresos is None:
+            ingresos = int(gastos * PROPORCION_INGRESOS)
+        semilla = self.semilla * 1_000_003 + usuario_id
+
+        with self.abrir(usuario_id, perfil='carga_masiva') as db:
+            cursor = db.get_connection().cursor()
+            cursor.execute("SELECT COUNT(*) FROM gastos")
+            existentes = cursor.fetchone()[0]
+            if existentes:
+                cursor.execute("SELECT COUNT(*) FROM ingresos")
+                return {'gastos': existentes, 'ingresos': cursor.fetchone()[0], 'reutilizada': True}
+
+            resultado_gastos = db.agregar_gastos_lote(generar_gastos(
+                gastos, db.obtener_categorias(), self.anio_final, self.anios, semilla
+            ), tamano_lote=10_000)
+            resultado_ingresos = db.agregar_ingresos_lote(generar_ingresos(
+                ingresos, self.anio_final, self.anios, semilla
+            ), tamano_lote=10_000)
+
+        return {
+            'gastos': resultado_gastos['insertados'],
+            'ingresos': resultado_ingresos['insertados'],
+            'reutilizada': False,
+        }
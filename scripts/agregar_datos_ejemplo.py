@@ -135,35 +135,32 @@ def agregar_datos_ejemplo():
     # Mapear nombres de categorías a IDs
     categorias_map = {cat[1]: cat[0] for cat in categorias}
 
-    gastos_agregados = 0
-    ingresos_agregados = 0
     errores = 0
 
-    # Agregar INGRESOS
+    # Agregar INGRESOS (una sola transacción)
     print("\nAgregando ingresos de ejemplo...")
-    for descripcion, cantidad, fuente, fecha in ejemplos_ingresos:
-        if db.agregar_ingreso(descripcion, cantidad, fuente, fecha):
-            ingresos_agregados += 1
-            print(f"  ✓ {fecha}: {descripcion} - €{cantidad:.2f} ({fuente})")
-        else:
-            errores += 1
-            print(f"  ✗ Error agregando ingreso: {descripcion}")
+    resultado = db.agregar_ingresos_lote(ejemplos_ingresos)
+    ingresos_agregados = resultado['insertados']
+    for indice, mensaje in resultado['errores']:
+        errores += 1
+        print(f"  ✗ Error agregando ingreso: {ejemplos_ingresos[indice][0]} ({mensaje})")
 
-    # Agregar GASTOS
+    # Agregar GASTOS (una sola transacción)
     print("\nAgregando gastos de ejemplo...")
+    gastos_validos = []
     for descripcion, cantidad, categoria_nombre, fecha in ejemplos_gastos:
         if categoria_nombre in categorias_map:
-            categoria_id = categorias_map[categoria_nombre]
-            if db.agregar_gasto(descripcion, cantidad, categoria_id, fecha):
-                gastos_agregados += 1
-                print(f"  ✓ {fecha}: {descripcion} - €{cantidad:.2f} ({categoria_nombre})")
-            else:
-                errores += 1
-                print(f"  ✗ Error agregando: {descripcion}")
+            gastos_validos.append((descripcion, cantidad, categorias_map[categoria_nombre], fecha))
         else:
             print(f"  ! Categoría no encontrada: {categoria_nombre}")
             errores += 1
 
+    resultado = db.agregar_gastos_lote(gastos_validos)
+    gastos_agregados = resultado['insertados']
+    for indice, mensaje in resultado['errores']:
+        errores += 1
+        print(f"  ✗ Error agregando: {gastos_validos[indice][0]} ({mensaje})")
+
     print(f"\n{'='*60}")
     print(f"Resumen:")
     print(f"  • Ingresos agregados correctamente: {ingresos_agregados}")
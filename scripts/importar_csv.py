@@ -0,0 +1,101 @@
+"""
+Script para importar un extracto bancario en CSV.
+
+Ejemplo (extracto típico de banco español):
+    python scripts/importar_csv.py 1 extracto.csv --delimitador ";" \
+        --decimal "," --formato-fecha "%d/%m/%Y" \
+        --col-fecha "Fecha" --col-descripcion "Concepto" --col-cantidad "Importe"
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+
+# Agregar el directorio raíz al path para poder importar desde src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.importacion import ConfiguracionCSV, importar_csv, CAMPOS
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Crea el parser de argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Importa un extracto bancario CSV en FinanzApp")
+    parser.add_argument("usuario_id", type=int, help="ID del usuario destino")
+    parser.add_argument("fichero", help="Ruta del fichero CSV")
+    parser.add_argument("--delimitador", default=",", help="Separador de campos (por defecto ',')")
+    parser.add_argument("--decimal", default=".", choices=[".", ","],
+                        help="Separador decimal de las cantidades (por defecto '.')")
+    parser.add_argument("--formato-fecha", default="%Y-%m-%d",
+                        help="Formato strptime de las fechas (por defecto %%Y-%%m-%%d)")
+    parser.add_argument("--codificacion", default="utf-8-sig", help="Codificación del fichero")
+    parser.add_argument("--sin-cabecera", action="store_true",
+                        help="El fichero no tiene cabecera; las columnas se indican por índice")
+    parser.add_argument("--tipo", default="auto", choices=["auto", "gastos", "ingresos"],
+                        help="auto: negativos son gastos y positivos ingresos")
+    parser.add_argument("--categoria", default="Otros",
+                        help="Categoría de los gastos sin categoría reconocida")
+    parser.add_argument("--fuente", default="Otros", help="Fuente de los ingresos sin fuente")
+
+    for campo in CAMPOS:
+        parser.add_argument(f"--col-{campo.replace('_', '-')}", dest=f"col_{campo}",
+                            help=f"Columna del campo '{campo}' (nombre o índice)")
+    return parser
+
+
+def configuracion_desde_args(args) -> ConfiguracionCSV:
+    """Construye la ConfiguracionCSV a partir de los argumentos."""
+    columnas = {}
+    for campo in CAMPOS:
+        columna = getattr(args, f"col_{campo}")
+        if columna is None:
+            continue
+        columnas[campo] = int(columna) if columna.isdigit() else columna
+
+    return ConfiguracionCSV(
+        columnas=columnas or None,
+        formato_fecha=args.formato_fecha,
+        separador_decimal=args.decimal,
+        delimitador=args.delimitador,
+        codificacion=args.codificacion,
+        tiene_cabecera=not args.sin_cabecera,
+        tipo=args.tipo,
+        categoria_por_defecto=args.categoria,
+        fuente_por_defecto=args.fuente
+    )
+
+
+def main(argv=None) -> int:
+    """Función principal."""
+    args = crear_parser().parse_args(argv)
+
+    try:
+        config = configuracion_desde_args(args)
+        with Database(usuario_id=args.usuario_id, perfil='carga_masiva') as db:
+            resultado = importar_csv(
+                db, args.fichero, config,
+                progreso=lambda filas: print(f"  … {filas} filas leídas", end="\r")
+            )
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    print()
+    print("=" * 60)
+    print(f"  • Filas leídas: {resultado['filas']}")
+    print(f"  • Gastos importados: {resultado['gastos']}")
+    print(f"  • Ingresos importados: {resultado['ingresos']}")
+    print(f"  • Errores: {resultado['total_errores']}")
+    print("=" * 60)
+
+    for linea, mensaje in resultado['errores'][:20]:
+        print(f"  ✗ Línea {linea}: {mensaje}")
+    if resultado['total_errores'] > 20:
+        print(f"  … y {resultado['total_errores'] - 20} errores más")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,16 @@ Módulos:
     - vistas: Vistas de la interfaz
     - estilos: Estilos y temas
     - utilidades: Funciones de utilidad
+    - importacion: Importación de extractos bancarios CSV
+    - exportacion: Exportación del informe anual (TXT, CSV, JSON)
+    - tareas: Consultas en segundo plano para las vistas
+    - eventos: Avisos de cambios para refrescar solo las vistas afectadas
+    - tablas: Actualización incremental de Treeviews
+    - cache: Caché de consultas invalidada por las escrituras
+    - instrumentacion: Medición opcional de métodos y consultas SQL
+    - almacenamiento: Ubicación de las bases de datos (data/, temporal o memoria)
+    - accesos: Escritura diferida del último acceso de los usuarios
+    - analitica: Análisis en paralelo del uso de las BDs de todos los usuarios
 """
 
 from .database import Database
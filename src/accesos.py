@@ -0,0 +1,180 @@
+"""
+Escritura diferida del último acceso de cada usuario.
+
+Cada login actualizaba usuarios.ultimo_acceso con su propio UPDATE y commit,
+de modo que muchos logins a la vez hacían cola en el único escritor de
+usuarios.db. BufferAccesos guarda esas fechas en memoria y las vuelca juntas
+en una transacción cada INTERVALO_VOLCADO segundos y al cerrar el proceso.
+Las lecturas de administración superponen las fechas pendientes con aplicar(),
+así que siguen viendo el valor más reciente.
+"""
+
+import atexit
+import sqlite3
+import threading
+import weakref
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+
+# Segundos entre volcados
+INTERVALO_VOLCADO = 30.0
+
+# Mismo formato (UTC) que CURRENT_TIMESTAMP de SQLite
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+# Buffers sin cerrar; se vuelcan al salir. Referencias débiles: un buffer que
+# ya nadie usa (ni su hilo de volcado) no se mantiene vivo hasta el final
+_abiertos: 'weakref.WeakSet[BufferAccesos]' = weakref.WeakSet()
+
+
+@atexit.register
+def _cerrar_abiertos():
+    """Vuelca al salir los buffers que siguen abiertos."""
+    for buffer in list(_abiertos):
+        buffer.cerrar()
+
+
+def ahora() -> str:
+    """Fecha y hora actual en el formato de CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).strftime(FORMATO_FECHA)
+
+
+class BufferAccesos:
+    """
+    Últimos accesos pendientes de escribir en usuarios.db.
+
+    Attributes:
+        ruta (str): Fichero (o URI) de usuarios.db
+        intervalo (float): Segundos entre volcados automáticos
+    """
+
+    def __init__(self, ruta: str, intervalo: float = INTERVALO_VOLCADO, timeout: float = 10):
+        """
+        Args:
+            ruta: Fichero (o URI) de usuarios.db
+            intervalo: Segundos entre volcados automáticos
+            timeout: Segundos de espera si usuarios.db está bloqueada al volcar
+        """
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self._pendientes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._lock_volcado = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo = None
+        _abiertos.add(self)
+
+    def registrar(self, usuario_id: int, fecha: str = None):
+        """
+        Anota un acceso sin escribir en la base de datos.
+
+        Args:
+            usuario_id: ID del usuario
+            fecha: Fecha del acceso (formato de CURRENT_TIMESTAMP). Por defecto, ahora
+        """
+        fecha = fecha or ahora()
+        with self._lock:
+            if fecha > self._pendientes.get(usuario_id, ''):
+                self._pendientes[usuario_id] = fecha
+            if self._hilo is None and not self._parar.is_set():
+                self._hilo = threading.Thread(target=self._volcar_periodicamente,
+                                              name="BufferAccesos", daemon=True)
+                self._hilo.start()
+
+    def pendiente(self, usuario_id: int) -> Optional[str]:
+        """
+        Obtiene el acceso de un usuario que aún no se ha volcado.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Fecha pendiente o None
+        """
+        with self._lock:
+            return self._pendientes.get(usuario_id)
+
+    def aplicar(self, filas: Iterable, columna: int = 6) -> List[tuple]:
+        """
+        Superpone los accesos pendientes a filas leídas de usuarios.
+
+        Args:
+            filas: Tuplas cuyo primer campo es el id del usuario
+            columna: Posición de ultimo_acceso en cada tupla
+
+        Returns:
+            Lista de filas con ultimo_acceso al día
+        """
+        with self._lock:
+            pendientes = dict(self._pendientes)
+        if not pendientes:
+            return list(filas)
+
+        resultado = []
+        for fila in filas:
+            fecha = pendientes.get(fila[0])
+            if fecha and fecha > (fila[columna] or ''):
+                fila = tuple(fila[:columna]) + (fecha,) + tuple(fila[columna + 1:])
+            resultado.append(fila)
+        return resultado
+
+    def descartar(self, usuario_id: int):
+        """
+        Olvida el acceso pendiente de un usuario (por ejemplo, al eliminarlo).
+
+        Args:
+            usuario_id: ID del usuario
+        """
+        with self._lock:
+            self._pendientes.pop(usuario_id, None)
+
+    def volcar(self) -> int:
+        """
+        Escribe los accesos pendientes en una sola transacción.
+
+        Si la escritura falla, las fechas vuelven al buffer para el siguiente
+        volcado.
+
+        Returns:
+            Número de usuarios actualizados
+        """
+        with self._lock_volcado:
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, {}
+            if not pendientes:
+                return 0
+
+            try:
+                conn = sqlite3.connect(self.ruta, timeout=self.timeout, uri=True)
+                try:
+                    with conn:
+                        conn.executemany('''
+                            UPDATE usuarios
+                            SET ultimo_acceso = ?
+                            WHERE id = ? AND (ultimo_acceso IS NULL OR ultimo_acceso < ?)
+                        ''', [(fecha, usuario_id, fecha) for usuario_id, fecha in pendientes.items()])
+                finally:
+                    conn.close()
+                return len(pendientes)
+            except sqlite3.Error as e:
+                print(f"Error al volcar últimos accesos: {e}")
+                for usuario_id, fecha in pendientes.items():
+                    self.registrar(usuario_id, fecha)
+                return 0
+
+    def _volcar_periodicamente(self):
+        """Bucle del hilo de fondo: vuelca cada `intervalo` segundos."""
+        while not self._parar.wait(self.intervalo):
+            self.volcar()
+
+    def cerrar(self):
+        """Detiene el hilo de fondo y vuelca lo pendiente."""
+        _abiertos.discard(self)
+        self._parar.set()
+        hilo = self._hilo
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join()
+        self.volcar()
@@ -0,0 +1,359 @@
+"""
+Ubicación de las bases de datos de FinanzApp.
+
+Por defecto usuarios.db y la BD de cada usuario viven en data/. Un
+Almacenamiento permite cambiar esa raíz por otro directorio, uno temporal o
+memoria compartida (':memory:'), y opcionalmente crear cada BD nueva
+copiando una plantilla ya migrada en lugar de ejecutar todas las migraciones.
+Las BDs de los usuarios recién registrados se crean siempre así.
+
+El almacenamiento por defecto sale de la variable de entorno FINANZAPP_DATOS
+o, si no está definida, de data/; se cambia con establecer_por_defecto().
+"""
+
+import atexit
+import itertools
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from . import migraciones
+    from .accesos import BufferAccesos
+except ImportError:
+    import migraciones
+    from accesos import BufferAccesos
+
+
+# Obtener el directorio raíz del proyecto
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+
+# Raíz especial: todas las BDs en memoria compartida del proceso
+MEMORIA = ':memory:'
+
+# Variable de entorno con la raíz del almacenamiento por defecto
+VARIABLE_ENTORNO = 'FINANZAPP_DATOS'
+
+# Esquema -> función que lleva una BD vacía a la última versión
+ESQUEMAS = {
+    'usuarios': migraciones.migrar_usuarios,
+    'finanzas': migraciones.migrar_finanzas,
+}
+
+# Plantillas ya migradas, una por esquema, compartidas por todo el proceso
+_plantillas: Dict[str, sqlite3.Connection] = {}
+_ficheros_plantilla: Dict[str, str] = {}
+_lock_plantillas = threading.Lock()
+
+# Nombre de fichero (o de BD en memoria) de las finanzas de un usuario
+PATRON_USUARIO = re.compile(r'usuario_(\d+)_finanzas(?:\.db)?$')
+
+# Distingue las BDs en memoria de distintos Almacenamiento del mismo proceso
+_contador = itertools.count(1)
+
+
+def _plantilla(esquema: str) -> sqlite3.Connection:
+    """Devuelve la plantilla en memoria del esquema (llamar con _lock_plantillas)."""
+    plantilla = _plantillas.get(esquema)
+    if plantilla is None:
+        plantilla = sqlite3.connect(":memory:", check_same_thread=False)
+        ESQUEMAS[esquema](plantilla)
+        _plantillas[esquema] = plantilla
+    return plantilla
+
+
+def copiar_plantilla(esquema: str, ruta: str):
+    """
+    Copia en `ruta` una BD vacía con el esquema ya migrado.
+
+    La plantilla se construye en memoria la primera vez y después se copia
+    con la API de backup de SQLite, mucho más rápido que repetir las
+    migraciones (tablas, índices, triggers y categorías por defecto).
+
+    Args:
+        esquema: 'usuarios' o 'finanzas'
+        ruta: Fichero o URI de destino
+    """
+    with _lock_plantillas:
+        destino = sqlite3.connect(ruta, uri=True)
+        try:
+            _plantilla(esquema).backup(destino)
+        finally:
+            destino.close()
+
+
+def fichero_plantilla(esquema: str) -> str:
+    """
+    Obtiene un fichero con la plantilla del esquema.
+
+    Se escribe una vez por proceso en un directorio temporal que se borra al
+    salir, así que siempre tiene la última versión de las migraciones.
+
+    Args:
+        esquema: 'usuarios' o 'finanzas'
+
+    Returns:
+        Ruta del fichero de plantilla
+    """
+    with _lock_plantillas:
+        ruta = _ficheros_plantilla.get(esquema)
+        if ruta is None:
+            directorio = tempfile.mkdtemp(prefix="finanzapp_plantilla_")
+            atexit.register(shutil.rmtree, directorio, True)
+            ruta = os.path.join(directorio, f"{esquema}.db")
+            destino = sqlite3.connect(ruta)
+            try:
+                _plantilla(esquema).backup(destino)
+            finally:
+                destino.close()
+            _ficheros_plantilla[esquema] = ruta
+        return ruta
+
+
+def clonar_plantilla(esquema: str, ruta: str) -> bool:
+    """
+    Crea el fichero `ruta` copiando el fichero de plantilla del esquema.
+
+    Una copia de fichero es aún más rápida que la API de backup. Se copia a
+    un temporal y se enlaza con os.link, que falla si `ruta` ya existe: nunca
+    queda a medias una BD que otra conexión pudiera abrir y, si otro proceso
+    la ha creado antes, no se sobrescriben los datos que ya tenga.
+
+    Args:
+        esquema: 'usuarios' o 'finanzas'
+        ruta: Fichero de destino
+
+    Returns:
+        True si se creó, False si ya existía
+    """
+    temporal = f"{ruta}.{os.getpid()}_{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(fichero_plantilla(esquema), temporal)
+        try:
+            os.link(temporal, ruta)
+        except FileExistsError:
+            return False
+        return True
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+class Almacenamiento:
+    """
+    Raíz donde se guardan usuarios.db y las BDs de finanzas de cada usuario.
+
+    Attributes:
+        raiz (str): Directorio raíz, o ':memory:'
+        en_memoria (bool): Si las BDs viven en memoria compartida
+        usar_plantilla (bool): Si las BDs nuevas se copian de una plantilla
+        ruta_usuarios (str): Fichero (o URI) de usuarios.db
+        directorio_usuarios (str): Directorio de las BDs de usuario (None en memoria)
+        accesos (BufferAccesos): Últimos accesos pendientes de escribir en usuarios.db
+    """
+
+    def __init__(self, raiz: str = None, usar_plantilla: bool = False):
+        """
+        Args:
+            raiz: Directorio raíz o ':memory:'. Por defecto FINANZAPP_DATOS o data/
+            usar_plantilla: Crear las BDs nuevas copiando una plantilla migrada
+        """
+        raiz = raiz or os.environ.get(VARIABLE_ENTORNO) or DATA_DIR
+        self.en_memoria = raiz == MEMORIA
+        self.usar_plantilla = usar_plantilla
+        self._lock = threading.Lock()
+        # Conexiones que mantienen vivas las BDs en memoria
+        self._anclas: Dict[str, sqlite3.Connection] = {}
+        self._temporal = False
+
+        if self.en_memoria:
+            self.raiz = MEMORIA
+            self._prefijo = f"finanzapp_{os.getpid()}_{next(_contador)}"
+            self.ruta_usuarios = self._uri("usuarios")
+            self.directorio_usuarios = None
+        else:
+            self.raiz = os.path.abspath(raiz)
+            self.ruta_usuarios = os.path.join(self.raiz, "usuarios.db")
+            self.directorio_usuarios = os.path.join(self.raiz, "usuarios")
+            os.makedirs(self.directorio_usuarios, exist_ok=True)
+
+        # Compartido por todas las Database de este almacenamiento
+        self.accesos = BufferAccesos(self.ruta_usuarios)
+
+    @classmethod
+    def temporal(cls, usar_plantilla: bool = True) -> 'Almacenamiento':
+        """
+        Crea un almacenamiento en un directorio temporal que se borra al salir.
+
+        Args:
+            usar_plantilla: Crear las BDs nuevas copiando una plantilla migrada
+
+        Returns:
+            Almacenamiento nuevo y vacío
+        """
+        almacenamiento = cls(tempfile.mkdtemp(prefix="finanzapp_"), usar_plantilla)
+        almacenamiento._temporal = True
+        atexit.register(almacenamiento.cerrar)
+        return almacenamiento
+
+    def _uri(self, nombre: str) -> str:
+        """
+        URI de una BD en memoria compartida entre las conexiones del proceso.
+
+        Se usa el VFS memdb (SQLite 3.36 o posterior) y no cache=shared: con
+        la caché compartida los bloqueos de tabla fallan al instante con
+        "database table is locked" sin respetar el timeout, y un hilo que lee
+        mientras otro escribe recibe errores en lugar de esperar. El nombre
+        empieza por '/' para que todas las conexiones vean la misma BD.
+        """
+        return f"file:/{self._prefijo}_{nombre}?vfs=memdb"
+
+    def ruta_usuario(self, usuario_id: int) -> str:
+        """
+        Obtiene la ruta (o URI) de la BD de finanzas de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Ruta que se pasa a GestorConexiones
+        """
+        if self.en_memoria:
+            return self._uri(f"usuario_{usuario_id}_finanzas")
+        return os.path.join(self.directorio_usuarios, f"usuario_{usuario_id}_finanzas.db")
+
+    def listar_usuarios(self) -> List[Tuple[int, str]]:
+        """
+        Enumera las BDs de finanzas de usuario que existen.
+
+        Returns:
+            Lista de (usuario_id, ruta) ordenada por ID
+        """
+        if self.en_memoria:
+            with self._lock:
+                rutas = list(self._anclas)
+            nombres = [(ruta.split('?')[0].rsplit(f"{self._prefijo}_", 1)[-1], ruta) for ruta in rutas]
+        else:
+            with os.scandir(self.directorio_usuarios) as entradas:
+                nombres = [(entrada.name, entrada.path) for entrada in entradas if entrada.is_file()]
+
+        bases_datos = []
+        for nombre, ruta in nombres:
+            coincidencia = PATRON_USUARIO.match(nombre)
+            if coincidencia:
+                bases_datos.append((int(coincidencia.group(1)), ruta))
+        return sorted(bases_datos)
+
+    def preparar(self, ruta: str, esquema: str):
+        """
+        Deja una BD lista para abrirla.
+
+        En memoria la ancla para que no desaparezca al cerrar la última
+        conexión de una Database. Si la BD es nueva y se usan plantillas,
+        copia en ella la plantilla del esquema.
+
+        Args:
+            ruta: Ruta devuelta por ruta_usuarios o ruta_usuario()
+            esquema: 'usuarios' o 'finanzas'
+        """
+        self._crear(ruta, esquema, self.usar_plantilla)
+
+    def crear_usuario(self, usuario_id: int) -> bool:
+        """
+        Crea la BD de finanzas de un usuario nuevo copiando la plantilla.
+
+        Se usa al registrar usuarios aunque usar_plantilla sea False: la BD
+        queda con el esquema al día sin ejecutar ninguna migración.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            True si se creó, False si ya existía
+        """
+        return self._crear(self.ruta_usuario(usuario_id), 'finanzas', True)
+
+    def _crear(self, ruta: str, esquema: str, copiar: bool) -> bool:
+        """Ancla o crea la BD si no existe, copiando la plantilla si se pide."""
+        with self._lock:
+            if self.en_memoria:
+                if ruta in self._anclas:
+                    return False
+                self._anclas[ruta] = sqlite3.connect(ruta, uri=True, check_same_thread=False)
+                if copiar:
+                    copiar_plantilla(esquema, ruta)
+                return True
+
+            if os.path.exists(ruta):
+                return False
+            if copiar:
+                # Otro proceso puede crearla entre la comprobación y la copia
+                return clonar_plantilla(esquema, ruta)
+            return True
+
+    def eliminar_usuario(self, usuario_id: int):
+        """
+        Borra la BD de finanzas de un usuario.
+
+        Las Database que la tengan abierta deben cerrarse antes.
+
+        Args:
+            usuario_id: ID del usuario
+        """
+        ruta = self.ruta_usuario(usuario_id)
+        if self.en_memoria:
+            with self._lock:
+                ancla = self._anclas.pop(ruta, None)
+            if ancla is not None:
+                ancla.close()
+            return
+
+        for fichero in (ruta, ruta + "-wal", ruta + "-shm"):
+            if os.path.exists(fichero):
+                os.remove(fichero)
+
+    def cerrar(self):
+        """Vuelca los accesos pendientes, libera las BDs en memoria y borra el temporal."""
+        # Ya no hace falta cerrarlo al salir (ver temporal())
+        atexit.unregister(self.cerrar)
+        self.accesos.cerrar()
+
+        with self._lock:
+            anclas = list(self._anclas.values())
+            self._anclas.clear()
+        for ancla in anclas:
+            ancla.close()
+
+        if self._temporal:
+            shutil.rmtree(self.raiz, ignore_errors=True)
+
+
+_por_defecto: Optional[Almacenamiento] = None
+_lock_defecto = threading.Lock()
+
+
+def por_defecto() -> Almacenamiento:
+    """Devuelve el almacenamiento que usan las Database creadas sin indicar uno."""
+    global _por_defecto
+    with _lock_defecto:
+        if _por_defecto is None:
+            _por_defecto = Almacenamiento()
+        return _por_defecto
+
+
+def establecer_por_defecto(almacenamiento: Optional[Almacenamiento]):
+    """
+    Cambia el almacenamiento por defecto.
+
+    Args:
+        almacenamiento: Nuevo almacenamiento, o None para volver a data/
+            (o a FINANZAPP_DATOS)
+    """
+    global _por_defecto
+    with _lock_defecto:
+        _por_defecto = almacenamiento
@@ -0,0 +1,229 @@
+"""
+Analítica de uso sobre las BDs de finanzas de todos los usuarios.
+
+Cada usuario tiene su propio fichero, así que el análisis se reparte entre un
+pool de procesos: cada proceso abre en solo lectura un lote de BDs, saca de
+cada una un resumen pequeño (filas, tamaño, rango de fechas, totales por año
+y versión de esquema) y el proceso principal solo tiene que combinarlos. Las
+BDs son independientes y en WAL los lectores no bloquean a nadie, de modo que
+el tiempo baja casi en proporción al número de núcleos.
+
+Los procesos se crean con 'spawn' porque la aplicación tiene hilos (Tk, el
+pool de consultas, el volcado de accesos) y hacer fork de un proceso con
+hilos puede dejar bloqueos tomados en el hijo.
+"""
+
+import math
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.request import pathname2url
+
+try:
+    from .migraciones import MIGRACIONES_FINANZAS
+except ImportError:
+    from migraciones import MIGRACIONES_FINANZAS
+
+
+# Arrancar un proceso cuesta lo mismo que analizar unos cientos de BDs, así
+# que por debajo de este número de BDs por proceso no compensa el pool
+BD_POR_PROCESO_MIN = 256
+
+# Máximo de BDs que se envían juntas a un proceso
+LOTE_MAXIMO = 64
+
+
+def _abrir_lectura(ruta: str) -> sqlite3.Connection:
+    """Abre una BD sin posibilidad de modificarla (ruta o URI en memoria)."""
+    if ruta.startswith("file:"):
+        conn = sqlite3.connect(ruta, uri=True)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+    return sqlite3.connect(f"file:{pathname2url(ruta)}?mode=ro", uri=True)
+
+
+def _tamano(conn: sqlite3.Connection, ruta: str) -> int:
+    """Bytes que ocupa la BD en disco (con su WAL), o en memoria."""
+    if ruta.startswith("file:"):
+        paginas = conn.execute("PRAGMA page_count").fetchone()[0]
+        return paginas * conn.execute("PRAGMA page_size").fetchone()[0]
+
+    tamano = os.path.getsize(ruta)
+    if os.path.exists(ruta + "-wal"):
+        tamano += os.path.getsize(ruta + "-wal")
+    return tamano
+
+
+def analizar_bd(usuario_id: int, ruta: str) -> Dict:
+    """
+    Resume la BD de finanzas de un usuario.
+
+    Los totales y el número de movimientos por año salen de las tablas
+    resumen_* cuando existen (v5 en adelante) y las fechas extremas del
+    índice (anio, mes, fecha), así que el coste apenas depende del número de
+    movimientos.
+
+    Args:
+        usuario_id: ID del usuario
+        ruta: Ruta (o URI) de su BD
+
+    Returns:
+        Diccionario con usuario_id, version, tamano_bytes, gastos, ingresos,
+        categorias, fecha_min, fecha_max y anios ({anio: {'gastos', 'ingresos'}}),
+        o con usuario_id y error si no se pudo leer
+    """
+    try:
+        conn = _abrir_lectura(ruta)
+        try:
+            cursor = conn.cursor()
+            tablas = {fila[0] for fila in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+            resultado = {
+                'usuario_id': usuario_id,
+                'version': cursor.execute("PRAGMA user_version").fetchone()[0],
+                'tamano_bytes': _tamano(conn, ruta),
+                'fecha_min': None,
+                'fecha_max': None,
+                'anios': {},
+            }
+
+            for tabla, resumen in (('gastos', 'resumen_gastos'), ('ingresos', 'resumen_ingresos')):
+                resultado[tabla] = 0
+                if tabla not in tablas:
+                    continue
+
+                for orden in ('', ' DESC'):
+                    fila = cursor.execute(
+                        f"SELECT fecha FROM {tabla} ORDER BY anio{orden}, mes{orden}, fecha{orden} LIMIT 1"
+                    ).fetchone()
+                    if fila:
+                        if resultado['fecha_min'] is None or fila[0] < resultado['fecha_min']:
+                            resultado['fecha_min'] = fila[0]
+                        if resultado['fecha_max'] is None or fila[0] > resultado['fecha_max']:
+                            resultado['fecha_max'] = fila[0]
+
+                if resumen in tablas:
+                    consulta = f"SELECT anio, SUM(total), SUM(cantidad) FROM {resumen} GROUP BY anio"
+                else:
+                    consulta = f"SELECT anio, SUM(cantidad), COUNT(*) FROM {tabla} GROUP BY anio"
+                for anio, total, filas in cursor.execute(consulta):
+                    totales = resultado['anios'].setdefault(anio, {'gastos': 0.0, 'ingresos': 0.0})
+                    totales[tabla] = total
+                    resultado[tabla] += filas
+
+            resultado['categorias'] = (
+                cursor.execute("SELECT COUNT(*) FROM categorias").fetchone()[0] if 'categorias' in tablas else 0
+            )
+            return resultado
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        return {'usuario_id': usuario_id, 'error': str(e)}
+
+
+def combinar(resultados: List[Dict]) -> Dict:
+    """
+    Junta los resúmenes de cada BD en un informe global.
+
+    Args:
+        resultados: Diccionarios devueltos por analizar_bd
+
+    Returns:
+        Diccionario con bases_datos, errores [(usuario_id, mensaje)],
+        tamano_bytes, filas {'gastos', 'ingresos', 'categorias'}, fecha_min,
+        fecha_max, por_anio {anio: {'gastos', 'ingresos', 'balance'}},
+        versiones {version: número de BDs}, desactualizadas y usuarios (los
+        resúmenes correctos ordenados por ID)
+    """
+    ultima_version = MIGRACIONES_FINANZAS[-1][0]
+    informe = {
+        'bases_datos': 0,
+        'errores': [],
+        'tamano_bytes': 0,
+        'filas': {'gastos': 0, 'ingresos': 0, 'categorias': 0},
+        'fecha_min': None,
+        'fecha_max': None,
+        'por_anio': {},
+        'versiones': {},
+        'desactualizadas': 0,
+        'usuarios': [],
+    }
+
+    for resultado in sorted(resultados, key=lambda r: r['usuario_id']):
+        if 'error' in resultado:
+            informe['errores'].append((resultado['usuario_id'], resultado['error']))
+            continue
+
+        informe['bases_datos'] += 1
+        informe['usuarios'].append(resultado)
+        informe['tamano_bytes'] += resultado['tamano_bytes']
+        for tabla in informe['filas']:
+            informe['filas'][tabla] += resultado[tabla]
+
+        if resultado['fecha_min'] and (informe['fecha_min'] is None or resultado['fecha_min'] < informe['fecha_min']):
+            informe['fecha_min'] = resultado['fecha_min']
+        if resultado['fecha_max'] and (informe['fecha_max'] is None or resultado['fecha_max'] > informe['fecha_max']):
+            informe['fecha_max'] = resultado['fecha_max']
+
+        for anio, totales in resultado['anios'].items():
+            acumulado = informe['por_anio'].setdefault(anio, {'gastos': 0.0, 'ingresos': 0.0})
+            acumulado['gastos'] += totales['gastos']
+            acumulado['ingresos'] += totales['ingresos']
+
+        version = resultado['version']
+        informe['versiones'][version] = informe['versiones'].get(version, 0) + 1
+        if version < ultima_version:
+            informe['desactualizadas'] += 1
+
+    informe['por_anio'] = {
+        anio: {
+            'gastos': round(totales['gastos'], 2),
+            'ingresos': round(totales['ingresos'], 2),
+            'balance': round(totales['ingresos'] - totales['gastos'], 2),
+        }
+        for anio, totales in sorted(informe['por_anio'].items())
+    }
+    informe['versiones'] = dict(sorted(informe['versiones'].items()))
+    return informe
+
+
+def _procesos_necesarios(bases_datos: int, procesos: Optional[int]) -> int:
+    """Número de procesos a usar: no más que núcleos ni que lotes útiles."""
+    procesos = procesos or os.cpu_count() or 1
+    return max(1, min(procesos, math.ceil(bases_datos / BD_POR_PROCESO_MIN)))
+
+
+def analizar_usuarios(bases_datos: List[Tuple[int, str]], procesos: Optional[int] = None,
+                      en_memoria: bool = False) -> Dict:
+    """
+    Analiza una lista de BDs de usuario repartiéndolas entre procesos.
+
+    Args:
+        bases_datos: Lista de (usuario_id, ruta)
+        procesos: Máximo de procesos. Por defecto, uno por núcleo
+        en_memoria: Las rutas son BDs en memoria del proceso actual; se
+            analizan aquí mismo porque otro proceso no las vería
+
+    Returns:
+        Informe de combinar() con además 'procesos' y 'segundos'
+    """
+    inicio = time.perf_counter()
+    procesos = 1 if en_memoria else _procesos_necesarios(len(bases_datos), procesos)
+
+    ids = [usuario_id for usuario_id, _ in bases_datos]
+    rutas = [ruta for _, ruta in bases_datos]
+    if procesos == 1:
+        resultados = list(map(analizar_bd, ids, rutas))
+    else:
+        lote = max(1, min(LOTE_MAXIMO, len(bases_datos) // (procesos * 4)))
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            resultados = list(pool.map(analizar_bd, ids, rutas, chunksize=lote))
+
+    informe = combinar(resultados)
+    informe['procesos'] = procesos
+    informe['segundos'] = round(time.perf_counter() - inicio, 3)
+    return informe
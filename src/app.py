@@ -1,15 +1,17 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 
 try:
     from .database import Database
     from .vistas import VistaGastosMensual, VistaComparacionAnual, VistaEstadisticas, VistaGestionCategorias, VistaAdministracion
     from .login import VentanaLogin
+    from .tareas import EjecutorTareas
 except ImportError:
     from database import Database
     from vistas import VistaGastosMensual, VistaComparacionAnual, VistaEstadisticas, VistaGestionCategorias, VistaAdministracion
     from login import VentanaLogin
+    from tareas import EjecutorTareas
 
 
 class AplicacionGastos:
@@ -44,6 +46,9 @@ class AplicacionGastos:
         # Inicializar base de datos con el usuario autenticado
         self.db = Database(usuario_id=usuario_id)
 
+        # Las vistas consultan la base de datos en segundo plano
+        self.ejecutor = EjecutorTareas(self.root)
+
         # Año actual
         self.anio_actual = datetime.now().year
 
@@ -149,6 +154,14 @@ class AplicacionGastos:
         )
         btn_refrescar.pack(side=tk.LEFT, padx=8)
 
+        btn_importar = crear_boton_moderno(
+            controls_frame,
+            text="Importar CSV",
+            command=self.ventana_importar_csv,
+            style='secondary'
+        )
+        btn_importar.pack(side=tk.LEFT, padx=8)
+
         # Contenedor del contenido principal
         content_frame = tk.Frame(main_container, bg='#F7FAFC')
         content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -157,45 +170,47 @@ class AplicacionGastos:
         self.notebook = ttk.Notebook(content_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
-        # Crear pestañas para cada mes
+        # Las vistas se crean al seleccionar su pestaña por primera vez;
+        # hasta entonces cada pestaña es un contenedor vacío.
+        self._pestanas_pendientes = {}
         self.vistas_mensuales = {}
+        self.vista_comparacion = None
+        self.vista_estadisticas = None
+        self.vista_categorias = None
+        self.vista_administracion = None
+
+        # Crear pestañas para cada mes
         meses = [
             "Enero", "Febrero", "Marzo", "Abril",
             "Mayo", "Junio", "Julio", "Agosto",
             "Septiembre", "Octubre", "Noviembre", "Diciembre"
         ]
 
+        pestanas_meses = {}
         for i, mes in enumerate(meses, 1):
-            vista = VistaGastosMensual(self.notebook, self.db, i, self.anio_actual)
-            self.notebook.add(vista.frame, text=mes)
-            self.vistas_mensuales[i] = vista
+            pestanas_meses[i] = self._agregar_pestana(mes, lambda padre, i=i: self._crear_vista_mes(padre, i))
 
         # Pestaña de comparación anual
-        self.vista_comparacion = VistaComparacionAnual(
-            self.notebook, self.db, self.anio_actual
-        )
-        self.notebook.add(self.vista_comparacion.frame, text="Comparación Anual")
+        self._agregar_pestana("Comparación Anual", self._crear_vista_comparacion)
 
         # Pestaña de estadísticas
-        self.vista_estadisticas = VistaEstadisticas(
-            self.notebook, self.db, self.anio_actual
-        )
-        self.notebook.add(self.vista_estadisticas.frame, text="Estadísticas")
+        self._agregar_pestana("Estadísticas", self._crear_vista_estadisticas)
 
         # Pestaña de gestión de categorías
-        self.vista_categorias = VistaGestionCategorias(
-            self.notebook, self.db
-        )
-        self.notebook.add(self.vista_categorias.frame, text="Categorías")
+        self._agregar_pestana("Categorías", self._crear_vista_categorias)
 
         # Pestaña de administración (solo para admins)
         if self.rol == 'admin':
-            # Crear instancia de Database sin usuario_id para acceso global
-            db_admin = Database()
-            self.vista_administracion = VistaAdministracion(
-                self.notebook, db_admin
-            )
-            self.notebook.add(self.vista_administracion.frame, text="👨‍💼 Administración")
+            self._agregar_pestana("👨‍💼 Administración", self._crear_vista_administracion)
+
+        self.notebook.bind('<<NotebookTabChanged>>', self._al_cambiar_pestana)
+
+        # Abrir en el mes actual y precargar sus vecinos cuando la ventana esté libre
+        mes_actual = datetime.now().month
+        self.notebook.select(pestanas_meses[mes_actual])
+        self._construir_pestana(pestanas_meses[mes_actual])
+        self._precargar([pestanas_meses[mes] for mes in (mes_actual - 1, mes_actual + 1)
+                         if mes in pestanas_meses])
 
         # Barra de estado
         footer = tk.Frame(main_container, bg='#EDF2F7', height=35)
@@ -213,38 +228,99 @@ class AplicacionGastos:
         )
         self.barra_estado.pack(fill=tk.BOTH, expand=True)
 
+    def _agregar_pestana(self, texto: str, fabrica):
+        """
+        Añade una pestaña cuya vista se construirá al seleccionarla.
+
+        Args:
+            texto: Título de la pestaña
+            fabrica: Función que recibe el contenedor y crea la vista
+
+        Returns:
+            Contenedor de la pestaña
+        """
+        contenedor = tk.Frame(self.notebook, bg='#F7FAFC')
+        self.notebook.add(contenedor, text=texto)
+        self._pestanas_pendientes[str(contenedor)] = fabrica
+        return contenedor
+
+    def _construir_pestana(self, contenedor):
+        """Crea la vista de una pestaña si aún no se ha creado."""
+        fabrica = self._pestanas_pendientes.pop(str(contenedor), None)
+        if fabrica is None:
+            return
+        vista = fabrica(contenedor)
+        vista.frame.pack(fill=tk.BOTH, expand=True)
+
+    def _al_cambiar_pestana(self, event=None):
+        """Construye la vista de la pestaña seleccionada la primera vez."""
+        seleccionada = self.notebook.select()
+        if seleccionada:
+            self._construir_pestana(self.notebook.nametowidget(seleccionada))
+
+    def _precargar(self, contenedores):
+        """Construye en momentos de inactividad, una a una, las pestañas indicadas."""
+        if not contenedores:
+            return
+
+        def siguiente():
+            self._construir_pestana(contenedores[0])
+            self._precargar(contenedores[1:])
+
+        # after() deja pasar los eventos pendientes antes de cada pestaña
+        self.root.after(50, lambda: self.root.after_idle(siguiente))
+
+    def _crear_vista_mes(self, padre, mes: int):
+        """Crea la vista de un mes."""
+        vista = VistaGastosMensual(padre, self.db, mes, self.anio_actual, self.ejecutor)
+        self.vistas_mensuales[mes] = vista
+        return vista
+
+    def _crear_vista_comparacion(self, padre):
+        """Crea la vista de comparación anual."""
+        self.vista_comparacion = VistaComparacionAnual(padre, self.db, self.anio_actual, self.ejecutor)
+        return self.vista_comparacion
+
+    def _crear_vista_estadisticas(self, padre):
+        """Crea la vista de estadísticas."""
+        self.vista_estadisticas = VistaEstadisticas(padre, self.db, self.anio_actual, self.ejecutor)
+        return self.vista_estadisticas
+
+    def _crear_vista_categorias(self, padre):
+        """Crea la vista de gestión de categorías."""
+        self.vista_categorias = VistaGestionCategorias(padre, self.db, self.ejecutor)
+        return self.vista_categorias
+
+    def _crear_vista_administracion(self, padre):
+        """Crea la vista de administración."""
+        # Crear instancia de Database sin usuario_id para acceso global
+        db_admin = Database()
+        self.vista_administracion = VistaAdministracion(padre, db_admin, self.ejecutor)
+        return self.vista_administracion
+
     def cambiar_anio(self, event=None):
-        """Cambia el año seleccionado y actualiza todas las vistas."""
+        """Cambia el año seleccionado y actualiza las vistas ya creadas."""
         nuevo_anio = int(self.combo_anio.get())
         self.anio_actual = nuevo_anio
 
-        # Actualizar vistas mensuales
+        # Actualizar vistas mensuales (las que aún no existen se crearán con este año)
         for mes, vista in self.vistas_mensuales.items():
             vista.cambiar_anio(nuevo_anio)
 
         # Actualizar vista de comparación
-        self.vista_comparacion.cambiar_anio(nuevo_anio)
+        if self.vista_comparacion:
+            self.vista_comparacion.cambiar_anio(nuevo_anio)
 
         # Actualizar vista de estadísticas
-        self.vista_estadisticas.cambiar_anio(nuevo_anio)
+        if self.vista_estadisticas:
+            self.vista_estadisticas.cambiar_anio(nuevo_anio)
 
         # Actualizar barra de estado
         self.barra_estado.config(text=f"Año seleccionado: {self.anio_actual} • FinanzApp v3.0")
 
     def refrescar_vistas(self):
         """Refresca todas las vistas."""
-        # Refrescar vistas mensuales
-        for vista in self.vistas_mensuales.values():
-            vista.cargar_gastos()
-
-        # Refrescar vista de comparación
-        self.vista_comparacion.cargar_datos()
-
-        # Refrescar vista de estadísticas
-        self.vista_estadisticas.cargar_datos()
-
-        # Refrescar vista de categorías
-        self.vista_categorias.refrescar()
+        self.recargar_datos()
 
         messagebox.showinfo(
             "✓ Actualización Completada",
@@ -252,6 +328,159 @@ class AplicacionGastos:
             "Los datos están sincronizados con la base de datos."
         )
 
+    def recargar_datos(self):
+        """
+        Marca como sucias las vistas ya creadas.
+
+        La pestaña visible se recarga enseguida; el resto, cuando se seleccione.
+        Los cambios hechos desde la propia aplicación no necesitan esto: la
+        base de datos los publica y cada vista marca solo lo que le afecta.
+        """
+        # Los cambios externos (otro proceso, scripts) no pasan por la caché
+        self.db.cache.vaciar()
+
+        # Vistas mensuales
+        for vista in self.vistas_mensuales.values():
+            vista.marcar_sucio()
+
+        # Vistas anuales y de categorías
+        for vista in (self.vista_comparacion, self.vista_estadisticas, self.vista_categorias):
+            if vista:
+                vista.marcar_sucio()
+
+    def ventana_importar_csv(self):
+        """Pide un extracto CSV y su formato, y lo importa."""
+        try:
+            from .importacion import ConfiguracionCSV, importar_csv
+            from .estilos import crear_boton_moderno
+        except ImportError:
+            from importacion import ConfiguracionCSV, importar_csv
+            from estilos import crear_boton_moderno
+
+        ruta = filedialog.askopenfilename(
+            parent=self.root,
+            title="Selecciona el extracto bancario",
+            filetypes=[("CSV", "*.csv"), ("Todos los archivos", "*.*")]
+        )
+        if not ruta:
+            return
+
+        ventana = tk.Toplevel(self.root)
+        ventana.title("Importar CSV")
+        ventana.configure(bg='#FFFFFF')
+        ventana.transient(self.root)
+        ventana.grab_set()
+
+        form_frame = tk.Frame(ventana, bg='#FFFFFF')
+        form_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=15)
+
+        campos = [
+            ("Columna fecha:", "fecha"),
+            ("Columna descripción:", "descripcion"),
+            ("Columna cantidad:", "cantidad"),
+            ("Columna categoría (opcional):", ""),
+            ("Formato de fecha:", "%Y-%m-%d"),
+            ("Delimitador:", ","),
+            ("Separador decimal:", "."),
+        ]
+        entradas = []
+        for fila, (etiqueta, valor) in enumerate(campos):
+            tk.Label(
+                form_frame,
+                text=etiqueta,
+                font=('SF Pro Display', 10),
+                bg='#FFFFFF',
+                fg='#4A5568'
+            ).grid(row=fila, column=0, sticky=tk.W, pady=4)
+            entrada = tk.Entry(form_frame, font=('SF Pro Display', 10), width=20)
+            entrada.insert(0, valor)
+            entrada.grid(row=fila, column=1, sticky=tk.W, padx=(10, 0), pady=4)
+            entradas.append(entrada)
+
+        tk.Label(
+            form_frame,
+            text="Tipo:",
+            font=('SF Pro Display', 10),
+            bg='#FFFFFF',
+            fg='#4A5568'
+        ).grid(row=len(campos), column=0, sticky=tk.W, pady=4)
+        combo_tipo = ttk.Combobox(form_frame, values=['auto', 'gastos', 'ingresos'],
+                                  state='readonly', width=17)
+        combo_tipo.set('auto')
+        combo_tipo.grid(row=len(campos), column=1, sticky=tk.W, padx=(10, 0), pady=4)
+
+        # Evita lanzar otra importación mientras la anterior sigue en curso
+        estado = {'importando': False}
+
+        def importar():
+            if estado['importando']:
+                return
+
+            col_fecha, col_desc, col_cantidad, col_categoria, formato, delimitador, decimal = [
+                entrada.get().strip() for entrada in entradas
+            ]
+            columnas = {'fecha': col_fecha, 'descripcion': col_desc, 'cantidad': col_cantidad}
+            if col_categoria:
+                columnas['categoria'] = col_categoria
+
+            config = ConfiguracionCSV(
+                columnas=columnas,
+                formato_fecha=formato,
+                separador_decimal=decimal,
+                delimitador=delimitador,
+                tipo=combo_tipo.get()
+            )
+            try:
+                config.validar()
+            except ValueError as e:
+                messagebox.showerror("Error", str(e), parent=ventana)
+                return
+
+            def consulta():
+                # Se importa en el pool con una Database propia en modo
+                # carga_masiva; la de la interfaz no cambia de perfil
+                cambios = set()
+                with Database(usuario_id=self.usuario_id, perfil='carga_masiva',
+                              almacenamiento=self.db.almacenamiento) as db_importacion:
+                    db_importacion.cambios.suscribir(cambios.add)
+                    resultado = importar_csv(db_importacion, ruta, config)
+                return resultado, cambios
+
+            def al_terminar(datos):
+                resultado, cambios = datos
+                # Los cambios del lote se publican en la Database de la
+                # interfaz, desde el hilo de Tk: invalidan la caché y marcan
+                # las vistas de los meses importados
+                for cambio in cambios:
+                    self.db.cambios.publicar(*cambio)
+
+                if ventana.winfo_exists():
+                    ventana.destroy()
+
+                mensaje = (f"Gastos importados: {resultado['gastos']}\n"
+                           f"Ingresos importados: {resultado['ingresos']}\n"
+                           f"Filas con error: {resultado['total_errores']}")
+                for linea, error in resultado['errores'][:5]:
+                    mensaje += f"\n  • Línea {linea}: {error}"
+                messagebox.showinfo("✓ Importación completada", mensaje)
+
+            def al_fallar(error):
+                # Configuración inválida (ValueError), fichero ilegible
+                # (OSError) o fallo de la base de datos (sqlite3.Error)
+                estado['importando'] = False
+                messagebox.showerror("Error", f"No se pudo importar el fichero:\n{error}",
+                                     parent=ventana if ventana.winfo_exists() else self.root)
+
+            estado['importando'] = True
+            self.ejecutor.ejecutar((id(ventana), 'importar_csv'), consulta, al_terminar,
+                                   al_fallar=al_fallar, ocupado=ventana)
+
+        btn_frame = tk.Frame(ventana, bg='#FFFFFF')
+        btn_frame.pack(fill=tk.X, padx=20, pady=(0, 15))
+
+        crear_boton_moderno(btn_frame, "Importar", importar, 'success').pack(side=tk.LEFT, padx=5)
+        crear_boton_moderno(btn_frame, "✖ Cancelar", ventana.destroy, 'secondary').pack(side=tk.LEFT, padx=5)
+
     def cerrar_sesion(self):
         """Cierra la sesión del usuario actual."""
         respuesta = messagebox.askyesno(
@@ -260,7 +489,10 @@ class AplicacionGastos:
         )
 
         if respuesta:
-            # Cerrar la ventana actual
+            # Descartar consultas en curso, guardar los accesos pendientes
+            # y cerrar la ventana actual
+            self.ejecutor.cerrar()
+            self.db.volcar_accesos()
             self.root.destroy()
 
             # Crear nueva ventana para login
@@ -0,0 +1,234 @@
+"""
+Caché de resultados de consultas de Database.
+
+Las vistas piden una y otra vez los mismos agregados (el balance del mes en
+cada recarga, las categorías en cada pestaña). CacheConsultas guarda el
+resultado de cada método por sus argumentos, con un tamaño máximo y
+expulsión LRU, y lo invalida con los avisos de cambio que Database publica
+en cada escritura (ver eventos.py).
+
+Cada entrada depende de entidades ('gastos', 'ingresos', 'categorias') en el
+periodo de sus argumentos anio y mes. Un cambio de gastos en marzo de 2026
+invalida solo lo que depende de gastos de marzo de 2026, de todo 2026 o de
+todos los años.
+
+Instantanea cubre el caso contrario: un único resultado que otros procesos
+pueden cambiar sin avisar (las estadísticas de usuarios.db) y que se da por
+bueno durante unos segundos.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+
+# Entradas por defecto de la caché de cada Database
+MAX_ENTRADAS = 256
+
+# Segundos que una Instantanea da por bueno su valor
+TTL_INSTANTANEA = 60.0
+
+
+class CacheConsultas:
+    """Caché LRU de resultados con invalidación por dependencias."""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS):
+        """
+        Args:
+            max_entradas: Número máximo de resultados guardados
+        """
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, Tuple]]" = OrderedDict()
+        # Dependencia (entidad, anio, mes) -> claves que dependen de ella
+        self._dependientes: Dict[Tuple, Set[Hashable]] = {}
+        # Cambia con cada invalidación; un resultado calculado mientras tanto
+        # puede estar desfasado y no se guarda
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave: Hashable, calcular: Callable[[], Any],
+                dependencias: Iterable[Tuple]) -> Any:
+        """
+        Devuelve el resultado guardado o lo calcula y lo guarda.
+
+        Args:
+            clave: Identifica la consulta (método y argumentos)
+            calcular: Función que ejecuta la consulta
+            dependencias: Tuplas (entidad, anio, mes) de las que depende el
+                resultado; anio o mes None significa "todos"
+
+        Returns:
+            Copia profunda del resultado, para que quien lo reciba pueda
+            modificarlo (también sus listas o diccionarios internos)
+        """
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return copy.deepcopy(self._entradas[clave][0])
+            self.fallos += 1
+            generacion = self._generacion
+
+        # La consulta se hace fuera del lock para no bloquear a otros hilos
+        resultado = calcular()
+
+        with self._lock:
+            if generacion == self._generacion:
+                self._guardar(clave, resultado, tuple(dependencias))
+        return copy.deepcopy(resultado)
+
+    def _guardar(self, clave, resultado, dependencias):
+        self._entradas[clave] = (resultado, dependencias)
+        self._entradas.move_to_end(clave)
+        for dependencia in dependencias:
+            self._dependientes.setdefault(dependencia, set()).add(clave)
+
+        while len(self._entradas) > self.max_entradas:
+            antigua, (_, dependencias_antigua) = self._entradas.popitem(last=False)
+            self._olvidar(antigua, dependencias_antigua)
+
+    def _olvidar(self, clave, dependencias):
+        """Quita una clave de los índices de dependencias."""
+        for dependencia in dependencias:
+            claves = self._dependientes.get(dependencia)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._dependientes[dependencia]
+
+    def invalidar(self, cambio):
+        """
+        Descarta los resultados afectados por un cambio.
+
+        Se suscribe al BusCambios de Database.
+
+        Args:
+            cambio: Cambio (entidad, anio, mes) publicado por una escritura
+        """
+        entidad, anio, mes = cambio
+        with self._lock:
+            self._generacion += 1
+
+            if anio is None:
+                # Cambio sin periodo: afecta a todo lo que dependa de la entidad
+                afectadas = [d for d in self._dependientes if d[0] == entidad]
+            else:
+                afectadas = [(entidad, anio, mes), (entidad, anio, None),
+                             (entidad, None, mes), (entidad, None, None)]
+                if mes is None:
+                    afectadas += [d for d in self._dependientes if d[:2] == (entidad, anio)]
+
+            claves = set()
+            for dependencia in afectadas:
+                claves |= self._dependientes.get(dependencia, set())
+
+            for clave in claves:
+                _, dependencias = self._entradas.pop(clave)
+                self._olvidar(clave, dependencias)
+            self.invalidaciones += len(claves)
+
+    def vaciar(self):
+        """Descarta todos los resultados (por ejemplo, tras cambios externos)."""
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+            self._dependientes.clear()
+
+    def estadisticas(self) -> Dict[str, int]:
+        """
+        Obtiene los contadores de uso de la caché.
+
+        Returns:
+            Diccionario con aciertos, fallos, invalidaciones y entradas
+        """
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'invalidaciones': self.invalidaciones,
+                'entradas': len(self._entradas),
+            }
+
+
+class Instantanea:
+    """Último valor calculado de una consulta, válido durante `ttl` segundos."""
+
+    def __init__(self, ttl: float = TTL_INSTANTANEA):
+        """
+        Args:
+            ttl: Segundos que se reutiliza el valor antes de recalcularlo
+        """
+        self.ttl = ttl
+        self._valor = None
+        self._caduca = 0.0
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, calcular: Callable[[], Any], refrescar: bool = False) -> Any:
+        """
+        Devuelve el valor guardado si no ha caducado, o lo calcula y lo guarda.
+
+        Args:
+            calcular: Función que ejecuta la consulta
+            refrescar: Recalcular aunque el valor siga vigente
+
+        Returns:
+            Copia profunda del valor
+        """
+        with self._lock:
+            if not refrescar and time.monotonic() < self._caduca:
+                return copy.deepcopy(self._valor)
+            generacion = self._generacion
+
+        valor = calcular()
+
+        with self._lock:
+            if generacion == self._generacion:
+                self._valor = valor
+                self._caduca = time.monotonic() + self.ttl
+        return copy.deepcopy(valor)
+
+    def invalidar(self):
+        """Descarta el valor (por ejemplo, tras una escritura que lo cambia)."""
+        with self._lock:
+            self._generacion += 1
+            self._caduca = 0.0
+
+
+def cacheada(*entidades: str):
+    """
+    Guarda en self.cache el resultado de un método de Database.
+
+    Las dependencias se forman con las entidades indicadas y los argumentos
+    anio y mes del método, si los tiene.
+
+    Args:
+        entidades: 'gastos', 'ingresos' y/o 'categorias'
+    """
+    def decorador(metodo):
+        firma = inspect.signature(metodo)
+
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            argumentos = firma.bind(self, *args, **kwargs)
+            argumentos.apply_defaults()
+            valores = dict(argumentos.arguments)
+            del valores['self']
+
+            clave = (metodo.__name__,) + tuple(valores.items())
+            anio, mes = valores.get('anio'), valores.get('mes')
+            dependencias = [(entidad, anio, mes) for entidad in entidades]
+
+            return self.cache.obtener(clave, lambda: metodo(self, *args, **kwargs), dependencias)
+
+        return envoltura
+
+    return decorador
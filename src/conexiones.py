@@ -0,0 +1,279 @@
+"""
+Gestión de conexiones persistentes a SQLite para FinanzApp.
+
+Cada instancia de Database posee un GestorConexiones que mantiene abiertas
+las conexiones a sus ficheros (la BD de finanzas del usuario y usuarios.db)
+en lugar de abrir y cerrar una conexión nueva en cada consulta.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Tuple
+
+
+# Perfiles de rendimiento aplicados al abrir cada conexión.
+# cache_size negativo se expresa en KiB; mmap_size en bytes.
+PERFILES = {
+    # Uso normal de la aplicación: lectores y escritor no se bloquean (WAL)
+    # y cada commit no fuerza un fsync completo.
+    'interactivo': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # Importaciones grandes: se sacrifica durabilidad ante cortes de luz a
+    # cambio de velocidad; la BD sigue siendo consistente gracias al WAL.
+    'carga_masiva': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # Informes y estadísticas que recorren muchos datos sin escribir.
+    # query_only va al final: a partir de ahí cualquier escritura falla.
+    'solo_lectura': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'query_only': 'ON',
+    },
+}
+
+PERFIL_POR_DEFECTO = 'interactivo'
+
+
+class ConexionPersistente(sqlite3.Connection):
+    """
+    Conexión SQLite que sobrevive a close().
+
+    El código existente sigue el patrón get_connection() ... conn.close();
+    aquí close() solo descarta la transacción pendiente (igual que hacía el
+    cierre real) y deja la conexión abierta para reutilizarla. El cierre
+    definitivo lo hace el gestor con cerrar().
+    """
+
+    # Generación del gestor en la que se abrió
+    generacion = 0
+
+    def close(self):
+        """Descarta cambios sin confirmar y devuelve la conexión al gestor."""
+        if self.in_transaction:
+            self.rollback()
+
+    def cerrar(self):
+        """Cierra realmente la conexión."""
+        super().close()
+
+
+class GestorConexiones:
+    """
+    Mantiene una conexión abierta por fichero de base de datos y por hilo.
+
+    Las conexiones de sqlite3 no deben compartirse entre hilos mientras se
+    usan, así que cada hilo recibe la suya; todas quedan registradas para
+    poder cerrarlas juntas con cerrar().
+
+    Un hilo nunca cierra la conexión de otro mientras se usa: al cambiar de
+    perfil o de instrumentación sube la generación del gestor, el hilo que
+    hace el cambio cierra solo las suyas y cada otro hilo reabre la propia en
+    su siguiente obtener().
+
+    Las conexiones de los hilos que ya han terminado se cierran cada vez que
+    se abre una conexión nueva, para que los hilos de vida corta no dejen
+    ficheros abiertos hasta cerrar la Database.
+    """
+
+    def __init__(self, timeout: float = 10, perfil: str = PERFIL_POR_DEFECTO):
+        """
+        Inicializa el gestor.
+
+        Args:
+            timeout: Segundos de espera cuando la base de datos está bloqueada
+            perfil: Nombre del perfil de rendimiento (ver PERFILES)
+
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de rendimiento desconocido: {perfil}")
+
+        self.timeout = timeout
+        self.perfil = perfil
+        # Instrumentación activa (ver instrumentacion.py); None = desactivada
+        self.instrumentacion = None
+        self._conexiones: Dict[Tuple[int, str], ConexionPersistente] = {}
+        self._lock = threading.Lock()
+        # Las conexiones de una generación anterior se reabren al pedirlas
+        self._generacion = 0
+
+    def _abrir(self, ruta: str) -> ConexionPersistente:
+        """Abre una conexión nueva al fichero indicado y le aplica el perfil."""
+        instrumentacion = self.instrumentacion
+        if instrumentacion is not None:
+            try:
+                from .instrumentacion import ConexionInstrumentada
+            except ImportError:
+                from instrumentacion import ConexionInstrumentada
+            factory = ConexionInstrumentada
+        else:
+            factory = ConexionPersistente
+
+        conn = sqlite3.connect(
+            ruta,
+            timeout=self.timeout,
+            factory=factory,
+            check_same_thread=False,
+            uri=True
+        )
+
+        if instrumentacion is not None:
+            conn.instrumentacion = instrumentacion
+            instrumentacion.conexion_abierta(ruta)
+
+        for pragma, valor in PERFILES[self.perfil].items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+
+        return conn
+
+    def establecer_perfil(self, perfil: str):
+        """
+        Cambia el perfil de rendimiento.
+
+        Se cierran las conexiones del hilo actual; las de otros hilos se
+        reabren con el nuevo perfil la próxima vez que las pidan, así que una
+        consulta en curso en otro hilo termina con el perfil anterior.
+
+        Args:
+            perfil: Nombre del perfil de rendimiento (ver PERFILES)
+
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de rendimiento desconocido: {perfil}")
+
+        if perfil != self.perfil:
+            self.perfil = perfil
+            self._renovar()
+
+    def establecer_instrumentacion(self, instrumentacion):
+        """
+        Activa o desactiva la medición de las sentencias SQL.
+
+        Igual que al cambiar de perfil, las conexiones del hilo actual se
+        cierran y las de otros hilos se reabren con (o sin) instrumentación
+        la próxima vez que las pidan.
+
+        Args:
+            instrumentacion: Instrumentacion donde anotar, o None para desactivarla
+        """
+        if instrumentacion is not self.instrumentacion:
+            self.instrumentacion = instrumentacion
+            self._renovar()
+
+    def _renovar(self):
+        """Deja obsoletas las conexiones abiertas y cierra las del hilo actual."""
+        hilo = threading.get_ident()
+        with self._lock:
+            self._generacion += 1
+            claves = [clave for clave in self._conexiones if clave[0] == hilo]
+            conexiones = [self._conexiones.pop(clave) for clave in claves]
+
+        for conn in conexiones:
+            conn.cerrar()
+
+    def leer_pragmas(self, ruta: str) -> Dict[str, object]:
+        """
+        Lee los valores efectivos de los pragmas del perfil en una conexión.
+
+        Args:
+            ruta: Ruta del fichero de base de datos
+
+        Returns:
+            Diccionario {pragma: valor actual}; None si la BD no lo admite
+            (mmap_size en las BDs en memoria)
+        """
+        conn = self.obtener(ruta)
+        valores = {}
+        for pragma in PERFILES[self.perfil]:
+            fila = conn.execute(f"PRAGMA {pragma}").fetchone()
+            valores[pragma] = fila[0] if fila else None
+        return valores
+
+    def obtener(self, ruta: str) -> ConexionPersistente:
+        """
+        Obtiene la conexión del hilo actual al fichero indicado.
+
+        Args:
+            ruta: Ruta del fichero de base de datos
+
+        Returns:
+            Conexión abierta, sin transacción pendiente
+        """
+        # current_thread() (y no get_ident()) da de alta en threading.enumerate()
+        # también a los hilos no creados con threading, para no tomarlos por terminados
+        clave = (threading.current_thread().ident, ruta)
+        obsoleta = None
+
+        with self._lock:
+            conn = self._conexiones.get(clave)
+            if conn is not None and conn.generacion != self._generacion:
+                # Es de este hilo, así que nadie la está usando ahora
+                obsoleta, conn = conn, None
+            if conn is None:
+                huerfanas = self._quitar_hilos_terminados()
+                conn = self._abrir(ruta)
+                conn.generacion = self._generacion
+                self._conexiones[clave] = conn
+            else:
+                huerfanas = []
+
+        if obsoleta is not None:
+            huerfanas.append(obsoleta)
+        for huerfana in huerfanas:
+            huerfana.cerrar()
+
+        # Cada llamada empieza limpia, como si la conexión fuera nueva
+        if conn.in_transaction:
+            conn.rollback()
+
+        return conn
+
+    def _quitar_hilos_terminados(self):
+        """Saca del registro las conexiones de hilos que ya no existen (llamar con _lock)."""
+        vivos = {hilo.ident for hilo in threading.enumerate()}
+        claves = [clave for clave in self._conexiones if clave[0] not in vivos]
+        return [self._conexiones.pop(clave) for clave in claves]
+
+    def cerrar_ruta(self, ruta: str):
+        """
+        Cierra todas las conexiones (de cualquier hilo) a un fichero.
+
+        Args:
+            ruta: Ruta del fichero de base de datos
+        """
+        with self._lock:
+            claves = [clave for clave in self._conexiones if clave[1] == ruta]
+            conexiones = [self._conexiones.pop(clave) for clave in claves]
+
+        for conn in conexiones:
+            conn.cerrar()
+
+    def cerrar(self):
+        """Cierra todas las conexiones abiertas por el gestor."""
+        with self._lock:
+            conexiones = list(self._conexiones.values())
+            self._conexiones.clear()
+
+        for conn in conexiones:
+            conn.cerrar()
+
+    def total_abiertas(self) -> int:
+        """Devuelve el número de conexiones abiertas actualmente."""
+        with self._lock:
+            return len(self._conexiones)
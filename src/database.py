@@ -6,184 +6,315 @@ import sqlite3
 import hashlib
 import os
 from datetime import datetime
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Iterable, Iterator, Callable
 
 # Importar modelos POO
 try:
     from .models import Usuario, Gasto, Categoria, Ingreso, GrupoGasto
+    from .conexiones import GestorConexiones, PERFIL_POR_DEFECTO, PERFILES
+    from . import migraciones
+    from .migraciones import INDICES_FINANZAS
+    from .eventos import BusCambios
+    from .cache import CacheConsultas, Instantanea, cacheada
+    from . import instrumentacion as instr
+    from .almacenamiento import Almacenamiento, ROOT_DIR, DATA_DIR
+    from .almacenamiento import por_defecto as almacenamiento_por_defecto
+    from .analitica import analizar_usuarios
 except ImportError:
     from models import Usuario, Gasto, Categoria, Ingreso, GrupoGasto
-
-
-# Obtener el directorio raíz del proyecto
-ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(ROOT_DIR, "data")
+    from conexiones import GestorConexiones, PERFIL_POR_DEFECTO, PERFILES
+    import migraciones
+    from migraciones import INDICES_FINANZAS
+    from eventos import BusCambios
+    from cache import CacheConsultas, Instantanea, cacheada
+    import instrumentacion as instr
+    from almacenamiento import Almacenamiento, ROOT_DIR, DATA_DIR
+    from almacenamiento import por_defecto as almacenamiento_por_defecto
+    from analitica import analizar_usuarios
+
+# Tamaño por defecto de cada transacción en las inserciones por lotes
+TAMANO_LOTE = 1000
+
+# Filas por página en los listados paginados
+TAMANO_PAGINA = 200
+
+# Segundos que se reutilizan las estadísticas de administración
+TTL_ESTADISTICAS_ADMIN = 30.0
+
+
+def _validar_fecha(fecha, fechas: Dict[str, Tuple[int, int]]) -> Tuple[str, int, int]:
+    """
+    Valida una fecha YYYY-MM-DD y obtiene su mes y año.
+
+    Un año de movimientos solo tiene unas pocas fechas distintas, así que el
+    resultado se memoriza en `fechas` para no repetir strptime en cada fila.
+
+    Returns:
+        Tupla (fecha, mes, anio)
+
+    Raises:
+        ValueError: Si la fecha no tiene el formato YYYY-MM-DD
+    """
+    if fecha is None:
+        fecha = datetime.now().strftime("%Y-%m-%d")
+
+    mes_anio = fechas.get(fecha)
+    if mes_anio is None:
+        fecha_obj = datetime.strptime(fecha, "%Y-%m-%d")
+        mes_anio = (fecha_obj.month, fecha_obj.year)
+        fechas[fecha] = mes_anio
+
+    return fecha, mes_anio[0], mes_anio[1]
+
+
+def _validar_texto(valor, campo: str) -> str:
+    """Comprueba que un campo de texto obligatorio no esté vacío."""
+    if not isinstance(valor, str) or not valor.strip():
+        raise ValueError(f"{campo} vacío")
+    return valor
+
+
+def _validar_cantidad(valor) -> float:
+    """Convierte la cantidad a float y comprueba que sea positiva."""
+    cantidad = float(valor)
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser mayor que 0")
+    return cantidad
+
+
+def _escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE (con ESCAPE '\\') para buscar el texto tal cual."""
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _consultar_pagina(cursor, select: str, filtros: str, params: list, orden: List[str],
+                      limite: int, despues: tuple = None, antes: tuple = None) -> List[Tuple]:
+    """
+    Lee una página de un listado ordenado de mayor a menor por `orden`.
+
+    La página se localiza por clave (keyset) y no con OFFSET: `despues` es la
+    clave de la última fila ya mostrada y `antes` la de la primera. Con un
+    índice que entregue las filas en ese orden, el coste de cada página no
+    depende de cuántas filas haya antes de ella.
+
+    Args:
+        cursor: Cursor de la BD
+        select: Parte SELECT ... FROM ... de la consulta
+        filtros: Condiciones WHERE fijas
+        params: Parámetros de los filtros
+        orden: Columnas que forman la clave, de la más a la menos significativa
+        limite: Número máximo de filas
+        despues: Clave de la fila tras la que empieza la página
+        antes: Clave de la fila ante la que termina la página
+
+    Returns:
+        Filas de la página, en orden descendente
+    """
+    columnas = ', '.join(orden)
+    marcadores = ', '.join('?' * len(orden))
+    params = list(params)
+
+    if despues is not None:
+        filtros += f" AND ({columnas}) < ({marcadores})"
+        params.extend(despues)
+    elif antes is not None:
+        filtros += f" AND ({columnas}) > ({marcadores})"
+        params.extend(antes)
+
+    # Hacia atrás se leen en orden ascendente y se dan la vuelta
+    direccion = 'ASC' if antes is not None else 'DESC'
+    cursor.execute(
+        f"{select} WHERE {filtros} "
+        f"ORDER BY {', '.join(f'{col} {direccion}' for col in orden)} LIMIT ?",
+        params + [limite]
+    )
+    filas = cursor.fetchall()
+    if antes is not None:
+        filas.reverse()
+    return filas
 
 
 class Database:
     """Clase para manejar todas las operaciones de base de datos."""
 
-    # Base de datos principal solo para usuarios
-    USUARIOS_DB = os.path.join(DATA_DIR, "usuarios.db")
-
-    # Directorio para las bases de datos de usuarios
-    USUARIOS_DATA_DIR = os.path.join(DATA_DIR, "usuarios")
+    # Métodos que no se miden al activar la instrumentación
+    NO_INSTRUMENTAR = ('get_connection', 'get_usuarios_connection', 'close',
+                       'activar_instrumentacion', 'desactivar_instrumentacion')
 
-    def __init__(self, usuario_id: int = None):
+    def __init__(self, usuario_id: int = None, perfil: str = PERFIL_POR_DEFECTO,
+                 instrumentacion: 'instr.Instrumentacion' = None,
+                 almacenamiento: Almacenamiento = None):
         """
         Inicializa la conexión a la base de datos.
+
+        Args:
+            usuario_id: ID del usuario autenticado (None para acceso solo a usuarios)
+            perfil: Perfil de rendimiento de SQLite ('interactivo', 'carga_masiva'
+                o 'solo_lectura')
+            instrumentacion: Instrumentacion donde medir métodos y consultas. Si
+                es None se usa la de FINANZAPP_INSTRUMENTACION, si está definida
+            almacenamiento: Dónde están las bases de datos (ver almacenamiento.py).
+                Si es None se usa el almacenamiento por defecto (data/)
         """
         self.usuario_id = usuario_id
 
-        # Crear directorios si no existen
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
-        if not os.path.exists(self.USUARIOS_DATA_DIR):
-            os.makedirs(self.USUARIOS_DATA_DIR)
+        # Base de datos principal de usuarios y directorio de las de cada usuario
+        self.almacenamiento = almacenamiento or almacenamiento_por_defecto()
+        self.USUARIOS_DB = self.almacenamiento.ruta_usuarios
+        self.USUARIOS_DATA_DIR = self.almacenamiento.directorio_usuarios
+
+        # Conexiones persistentes, reutilizadas por todos los métodos. Se
+        # abren con el perfil por defecto para poder migrar el esquema; el
+        # perfil pedido se aplica al final (solo_lectura no permite escribir)
+        self._conexiones = GestorConexiones(timeout=10)
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de rendimiento desconocido: {perfil}")
+
+        # Medición opcional de tiempos (ver instrumentacion.py)
+        self.instrumentacion = None
+        self._metodos_instrumentados = []
+        instrumentacion = instrumentacion or instr.desde_entorno()
+        if instrumentacion is not None:
+            self.activar_instrumentacion(instrumentacion)
+
+        # Avisos de cambios para las vistas (ver eventos.py)
+        self.cambios = BusCambios()
+
+        # Resultados de consultas agregadas; cada escritura invalida lo suyo
+        self.cache = CacheConsultas()
+        self.cambios.suscribir(self.cache.invalidar)
+
+        # Estadísticas de usuarios.db; otras instancias pueden cambiarlas
+        # sin avisar, así que caducan a los TTL_ESTADISTICAS_ADMIN segundos
+        self.estadisticas_admin = Instantanea(TTL_ESTADISTICAS_ADMIN)
 
         # Base de datos del usuario (si hay usuario autenticado)
         if usuario_id:
-            self.db_name = os.path.join(self.USUARIOS_DATA_DIR, f"usuario_{usuario_id}_finanzas.db")
+            self.db_name = self.almacenamiento.ruta_usuario(usuario_id)
         else:
             self.db_name = None
 
         # Siempre crear tablas de usuarios en la DB principal
+        self.almacenamiento.preparar(self.USUARIOS_DB, 'usuarios')
         self.create_usuarios_table()
 
         # Si hay usuario, crear sus tablas de finanzas
         if usuario_id:
+            self.almacenamiento.preparar(self.db_name, 'finanzas')
             self.create_finanzas_tables()
-            self.migrar_metodo_pago()  # Migrar columna si no existe
+
+        self._conexiones.establecer_perfil(perfil)
 
     def get_usuarios_connection(self):
-        """Obtiene una conexión a la base de datos de usuarios."""
-        return sqlite3.connect(self.USUARIOS_DB, timeout=10)
+        """Obtiene la conexión persistente a la base de datos de usuarios."""
+        return self._conexiones.obtener(self.USUARIOS_DB)
 
     def get_connection(self):
-        """Obtiene una conexión a la base de datos de finanzas del usuario."""
+        """Obtiene la conexión persistente a la base de datos de finanzas del usuario."""
         if not self.db_name:
             raise Exception("No hay usuario autenticado")
-        return sqlite3.connect(self.db_name, timeout=10)
+        return self._conexiones.obtener(self.db_name)
 
-    def create_usuarios_table(self):
-        """Crea la tabla de usuarios en la base de datos principal."""
-        conn = self.get_usuarios_connection()
-        cursor = conn.cursor()
+    def obtener_perfil(self) -> Dict:
+        """
+        Obtiene el perfil de rendimiento activo y los valores efectivos de SQLite.
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                rol TEXT DEFAULT 'usuario',
-                activo INTEGER DEFAULT 1,
-                fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ultimo_acceso TIMESTAMP
-            )
-        ''')
+        Returns:
+            Diccionario con el nombre del perfil y los pragmas de cada base de datos
+        """
+        perfil = {
+            'perfil': self._conexiones.perfil,
+            'usuarios': self._conexiones.leer_pragmas(self.USUARIOS_DB)
+        }
+        if self.db_name:
+            perfil['finanzas'] = self._conexiones.leer_pragmas(self.db_name)
+        return perfil
 
-        # Migrar columnas si no existen
-        cursor.execute("PRAGMA table_info(usuarios)")
-        columnas = [col[1] for col in cursor.fetchall()]
+    def establecer_perfil(self, perfil: str):
+        """
+        Cambia el perfil de rendimiento de las conexiones.
 
-        if 'rol' not in columnas:
-            cursor.execute("ALTER TABLE usuarios ADD COLUMN rol TEXT DEFAULT 'usuario'")
-        if 'activo' not in columnas:
-            cursor.execute("ALTER TABLE usuarios ADD COLUMN activo INTEGER DEFAULT 1")
-        if 'ultimo_acceso' not in columnas:
-            cursor.execute("ALTER TABLE usuarios ADD COLUMN ultimo_acceso TIMESTAMP")
+        Args:
+            perfil: 'interactivo', 'carga_masiva' o 'solo_lectura'
 
-        conn.commit()
-        conn.close()
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        self._conexiones.establecer_perfil(perfil)
 
-    def create_finanzas_tables(self):
-        """Crea las tablas de finanzas en la base de datos del usuario."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def activar_instrumentacion(self, instrumentacion: 'instr.Instrumentacion' = None) -> 'instr.Instrumentacion':
+        """
+        Empieza a medir los métodos públicos y las sentencias SQL.
 
-        # Tabla de categorías (sin usuario_id, ya que es base de datos propia)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categorias (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT UNIQUE NOT NULL,
-                descripcion TEXT
-            )
-        ''')
+        Args:
+            instrumentacion: Dónde anotar las mediciones (por defecto una nueva);
+                se puede compartir entre varias instancias
 
-        # Tabla de gastos (sin usuario_id)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gastos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                descripcion TEXT NOT NULL,
-                cantidad REAL NOT NULL,
-                categoria_id INTEGER NOT NULL,
-                fecha DATE NOT NULL,
-                mes INTEGER NOT NULL,
-                anio INTEGER NOT NULL,
-                metodo_pago TEXT DEFAULT 'tarjeta',
-                FOREIGN KEY (categoria_id) REFERENCES categorias(id)
-            )
-        ''')
+        Returns:
+            La instrumentación activa, para leer su informe()
+        """
+        self.desactivar_instrumentacion()
+        self.instrumentacion = instrumentacion or instr.Instrumentacion()
+        self._conexiones.establecer_instrumentacion(self.instrumentacion)
+        self._metodos_instrumentados = instr.instrumentar_metodos(
+            self, self.instrumentacion, excluir=self.NO_INSTRUMENTAR
+        )
+        return self.instrumentacion
+
+    def desactivar_instrumentacion(self):
+        """Deja de medir; las conexiones vuelven a ser las normales."""
+        instr.desinstrumentar_metodos(self, self._metodos_instrumentados)
+        self._metodos_instrumentados = []
+        self._conexiones.establecer_instrumentacion(None)
+        self.instrumentacion = None
+
+    def close(self):
+        """Cierra todas las conexiones abiertas por esta instancia."""
+        self._conexiones.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
 
-        # Tabla de ingresos (sin usuario_id)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ingresos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                descripcion TEXT NOT NULL,
-                cantidad REAL NOT NULL,
-                fuente TEXT NOT NULL,
-                fecha DATE NOT NULL,
-                mes INTEGER NOT NULL,
-                anio INTEGER NOT NULL
-            )
-        ''')
+    def create_usuarios_table(self):
+        """
+        Crea o actualiza el esquema de la base de datos de usuarios.
 
-        conn.commit()
-
-        # Insertar categorías por defecto si no existen
-        categorias_default = [
-            ("Alimentación", "Gastos en comida y bebidas"),
-            ("Transporte", "Gastos de transporte y combustible"),
-            ("Servicios", "Facturas de luz, agua, internet, etc."),
-            ("Entretenimiento", "Ocio, salidas, hobbies"),
-            ("Salud", "Médicos, medicamentos, seguros"),
-            ("Educación", "Cursos, libros, materiales"),
-            ("Hogar", "Alquiler, mantenimiento, muebles"),
-            ("Otros", "Gastos varios")
-        ]
+        Si el esquema ya está al día solo se lee PRAGMA user_version.
+        """
+        migraciones.migrar_usuarios(self.get_usuarios_connection())
 
-        for nombre, descripcion in categorias_default:
-            try:
-                cursor.execute(
-                    "INSERT INTO categorias (nombre, descripcion) VALUES (?, ?)",
-                    (nombre, descripcion)
-                )
-            except sqlite3.IntegrityError:
-                # La categoría ya existe
-                pass
+    def create_finanzas_tables(self):
+        """
+        Crea o actualiza el esquema de la base de datos de finanzas del usuario.
 
-        conn.commit()
-        conn.close()
+        Si el esquema ya está al día solo se lee PRAGMA user_version.
+        """
+        migraciones.migrar_finanzas(self.get_connection())
 
-    def migrar_metodo_pago(self):
-        """Agrega la columna metodo_pago a la tabla gastos si no existe."""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+    def sincronizar_indices(self, cursor):
+        """
+        Deja los índices de la BD de finanzas igual que INDICES_FINANZAS.
 
-            # Verificar si la columna ya existe
-            cursor.execute("PRAGMA table_info(gastos)")
-            columnas = [col[1] for col in cursor.fetchall()]
+        Args:
+            cursor: Cursor sobre la base de datos de finanzas
+        """
+        migraciones.sincronizar_indices(cursor)
 
-            if 'metodo_pago' not in columnas:
-                cursor.execute("ALTER TABLE gastos ADD COLUMN metodo_pago TEXT DEFAULT 'tarjeta'")
-                conn.commit()
-                print("✅ Columna metodo_pago agregada exitosamente")
+    def obtener_version_esquema(self) -> Dict[str, int]:
+        """
+        Obtiene la versión de esquema (PRAGMA user_version) de cada base de datos.
 
-            conn.close()
-        except Exception as e:
-            print(f"Error al migrar metodo_pago: {e}")
+        Returns:
+            Diccionario {'usuarios': version, 'finanzas': version}
+        """
+        versiones = {'usuarios': migraciones.version_actual(self.get_usuarios_connection())}
+        if self.db_name:
+            versiones['finanzas'] = migraciones.version_actual(self.get_connection())
+        return versiones
 
     def agregar_gasto(self, descripcion: str, cantidad: float, categoria_id: int,
                       fecha: str = None, metodo_pago: str = 'tarjeta') -> bool:
@@ -218,11 +349,107 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.cambios.publicar('gastos', anio, mes)
             return True
         except Exception as e:
             print(f"Error al agregar gasto: {e}")
             return False
 
+    def _insertar_lote(self, entidad: str, sql: str, filas: Iterable, preparar: Callable,
+                       tamano_lote: int) -> Dict:
+        """
+        Inserta filas validadas en transacciones de `tamano_lote` filas.
+
+        Cada fila se valida con `preparar`; las inválidas se anotan como error
+        y no detienen el resto. Si un lote falla al insertarse, se repite fila
+        a fila para identificar cuáles son las que fallan. Al terminar se
+        publica un cambio por cada (anio, mes) que haya recibido filas.
+
+        Args:
+            entidad: Tabla afectada ('gastos' o 'ingresos'), para el aviso de cambios
+            sql: Sentencia INSERT con parámetros (mes y anio en las posiciones 4 y 5)
+            filas: Iterable (o generador) de filas de entrada
+            preparar: Función que convierte una fila de entrada en los parámetros del INSERT
+            tamano_lote: Número máximo de filas por transacción
+
+        Returns:
+            Diccionario {'insertados': int, 'errores': [(indice, mensaje), ...]}
+        """
+        resultado = {'insertados': 0, 'errores': []}
+        periodos = set()
+        conn = self.get_connection()
+
+        def volcar(lote):
+            try:
+                with conn:
+                    conn.executemany(sql, [params for _, params in lote])
+                resultado['insertados'] += len(lote)
+                periodos.update((params[5], params[4]) for _, params in lote)
+            except sqlite3.Error:
+                for indice, params in lote:
+                    try:
+                        with conn:
+                            conn.execute(sql, params)
+                        resultado['insertados'] += 1
+                        periodos.add((params[5], params[4]))
+                    except sqlite3.Error as e:
+                        resultado['errores'].append((indice, str(e)))
+
+        lote = []
+        for indice, fila in enumerate(filas):
+            try:
+                lote.append((indice, preparar(fila)))
+            except (ValueError, TypeError, IndexError) as e:
+                resultado['errores'].append((indice, str(e)))
+                continue
+
+            if len(lote) >= tamano_lote:
+                volcar(lote)
+                lote = []
+
+        if lote:
+            volcar(lote)
+
+        conn.close()
+        for anio, mes in sorted(periodos):
+            self.cambios.publicar(entidad, anio, mes)
+        return resultado
+
+    def agregar_gastos_lote(self, gastos: Iterable, tamano_lote: int = TAMANO_LOTE) -> Dict:
+        """
+        Agrega muchos gastos de una vez.
+
+        Las filas tienen el mismo orden que los argumentos de agregar_gasto:
+        (descripcion, cantidad, categoria_id, fecha[, metodo_pago]). Las filas
+        inválidas (cantidad no positiva, fecha mal formada, categoría
+        inexistente...) se devuelven en 'errores' sin abortar el resto.
+
+        Args:
+            gastos: Iterable o generador de tuplas de gasto
+            tamano_lote: Número máximo de filas por transacción
+
+        Returns:
+            Diccionario {'insertados': int, 'errores': [(indice, mensaje), ...]}
+        """
+        categorias_validas = {cat[0] for cat in self.obtener_categorias()}
+        fechas = {}
+
+        def preparar(fila):
+            descripcion, cantidad, categoria_id, fecha = fila[:4]
+            metodo_pago = fila[4] if len(fila) > 4 else 'tarjeta'
+
+            if categoria_id not in categorias_validas:
+                raise ValueError(f"Categoría inexistente: {categoria_id}")
+            fecha, mes, anio = _validar_fecha(fecha, fechas)
+
+            return (_validar_texto(descripcion, "Descripción"), _validar_cantidad(cantidad),
+                    categoria_id, fecha, mes, anio, metodo_pago)
+
+        return self._insertar_lote('gastos', '''
+            INSERT INTO gastos (descripcion, cantidad, categoria_id, fecha, mes, anio, metodo_pago)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', gastos, preparar, tamano_lote)
+
     def obtener_gastos_mes(self, mes: int, anio: int) -> List[Tuple]:
         """
         Obtiene todos los gastos de un mes específico.
@@ -249,6 +476,70 @@ class Database:
         conn.close()
         return gastos
 
+    def obtener_gastos_mes_pagina(self, mes: int, anio: int, limite: int = TAMANO_PAGINA,
+                                  despues: tuple = None, antes: tuple = None) -> List[Tuple]:
+        """
+        Obtiene una página de los gastos de un mes, del más reciente al más antiguo.
+
+        Args:
+            mes: Número del mes (1-12)
+            anio: Año
+            limite: Número máximo de gastos
+            despues: Clave (fecha, id) del último gasto ya mostrado
+            antes: Clave (fecha, id) del primer gasto ya mostrado
+
+        Returns:
+            Lista de tuplas como las de obtener_gastos_mes
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        gastos = _consultar_pagina(
+            cursor,
+            '''SELECT g.id, g.descripcion, g.cantidad, c.nombre, g.fecha, g.metodo_pago
+               FROM gastos g
+               JOIN categorias c ON g.categoria_id = c.id''',
+            "g.anio = ? AND g.mes = ?", [anio, mes],
+            ['g.fecha', 'g.id'], limite, despues, antes
+        )
+        conn.close()
+        return gastos
+
+    def iterar_gastos_anio(self, anio: int, tamano_bloque: int = 500) -> Iterator[Tuple]:
+        """
+        Recorre los gastos de un año en orden cronológico sin cargarlos todos.
+
+        Usa un único cursor ordenado por (mes, fecha), que el índice
+        idx_gastos_anio_mes_fecha entrega ya ordenado.
+
+        Args:
+            anio: Año
+            tamano_bloque: Filas leídas de SQLite en cada fetchmany
+
+        Yields:
+            Tuplas (id, descripcion, cantidad, categoria, fecha, metodo_pago, mes)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT g.id, g.descripcion, g.cantidad, c.nombre, g.fecha, g.metodo_pago, g.mes
+            FROM gastos g
+            JOIN categorias c ON g.categoria_id = c.id
+            WHERE g.anio = ?
+            ORDER BY g.mes, g.fecha, g.id
+        ''', (anio,))
+
+        try:
+            while True:
+                filas = cursor.fetchmany(tamano_bloque)
+                if not filas:
+                    break
+                yield from filas
+        finally:
+            cursor.close()
+
+    @cacheada('gastos')
     def obtener_total_mes(self, mes: int, anio: int) -> float:
         """
         Obtiene el total de gastos de un mes.
@@ -264,15 +555,16 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT SUM(cantidad)
-            FROM gastos
-            WHERE mes = ? AND anio = ?
-        ''', (mes, anio))
+            SELECT SUM(total)
+            FROM resumen_gastos
+            WHERE anio = ? AND mes = ?
+        ''', (anio, mes))
 
         resultado = cursor.fetchone()[0]
         conn.close()
         return resultado if resultado else 0.0
 
+    @cacheada('gastos', 'categorias')
     def obtener_gastos_por_categoria_mes(self, mes: int, anio: int) -> List[Tuple]:
         """
         Obtiene el total de gastos agrupados por categoría para un mes específico.
@@ -288,18 +580,19 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT c.nombre, SUM(g.cantidad) as total
-            FROM gastos g
-            JOIN categorias c ON g.categoria_id = c.id
-            WHERE g.mes = ? AND g.anio = ?
+            SELECT c.nombre, SUM(r.total) as total
+            FROM resumen_gastos r
+            JOIN categorias c ON r.categoria_id = c.id
+            WHERE r.anio = ? AND r.mes = ?
             GROUP BY c.nombre
             ORDER BY total DESC
-        ''', (mes, anio))
+        ''', (anio, mes))
 
         resultados = cursor.fetchall()
         conn.close()
         return resultados
 
+    @cacheada('gastos')
     def obtener_comparacion_anual(self, anio: int) -> List[Tuple]:
         """
         Obtiene el total de gastos por mes para un año completo.
@@ -314,8 +607,8 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT mes, SUM(cantidad) as total
-            FROM gastos
+            SELECT mes, SUM(total) as total
+            FROM resumen_gastos
             WHERE anio = ?
             GROUP BY mes
             ORDER BY mes
@@ -325,6 +618,7 @@ class Database:
         conn.close()
         return resultados
 
+    @cacheada('gastos')
     def obtener_total_anual(self, anio: int) -> float:
         """
         Obtiene el total de gastos de un año completo.
@@ -339,8 +633,8 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT SUM(cantidad)
-            FROM gastos
+            SELECT SUM(total)
+            FROM resumen_gastos
             WHERE anio = ?
         ''', (anio,))
 
@@ -348,6 +642,7 @@ class Database:
         conn.close()
         return resultado if resultado else 0.0
 
+    @cacheada('categorias')
     def obtener_categorias(self) -> List[Tuple]:
         """
         Obtiene todas las categorías disponibles.
@@ -367,6 +662,55 @@ class Database:
         conn.close()
         return categorias
 
+    def obtener_uso_categorias(self) -> List[Dict]:
+        """
+        Obtiene el uso de todas las categorías en una sola consulta.
+
+        Returns:
+            Lista de diccionarios ordenada por nombre, uno por categoría
+            (también las que no tienen gastos), con:
+                - 'id', 'nombre', 'descripcion'
+                - 'cantidad': número de gastos
+                - 'total': importe total de sus gastos
+                - 'primer_uso', 'ultimo_uso': fechas del primer y último
+                  gasto, o None si no tiene
+                - 'total_12_meses': importe de los últimos 12 meses
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT c.id, c.nombre, c.descripcion,
+                   COUNT(g.id),
+                   IFNULL(SUM(g.cantidad), 0),
+                   MIN(g.fecha),
+                   MAX(g.fecha),
+                   IFNULL(SUM(CASE WHEN g.fecha >= date('now', '-12 months')
+                                   THEN g.cantidad END), 0)
+            FROM categorias c
+            LEFT JOIN gastos g ON g.categoria_id = c.id
+            GROUP BY c.id
+            ORDER BY c.nombre
+        ''')
+
+        filas = cursor.fetchall()
+        conn.close()
+
+        return [
+            {
+                'id': cat_id,
+                'nombre': nombre,
+                'descripcion': descripcion,
+                'cantidad': cantidad,
+                'total': total,
+                'primer_uso': primer_uso,
+                'ultimo_uso': ultimo_uso,
+                'total_12_meses': total_12_meses,
+            }
+            for cat_id, nombre, descripcion, cantidad, total, primer_uso, ultimo_uso, total_12_meses
+            in filas
+        ]
+
     def eliminar_gasto(self, gasto_id: int) -> bool:
         """
         Elimina un gasto de la base de datos.
@@ -381,10 +725,15 @@ class Database:
             conn = self.get_connection()
             cursor = conn.cursor()
 
+            cursor.execute('SELECT anio, mes FROM gastos WHERE id = ?', (gasto_id,))
+            periodo = cursor.fetchone()
+
             cursor.execute('DELETE FROM gastos WHERE id = ?', (gasto_id,))
 
             conn.commit()
             conn.close()
+            if periodo:
+                self.cambios.publicar('gastos', *periodo)
             return True
         except Exception as e:
             print(f"Error al eliminar gasto: {e}")
@@ -414,6 +763,9 @@ class Database:
             conn = self.get_connection()
             cursor = conn.cursor()
 
+            cursor.execute('SELECT anio, mes FROM gastos WHERE id = ?', (gasto_id,))
+            periodo_anterior = cursor.fetchone()
+
             cursor.execute('''
                 UPDATE gastos 
                 SET descripcion = ?, cantidad = ?, categoria_id = ?, 
@@ -423,6 +775,9 @@ class Database:
 
             conn.commit()
             conn.close()
+            if periodo_anterior and periodo_anterior != (anio, mes):
+                self.cambios.publicar('gastos', *periodo_anterior)
+            self.cambios.publicar('gastos', anio, mes)
             return True
         except Exception as e:
             print(f"Error al actualizar gasto: {e}")
@@ -477,6 +832,7 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.cambios.publicar('categorias')
             return True
         except sqlite3.IntegrityError:
             print("La categoría ya existe")
@@ -505,6 +861,7 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.cambios.publicar('categorias')
             return True
         except sqlite3.IntegrityError:
             print("El nombre de la categoría ya existe")
@@ -547,11 +904,13 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.cambios.publicar('categorias')
             return True
         except Exception as e:
             print(f"Error al eliminar categoría: {e}")
             return False
 
+    @cacheada('gastos')
     def obtener_gastos_por_metodo_mes(self, mes: int, anio: int) -> Dict[str, float]:
         """
         Obtiene el total de gastos por método de pago para un mes específico.
@@ -567,11 +926,11 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT metodo_pago, SUM(cantidad) as total
-            FROM gastos
-            WHERE mes = ? AND anio = ?
+            SELECT metodo_pago, SUM(total) as total
+            FROM resumen_gastos
+            WHERE anio = ? AND mes = ?
             GROUP BY metodo_pago
-        ''', (mes, anio))
+        ''', (anio, mes))
 
         resultados = cursor.fetchall()
         conn.close()
@@ -584,6 +943,7 @@ class Database:
 
         return totales
 
+    @cacheada('gastos')
     def obtener_gastos_por_metodo_anual(self, anio: int) -> Dict[str, float]:
         """
         Obtiene el total de gastos por método de pago para un año completo.
@@ -598,8 +958,8 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT metodo_pago, SUM(cantidad) as total
-            FROM gastos
+            SELECT metodo_pago, SUM(total) as total
+            FROM resumen_gastos
             WHERE anio = ?
             GROUP BY metodo_pago
         ''', (anio,))
@@ -615,6 +975,7 @@ class Database:
 
         return totales
 
+    @cacheada('gastos', 'categorias')
     def obtener_gastos_por_categoria_y_metodo(self, mes: int = None, anio: int = None) -> List[Tuple]:
         """
         Obtiene gastos agrupados por categoría y método de pago.
@@ -631,21 +992,21 @@ class Database:
 
         if mes is not None:
             cursor.execute('''
-                SELECT c.nombre, g.metodo_pago, SUM(g.cantidad) as total
-                FROM gastos g
-                JOIN categorias c ON g.categoria_id = c.id
-                WHERE g.mes = ? AND g.anio = ?
-                GROUP BY c.nombre, g.metodo_pago
-                ORDER BY c.nombre, g.metodo_pago
-            ''', (mes, anio))
+                SELECT c.nombre, NULLIF(r.metodo_pago, '') as metodo, SUM(r.total) as total
+                FROM resumen_gastos r
+                JOIN categorias c ON r.categoria_id = c.id
+                WHERE r.anio = ? AND r.mes = ?
+                GROUP BY c.nombre, r.metodo_pago
+                ORDER BY c.nombre, r.metodo_pago
+            ''', (anio, mes))
         else:
             cursor.execute('''
-                SELECT c.nombre, g.metodo_pago, SUM(g.cantidad) as total
-                FROM gastos g
-                JOIN categorias c ON g.categoria_id = c.id
-                WHERE g.anio = ?
-                GROUP BY c.nombre, g.metodo_pago
-                ORDER BY c.nombre, g.metodo_pago
+                SELECT c.nombre, NULLIF(r.metodo_pago, '') as metodo, SUM(r.total) as total
+                FROM resumen_gastos r
+                JOIN categorias c ON r.categoria_id = c.id
+                WHERE r.anio = ?
+                GROUP BY c.nombre, r.metodo_pago
+                ORDER BY c.nombre, r.metodo_pago
             ''', (anio,))
 
         resultados = cursor.fetchall()
@@ -686,11 +1047,41 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.cambios.publicar('ingresos', anio, mes)
             return True
         except Exception as e:
             print(f"Error al agregar ingreso: {e}")
             return False
 
+    def agregar_ingresos_lote(self, ingresos: Iterable, tamano_lote: int = TAMANO_LOTE) -> Dict:
+        """
+        Agrega muchos ingresos de una vez.
+
+        Las filas tienen el mismo orden que los argumentos de agregar_ingreso:
+        (descripcion, cantidad, fuente, fecha). Las filas inválidas se
+        devuelven en 'errores' sin abortar el resto.
+
+        Args:
+            ingresos: Iterable o generador de tuplas de ingreso
+            tamano_lote: Número máximo de filas por transacción
+
+        Returns:
+            Diccionario {'insertados': int, 'errores': [(indice, mensaje), ...]}
+        """
+        fechas = {}
+
+        def preparar(fila):
+            descripcion, cantidad, fuente, fecha = fila
+            fecha, mes, anio = _validar_fecha(fecha, fechas)
+
+            return (_validar_texto(descripcion, "Descripción"), _validar_cantidad(cantidad),
+                    _validar_texto(fuente, "Fuente"), fecha, mes, anio)
+
+        return self._insertar_lote('ingresos', '''
+            INSERT INTO ingresos (descripcion, cantidad, fuente, fecha, mes, anio)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', ingresos, preparar, tamano_lote)
+
     def obtener_ingresos_mes(self, mes: int, anio: int) -> List[Tuple]:
         """
         Obtiene todos los ingresos de un mes específico.
@@ -716,6 +1107,7 @@ class Database:
         conn.close()
         return ingresos
 
+    @cacheada('ingresos')
     def obtener_total_ingresos_mes(self, mes: int, anio: int) -> float:
         """
         Obtiene el total de ingresos de un mes.
@@ -731,15 +1123,16 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT SUM(cantidad)
-            FROM ingresos
-            WHERE mes = ? AND anio = ?
-        ''', (mes, anio))
+            SELECT SUM(total)
+            FROM resumen_ingresos
+            WHERE anio = ? AND mes = ?
+        ''', (anio, mes))
 
         resultado = cursor.fetchone()[0]
         conn.close()
         return resultado if resultado else 0.0
 
+    @cacheada('ingresos')
     def obtener_total_ingresos_anual(self, anio: int) -> float:
         """
         Obtiene el total de ingresos de un año completo.
@@ -754,8 +1147,8 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT SUM(cantidad)
-            FROM ingresos
+            SELECT SUM(total)
+            FROM resumen_ingresos
             WHERE anio = ?
         ''', (anio,))
 
@@ -763,6 +1156,7 @@ class Database:
         conn.close()
         return resultado if resultado else 0.0
 
+    @cacheada('ingresos')
     def obtener_ingresos_por_fuente_mes(self, mes: int, anio: int) -> List[Tuple]:
         """
         Obtiene el total de ingresos agrupados por fuente para un mes específico.
@@ -778,17 +1172,18 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT fuente, SUM(cantidad) as total
-            FROM ingresos
-            WHERE mes = ? AND anio = ?
+            SELECT fuente, SUM(total) as total
+            FROM resumen_ingresos
+            WHERE anio = ? AND mes = ?
             GROUP BY fuente
             ORDER BY total DESC
-        ''', (mes, anio))
+        ''', (anio, mes))
 
         resultados = cursor.fetchall()
         conn.close()
         return resultados
 
+    @cacheada('ingresos')
     def obtener_comparacion_ingresos_anual(self, anio: int) -> List[Tuple]:
         """
         Obtiene el total de ingresos por mes para un año completo.
@@ -803,8 +1198,8 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT mes, SUM(cantidad) as total
-            FROM ingresos
+            SELECT mes, SUM(total) as total
+            FROM resumen_ingresos
             WHERE anio = ?
             GROUP BY mes
             ORDER BY mes
@@ -828,10 +1223,15 @@ class Database:
             conn = self.get_connection()
             cursor = conn.cursor()
 
+            cursor.execute('SELECT anio, mes FROM ingresos WHERE id = ?', (ingreso_id,))
+            periodo = cursor.fetchone()
+
             cursor.execute('DELETE FROM ingresos WHERE id = ?', (ingreso_id,))
 
             conn.commit()
             conn.close()
+            if periodo:
+                self.cambios.publicar('ingresos', *periodo)
             return True
         except Exception as e:
             print(f"Error al eliminar ingreso: {e}")
@@ -860,6 +1260,9 @@ class Database:
             conn = self.get_connection()
             cursor = conn.cursor()
 
+            cursor.execute('SELECT anio, mes FROM ingresos WHERE id = ?', (ingreso_id,))
+            periodo_anterior = cursor.fetchone()
+
             cursor.execute('''
                 UPDATE ingresos 
                 SET descripcion = ?, cantidad = ?, fuente = ?, 
@@ -869,6 +1272,9 @@ class Database:
 
             conn.commit()
             conn.close()
+            if periodo_anterior and periodo_anterior != (anio, mes):
+                self.cambios.publicar('ingresos', *periodo_anterior)
+            self.cambios.publicar('ingresos', anio, mes)
             return True
         except Exception as e:
             print(f"Error al actualizar ingreso: {e}")
@@ -901,6 +1307,7 @@ class Database:
             print(f"Error al obtener ingreso: {e}")
             return None
 
+    @cacheada('gastos', 'ingresos')
     def obtener_balance_mes(self, mes: int, anio: int) -> Dict[str, float]:
         """
         Obtiene el balance (ingresos - gastos) de un mes.
@@ -912,8 +1319,18 @@ class Database:
         Returns:
             Diccionario con ingresos, gastos y balance
         """
-        ingresos = self.obtener_total_ingresos_mes(mes, anio)
-        gastos = self.obtener_total_mes(mes, anio)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        # Ambos totales en una sola consulta
+        cursor.execute('''
+            SELECT
+                (SELECT IFNULL(SUM(total), 0) FROM resumen_ingresos WHERE anio = ? AND mes = ?),
+                (SELECT IFNULL(SUM(total), 0) FROM resumen_gastos WHERE anio = ? AND mes = ?)
+        ''', (anio, mes, anio, mes))
+
+        ingresos, gastos = cursor.fetchone()
+        conn.close()
         balance = ingresos - gastos
 
         return {
@@ -932,14 +1349,96 @@ class Database:
         Returns:
             Diccionario con ingresos, gastos y balance
         """
-        ingresos = self.obtener_total_ingresos_anual(anio)
-        gastos = self.obtener_total_anual(anio)
-        balance = ingresos - gastos
+        resumen = self.obtener_resumen_anual(anio)
 
         return {
-            'ingresos': ingresos,
-            'gastos': gastos,
-            'balance': balance
+            'ingresos': resumen['total_ingresos'],
+            'gastos': resumen['total_gastos'],
+            'balance': resumen['balance']
+        }
+
+    @cacheada('gastos', 'ingresos', 'categorias')
+    def obtener_resumen_anual(self, anio: int) -> Dict:
+        """
+        Obtiene de una sola vez todos los agregados del año.
+
+        Lee en una única consulta las tablas de resumen de gastos e ingresos
+        (unas pocas filas por mes) y las agrupa aquí. Con esto se pintan la
+        comparación anual y las estadísticas por categoría sin más consultas.
+
+        Args:
+            anio: Año a consultar
+
+        Returns:
+            Diccionario con:
+                - 'meses': {mes: {'ingresos', 'gastos', 'balance'}} para los 12 meses
+                - 'total_ingresos', 'total_gastos', 'balance': totales del año
+                - 'metodos': {'efectivo': total, 'tarjeta': total}
+                - 'categorias': [{'categoria', 'total', 'cantidad'}] del año,
+                  de mayor a menor total
+                - 'categorias_mes': {mes: [{'categoria', 'total', 'cantidad'}]}
+                - 'fuentes': {fuente: total} de ingresos del año
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT 'gasto', r.mes, c.nombre, r.metodo_pago, r.total, r.cantidad
+            FROM resumen_gastos r
+            JOIN categorias c ON r.categoria_id = c.id
+            WHERE r.anio = ?
+            UNION ALL
+            SELECT 'ingreso', mes, fuente, NULL, total, cantidad
+            FROM resumen_ingresos
+            WHERE anio = ?
+        ''', (anio, anio))
+
+        filas = cursor.fetchall()
+        conn.close()
+
+        meses = {mes: {'ingresos': 0.0, 'gastos': 0.0} for mes in range(1, 13)}
+        metodos = {'efectivo': 0.0, 'tarjeta': 0.0}
+        categorias = {}
+        categorias_mes = {mes: {} for mes in range(1, 13)}
+        fuentes = {}
+
+        for tipo, mes, nombre, metodo, total, cantidad in filas:
+            if tipo == 'ingreso':
+                meses[mes]['ingresos'] += total
+                fuentes[nombre] = fuentes.get(nombre, 0.0) + total
+                continue
+
+            meses[mes]['gastos'] += total
+            if metodo in metodos:
+                metodos[metodo] += total
+            for grupo in (categorias, categorias_mes[mes]):
+                acumulado = grupo.setdefault(nombre, [0.0, 0])
+                acumulado[0] += total
+                acumulado[1] += cantidad
+
+        def ordenar(grupo):
+            return sorted(
+                ({'categoria': nombre, 'total': total, 'cantidad': cantidad}
+                 for nombre, (total, cantidad) in grupo.items() if total > 0),
+                key=lambda stat: stat['total'], reverse=True
+            )
+
+        for datos in meses.values():
+            datos['balance'] = datos['ingresos'] - datos['gastos']
+
+        total_ingresos = sum(datos['ingresos'] for datos in meses.values())
+        total_gastos = sum(datos['gastos'] for datos in meses.values())
+
+        return {
+            'anio': anio,
+            'meses': meses,
+            'total_ingresos': total_ingresos,
+            'total_gastos': total_gastos,
+            'balance': total_ingresos - total_gastos,
+            'metodos': metodos,
+            'categorias': ordenar(categorias),
+            'categorias_mes': {mes: ordenar(grupo) for mes, grupo in categorias_mes.items()},
+            'fuentes': fuentes,
         }
 
     def obtener_gastos_detallados_categoria(self, categoria_nombre: str, mes: int = None,
@@ -990,6 +1489,46 @@ class Database:
         conn.close()
         return gastos
 
+    def obtener_gastos_detallados_categoria_pagina(self, categoria_nombre: str, anio: int,
+                                                   mes: int = None, limite: int = TAMANO_PAGINA,
+                                                   despues: tuple = None,
+                                                   antes: tuple = None) -> List[Tuple]:
+        """
+        Obtiene una página de los gastos de una categoría, del más reciente al más antiguo.
+
+        Args:
+            categoria_nombre: Nombre de la categoría
+            anio: Año a consultar
+            mes: Número del mes (1-12). Si es None, todo el año
+            limite: Número máximo de gastos
+            despues: Clave (mes, fecha, id) del último gasto ya mostrado
+            antes: Clave (mes, fecha, id) del primer gasto ya mostrado
+
+        Returns:
+            Lista de tuplas (id, descripcion, cantidad, fecha, mes, metodo_pago)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        filtros = "c.nombre = ? AND g.anio = ?"
+        params = [categoria_nombre, anio]
+        if mes is not None:
+            filtros += " AND g.mes = ?"
+            params.append(mes)
+
+        # El mes va en la clave aunque se deduzca de la fecha: así el orden
+        # coincide con el de idx_gastos_categoria_anio_mes_fecha
+        gastos = _consultar_pagina(
+            cursor,
+            '''SELECT g.id, g.descripcion, g.cantidad, g.fecha, g.mes, g.metodo_pago
+               FROM gastos g
+               JOIN categorias c ON g.categoria_id = c.id''',
+            filtros, params,
+            ['g.mes', 'g.fecha', 'g.id'], limite, despues, antes
+        )
+        conn.close()
+        return gastos
+
     # ==================== MÉTODOS PARA USUARIOS Y AUTENTICACIÓN ====================
 
     @staticmethod
@@ -1039,9 +1578,10 @@ class Database:
             usuario_id = cursor.lastrowid
             conn.commit()
             conn.close()
+            self.estadisticas_admin.invalidar()
 
-            # Crear base de datos personal del usuario con sus tablas
-            db_usuario = Database(usuario_id=usuario_id)
+            # Crear base de datos personal del usuario copiando la plantilla
+            self.almacenamiento.crear_usuario(usuario_id)
 
             return True, "Usuario registrado exitosamente"
 
@@ -1049,6 +1589,72 @@ class Database:
             print(f"Error al registrar usuario: {e}")
             return False, f"Error al registrar: {str(e)}"
 
+    def registrar_usuarios_lote(self, usuarios: Iterable, tamano_lote: int = TAMANO_LOTE) -> Dict:
+        """
+        Registra muchos usuarios de una vez.
+
+        Las filas tienen el mismo orden que los argumentos de registrar_usuario:
+        (nombre, email, password). Los usuarios se insertan en transacciones de
+        `tamano_lote` filas y la BD de cada uno se crea copiando la plantilla,
+        así que dar de alta miles de usuarios lleva segundos. Las filas
+        inválidas o con el email ya registrado se devuelven en 'errores'.
+
+        Args:
+            usuarios: Iterable o generador de tuplas (nombre, email, password)
+            tamano_lote: Número máximo de filas por transacción
+
+        Returns:
+            Diccionario {'registrados': [id, ...], 'errores': [(indice, mensaje), ...]}
+        """
+        resultado = {'registrados': [], 'errores': []}
+        conn = self.get_usuarios_connection()
+
+        def volcar(lote):
+            registrados = []
+            try:
+                with conn:
+                    cursor = conn.cursor()
+                    for indice, params in lote:
+                        cursor.execute('''
+                            INSERT INTO usuarios (nombre, email, password_hash)
+                            VALUES (?, ?, ?)
+                            ON CONFLICT (email) DO NOTHING
+                        ''', params)
+                        if cursor.rowcount:
+                            registrados.append(cursor.lastrowid)
+                        else:
+                            resultado['errores'].append((indice, "El email ya está registrado"))
+            except sqlite3.Error as e:
+                print(f"Error al registrar usuarios: {e}")
+                resultado['errores'].extend((indice, str(e)) for indice, _ in lote)
+                return
+
+            for usuario_id in registrados:
+                self.almacenamiento.crear_usuario(usuario_id)
+            resultado['registrados'].extend(registrados)
+            self.estadisticas_admin.invalidar()
+
+        lote = []
+        for indice, fila in enumerate(usuarios):
+            try:
+                nombre, email, password = fila
+                lote.append((indice, (_validar_texto(nombre, "Nombre"), _validar_texto(email, "Email"),
+                                      self.hash_password(_validar_texto(password, "Contraseña")))))
+            except (ValueError, TypeError) as e:
+                resultado['errores'].append((indice, str(e)))
+                continue
+
+            if len(lote) >= tamano_lote:
+                volcar(lote)
+                lote = []
+
+        if lote:
+            volcar(lote)
+
+        conn.close()
+        resultado['errores'].sort()
+        return resultado
+
     def autenticar_usuario(self, email: str, password: str) -> Optional[Tuple[int, str, str]]:
         """
         Autentica un usuario.
@@ -1082,14 +1688,9 @@ class Database:
                     print(f"Intento de login con cuenta inactiva: {email}")
                     return None
 
-                # Actualizar último acceso
-                cursor.execute('''
-                    UPDATE usuarios
-                    SET ultimo_acceso = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (user_id,))
-                conn.commit()
+                # Último acceso: se escribe más tarde junto con los de otros logins
                 conn.close()
+                self.almacenamiento.accesos.registrar(user_id)
 
                 # Retornar (id, nombre, rol)
                 return (user_id, nombre, rol)
@@ -1186,10 +1787,47 @@ class Database:
             ORDER BY fecha_registro DESC
         ''')
 
-        usuarios = cursor.fetchall()
+        usuarios = self.almacenamiento.accesos.aplicar(cursor.fetchall())
         conn.close()
         return usuarios
 
+    def obtener_usuarios_pagina(self, limite: int = TAMANO_PAGINA, despues: tuple = None,
+                                antes: tuple = None, busqueda: str = None) -> List[Tuple]:
+        """
+        Obtiene una página de usuarios, del registrado más recientemente al más antiguo.
+
+        La página se lee por el índice de fecha de registro, así que su coste
+        no depende de cuántos usuarios haya. La búsqueda filtra por texto
+        contenido en el nombre o el email (sin distinguir mayúsculas).
+
+        Args:
+            limite: Número máximo de usuarios
+            despues: Clave (fecha_registro, id) del último usuario ya mostrado
+            antes: Clave (fecha_registro, id) del primer usuario ya mostrado
+            busqueda: Texto a buscar en nombre o email (None o vacío = todos)
+
+        Returns:
+            Lista de tuplas como las de obtener_todos_usuarios
+        """
+        filtros, params = "1 = 1", []
+        if busqueda and busqueda.strip():
+            patron = '%' + _escapar_like(busqueda.strip()) + '%'
+            filtros = "(nombre LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\')"
+            params = [patron, patron]
+
+        conn = self.get_usuarios_connection()
+        cursor = conn.cursor()
+
+        usuarios = _consultar_pagina(
+            cursor,
+            '''SELECT id, nombre, email, rol, activo, fecha_registro, ultimo_acceso
+               FROM usuarios''',
+            filtros, params,
+            ['fecha_registro', 'id'], limite, despues, antes
+        )
+        conn.close()
+        return self.almacenamiento.accesos.aplicar(usuarios)
+
     def cambiar_rol_usuario(self, usuario_id: int, nuevo_rol: str) -> Tuple[bool, str]:
         """
         Cambia el rol de un usuario (solo admin).
@@ -1216,6 +1854,7 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.estadisticas_admin.invalidar()
             return True, f"Rol cambiado a '{nuevo_rol}' exitosamente"
 
         except Exception as e:
@@ -1244,6 +1883,7 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.estadisticas_admin.invalidar()
 
             estado = "activado" if activo else "desactivado"
             return True, f"Usuario {estado} exitosamente"
@@ -1263,10 +1903,9 @@ class Database:
         """
         try:
             # Eliminar base de datos de finanzas del usuario
-            import os
-            db_path = os.path.join(self.USUARIOS_DATA_DIR, f"usuario_{usuario_id}_finanzas.db")
-            if os.path.exists(db_path):
-                os.remove(db_path)
+            self._conexiones.cerrar_ruta(self.almacenamiento.ruta_usuario(usuario_id))
+            self.almacenamiento.eliminar_usuario(usuario_id)
+            self.almacenamiento.accesos.descartar(usuario_id)
 
             # Eliminar usuario de la tabla
             conn = self.get_usuarios_connection()
@@ -1276,39 +1915,41 @@ class Database:
 
             conn.commit()
             conn.close()
+            self.estadisticas_admin.invalidar()
             return True, "Usuario y sus datos eliminados exitosamente"
 
         except Exception as e:
             return False, f"Error al eliminar usuario: {str(e)}"
 
-    def obtener_estadisticas_admin(self) -> Dict:
+    def obtener_estadisticas_admin(self, refrescar: bool = False) -> Dict:
         """
         Obtiene estadísticas generales del sistema (solo admin).
 
+        Se calculan con una sola consulta y se reutilizan durante
+        TTL_ESTADISTICAS_ADMIN segundos o hasta que esta instancia cambie
+        algún usuario.
+
+        Args:
+            refrescar: Volver a calcularlas aunque no hayan caducado
+
         Returns:
             Diccionario con estadísticas
         """
+        return self.estadisticas_admin.obtener(self._calcular_estadisticas_admin, refrescar)
+
+    def _calcular_estadisticas_admin(self) -> Dict:
+        """Cuenta usuarios, activos, admins y registros recientes en un recorrido."""
         conn = self.get_usuarios_connection()
         cursor = conn.cursor()
 
-        # Total de usuarios
-        cursor.execute('SELECT COUNT(*) FROM usuarios')
-        total_usuarios = cursor.fetchone()[0]
-
-        # Usuarios activos
-        cursor.execute('SELECT COUNT(*) FROM usuarios WHERE activo = 1')
-        usuarios_activos = cursor.fetchone()[0]
-
-        # Usuarios administradores
-        cursor.execute("SELECT COUNT(*) FROM usuarios WHERE rol = 'admin'")
-        total_admins = cursor.fetchone()[0]
-
-        # Registros recientes (últimos 30 días)
         cursor.execute('''
-            SELECT COUNT(*) FROM usuarios 
-            WHERE date(fecha_registro) >= date('now', '-30 days')
+            SELECT COUNT(*),
+                   COALESCE(SUM(activo = 1), 0),
+                   COALESCE(SUM(rol = 'admin'), 0),
+                   COALESCE(SUM(date(fecha_registro) >= date('now', '-30 days')), 0)
+            FROM usuarios
         ''')
-        registros_recientes = cursor.fetchone()[0]
+        total_usuarios, usuarios_activos, total_admins, registros_recientes = cursor.fetchone()
 
         conn.close()
 
@@ -1320,27 +1961,44 @@ class Database:
             'registros_recientes': registros_recientes
         }
 
+    def obtener_analitica_usuarios(self, procesos: int = None) -> Dict:
+        """
+        Analiza el uso de las BDs de finanzas de todos los usuarios (solo admin).
+
+        Recorre todos los ficheros de usuario en un pool de procesos (ver
+        analitica.py). Puede tardar, así que conviene llamarlo fuera del
+        hilo de Tk.
+
+        Args:
+            procesos: Máximo de procesos. Por defecto, uno por núcleo
+
+        Returns:
+            Informe con totales de filas y tamaño, rango de fechas, gastos e
+            ingresos por año, versiones de esquema y el resumen de cada usuario
+        """
+        return analizar_usuarios(self.almacenamiento.listar_usuarios(), procesos,
+                                 en_memoria=self.almacenamiento.en_memoria)
+
     def actualizar_ultimo_acceso(self, usuario_id: int):
         """
         Actualiza la fecha de último acceso del usuario.
 
+        La fecha queda en el buffer de accesos (ver accesos.py) y se escribe
+        en usuarios.db en el siguiente volcado; las lecturas ya la ven.
+
         Args:
             usuario_id: ID del usuario
         """
-        try:
-            conn = self.get_usuarios_connection()
-            cursor = conn.cursor()
+        self.almacenamiento.accesos.registrar(usuario_id)
 
-            cursor.execute('''
-                UPDATE usuarios
-                SET ultimo_acceso = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (usuario_id,))
+    def volcar_accesos(self) -> int:
+        """
+        Escribe ya en usuarios.db los últimos accesos pendientes.
 
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Error al actualizar último acceso: {e}")
+        Returns:
+            Número de usuarios actualizados
+        """
+        return self.almacenamiento.accesos.volcar()
 
     # ===================================================================
     # MÉTODOS QUE RETORNAN OBJETOS DE MODELO POO
@@ -1475,6 +2133,7 @@ class Database:
         conn.close()
 
         if resultado:
+            resultado = self.almacenamiento.accesos.aplicar([resultado])[0]
             usuario = Usuario(
                 id=resultado[0],
                 nombre=resultado[1],
@@ -1504,7 +2163,7 @@ class Database:
             ORDER BY nombre
         ''')
 
-        resultados = cursor.fetchall()
+        resultados = self.almacenamiento.accesos.aplicar(cursor.fetchall())
         conn.close()
 
         usuarios = []
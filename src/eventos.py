@@ -0,0 +1,112 @@
+"""
+Notificación de cambios en los datos de FinanzApp.
+
+Database publica en su BusCambios qué ha modificado cada escritura
+(entidad, año y mes); las vistas se suscriben, marcan como sucio solo lo que
+les afecta y se refrescan cuando están visibles. Así, editar un gasto
+refresca ese mes y los resúmenes del año, no todas las pestañas.
+
+Los avisos se entregan en el hilo que hace la escritura. En la aplicación
+todas las escrituras se hacen desde el hilo de Tk.
+"""
+
+import threading
+from collections import namedtuple
+from typing import Callable, Dict
+
+
+# entidad: 'gastos', 'ingresos' o 'categorias'.
+# anio y mes son None cuando el cambio no se limita a un periodo.
+Cambio = namedtuple('Cambio', ['entidad', 'anio', 'mes'])
+
+
+class BusCambios:
+    """Reparte los avisos de cambio entre los suscriptores."""
+
+    def __init__(self):
+        self._suscriptores: Dict[int, Callable[[Cambio], None]] = {}
+        self._siguiente = 0
+        self._lock = threading.Lock()
+
+    def suscribir(self, callback: Callable[[Cambio], None]) -> int:
+        """
+        Registra una función que recibirá cada Cambio publicado.
+
+        Args:
+            callback: Función que recibe un Cambio
+
+        Returns:
+            Identificador para cancelar la suscripción
+        """
+        with self._lock:
+            self._siguiente += 1
+            self._suscriptores[self._siguiente] = callback
+            return self._siguiente
+
+    def cancelar_suscripcion(self, identificador: int):
+        """Deja de enviar avisos al suscriptor indicado."""
+        with self._lock:
+            self._suscriptores.pop(identificador, None)
+
+    def publicar(self, entidad: str, anio: int = None, mes: int = None):
+        """
+        Avisa a todos los suscriptores de un cambio.
+
+        Un suscriptor que falla no impide que el resto reciba el aviso.
+
+        Args:
+            entidad: 'gastos', 'ingresos' o 'categorias'
+            anio: Año afectado (None si no se limita a un año)
+            mes: Mes afectado (None si no se limita a un mes)
+        """
+        cambio = Cambio(entidad, anio, mes)
+        with self._lock:
+            suscriptores = list(self._suscriptores.values())
+
+        for callback in suscriptores:
+            try:
+                callback(cambio)
+            except Exception as e:
+                print(f"Error al notificar cambio {cambio}: {e}")
+
+
+class RefrescoDiferido:
+    """
+    Refresca una vista sucia solo cuando está visible.
+
+    marcar() programa el refresco para el siguiente momento de inactividad
+    si el frame se ve; si no (pestaña no seleccionada), lo aplaza hasta que
+    el frame se muestre. Varias marcas seguidas producen un solo refresco.
+    """
+
+    def __init__(self, frame, refrescar: Callable[[], None]):
+        """
+        Args:
+            frame: Frame principal de la vista
+            refrescar: Función que recarga la vista
+        """
+        self.frame = frame
+        self.refrescar = refrescar
+        self.sucio = False
+        self._programado = False
+
+        # El Notebook oculta una pestaña desmapeando su contenedor, que puede
+        # ser el propio frame o su padre; se escucha <Map> en ambos.
+        for widget in (self.frame, self.frame.master):
+            widget.bind('<Map>', lambda e: self._aplicar_si_visible(), add='+')
+
+    def marcar(self):
+        """Marca la vista como sucia."""
+        self.sucio = True
+        self._aplicar_si_visible()
+
+    def _aplicar_si_visible(self):
+        if self.sucio and not self._programado and self.frame.winfo_viewable():
+            self._programado = True
+            self.frame.after_idle(self._aplicar)
+
+    def _aplicar(self):
+        self._programado = False
+        if self.sucio:
+            self.sucio = False
+            self.refrescar()
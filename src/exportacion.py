@@ -0,0 +1,234 @@
+"""
+Exportación del informe anual de gastos de FinanzApp.
+
+El informe se genera en una sola pasada sobre un cursor ordenado por mes y
+fecha (Database.iterar_gastos_anio): los subtotales mensuales y las
+estadísticas por categoría se calculan sobre la marcha, así que la memoria
+usada no depende del número de gastos del año.
+
+El formato de salida lo decide un escritor (subclase de EscritorInforme);
+para añadir un formato nuevo basta con registrar su clase en ESCRITORES.
+"""
+
+import csv
+import json
+from typing import Dict, List, Tuple
+
+
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+]
+
+
+class EscritorInforme:
+    """
+    Interfaz de los escritores de informes.
+
+    exportar_anio llama a los métodos en este orden:
+    inicio, (inicio_mes, gasto..., fin_mes)..., fin.
+    """
+
+    def __init__(self, fichero):
+        """
+        Args:
+            fichero: Fichero de texto abierto para escritura
+        """
+        self.fichero = fichero
+
+    def inicio(self, anio: int, total_anual: float):
+        """Cabecera del informe."""
+
+    def inicio_mes(self, mes: int):
+        """Comienzo de un mes con gastos."""
+
+    def gasto(self, fecha: str, categoria: str, descripcion: str,
+              metodo_pago: str, cantidad: float):
+        """Un gasto del mes en curso."""
+
+    def fin_mes(self, mes: int, total: float, cantidad: int):
+        """Subtotal del mes en curso."""
+
+    def fin(self, categorias: List[Tuple[str, float, int, float]]):
+        """
+        Cierre del informe.
+
+        Args:
+            categorias: Lista de (categoria, total, número de gastos, porcentaje)
+                ordenada por total descendente
+        """
+
+
+class EscritorTXT(EscritorInforme):
+    """Informe de texto legible, con el formato histórico de utilidades.py."""
+
+    def inicio(self, anio, total_anual):
+        self.anio = anio
+        self.fichero.write(f"REPORTE DE GASTOS - AÑO {anio}\n")
+        self.fichero.write("=" * 80 + "\n\n")
+        self.fichero.write(f"TOTAL ANUAL: €{total_anual:.2f}\n")
+        self.fichero.write("=" * 80 + "\n\n")
+
+    def inicio_mes(self, mes):
+        self.fichero.write(f"\n{MESES[mes - 1].upper()} {self.anio}\n")
+        self.fichero.write("-" * 80 + "\n")
+
+    def gasto(self, fecha, categoria, descripcion, metodo_pago, cantidad):
+        self.fichero.write(
+            f"{fecha}  |  {categoria:<15}  |  {descripcion:<30}  |  €{cantidad:>8.2f}\n"
+        )
+
+    def fin_mes(self, mes, total, cantidad):
+        self.fichero.write("-" * 80 + "\n")
+        self.fichero.write(f"Total {MESES[mes - 1]}: €{total:.2f}\n")
+        self.fichero.write("\n")
+
+    def fin(self, categorias):
+        self.fichero.write("\n" + "=" * 80 + "\n")
+        self.fichero.write("ESTADÍSTICAS POR CATEGORÍA\n")
+        self.fichero.write("=" * 80 + "\n\n")
+        for categoria, total, cantidad, porcentaje in categorias:
+            self.fichero.write(
+                f"{categoria:<20}  |  €{total:>10.2f}  |  {cantidad:>3} gastos  |  {porcentaje:>5.1f}%\n"
+            )
+
+
+class EscritorCSV(EscritorInforme):
+    """Una fila por gasto, lista para abrir en una hoja de cálculo."""
+
+    def inicio(self, anio, total_anual):
+        self.escritor = csv.writer(self.fichero)
+        self.escritor.writerow(['fecha', 'categoria', 'descripcion', 'metodo_pago', 'cantidad'])
+
+    def gasto(self, fecha, categoria, descripcion, metodo_pago, cantidad):
+        self.escritor.writerow([fecha, categoria, descripcion, metodo_pago or '', f"{cantidad:.2f}"])
+
+
+class EscritorJSON(EscritorInforme):
+    """
+    Documento JSON con los gastos agrupados por mes y las estadísticas.
+
+    Se escribe por trozos (un gasto cada vez) en lugar de construir el
+    documento entero en memoria.
+    """
+
+    def inicio(self, anio, total_anual):
+        self.primer_mes = True
+        self.fichero.write('{"anio": %d, "total_anual": %s, "meses": [' % (anio, json.dumps(round(total_anual, 2))))
+
+    def inicio_mes(self, mes):
+        if not self.primer_mes:
+            self.fichero.write(', ')
+        self.primer_mes = False
+        self.primer_gasto = True
+        self.fichero.write('{"mes": %d, "nombre": %s, "gastos": [' % (mes, json.dumps(MESES[mes - 1])))
+
+    def gasto(self, fecha, categoria, descripcion, metodo_pago, cantidad):
+        if not self.primer_gasto:
+            self.fichero.write(', ')
+        self.primer_gasto = False
+        self.fichero.write(json.dumps({
+            'fecha': fecha,
+            'categoria': categoria,
+            'descripcion': descripcion,
+            'metodo_pago': metodo_pago,
+            'cantidad': cantidad
+        }, ensure_ascii=False))
+
+    def fin_mes(self, mes, total, cantidad):
+        self.fichero.write('], "total": %s, "cantidad": %d}' % (json.dumps(round(total, 2)), cantidad))
+
+    def fin(self, categorias):
+        self.fichero.write('], "categorias": ')
+        self.fichero.write(json.dumps([
+            {'categoria': categoria, 'total': round(total, 2),
+             'cantidad': cantidad, 'porcentaje': round(porcentaje, 1)}
+            for categoria, total, cantidad, porcentaje in categorias
+        ], ensure_ascii=False))
+        self.fichero.write('}\n')
+
+
+# Formatos disponibles: extensión -> clase del escritor
+ESCRITORES = {
+    'txt': EscritorTXT,
+    'csv': EscritorCSV,
+    'json': EscritorJSON,
+}
+
+
+def escribir_informe(db, anio: int, escritor: EscritorInforme) -> Dict:
+    """
+    Recorre los gastos del año una sola vez y los pasa al escritor.
+
+    Args:
+        db: Instancia de Database con usuario autenticado
+        anio: Año del informe
+        escritor: Escritor que da formato a la salida
+
+    Returns:
+        Diccionario {'gastos': número de gastos, 'total': total anual}
+    """
+    total_anual = db.obtener_total_anual(anio)
+    escritor.inicio(anio, total_anual)
+
+    categorias: Dict[str, List] = {}
+    mes_actual = None
+    total_mes = 0.0
+    gastos_mes = 0
+    total_gastos = 0
+
+    for _, descripcion, cantidad, categoria, fecha, metodo_pago, mes in db.iterar_gastos_anio(anio):
+        if mes != mes_actual:
+            if mes_actual is not None:
+                escritor.fin_mes(mes_actual, total_mes, gastos_mes)
+            escritor.inicio_mes(mes)
+            mes_actual, total_mes, gastos_mes = mes, 0.0, 0
+
+        escritor.gasto(fecha, categoria, descripcion, metodo_pago, cantidad)
+        total_mes += cantidad
+        gastos_mes += 1
+        total_gastos += 1
+
+        acumulado = categorias.setdefault(categoria, [0.0, 0])
+        acumulado[0] += cantidad
+        acumulado[1] += 1
+
+    if mes_actual is not None:
+        escritor.fin_mes(mes_actual, total_mes, gastos_mes)
+
+    estadisticas = sorted(
+        (
+            (categoria, total, cantidad, (total / total_anual * 100) if total_anual > 0 else 0)
+            for categoria, (total, cantidad) in categorias.items()
+        ),
+        key=lambda fila: fila[1],
+        reverse=True
+    )
+    escritor.fin(estadisticas)
+
+    return {'gastos': total_gastos, 'total': total_anual}
+
+
+def exportar_anio(db, anio: int, ruta: str, formato: str = None) -> Dict:
+    """
+    Exporta el informe anual de gastos a un fichero.
+
+    Args:
+        db: Instancia de Database con usuario autenticado
+        anio: Año del informe
+        ruta: Ruta del fichero de salida
+        formato: 'txt', 'csv' o 'json'. Si es None se deduce de la extensión
+
+    Returns:
+        Diccionario {'gastos': número de gastos, 'total': total anual}
+
+    Raises:
+        ValueError: Si el formato no está soportado
+    """
+    if formato is None:
+        formato = ruta.rsplit('.', 1)[-1].lower() if '.' in ruta else 'txt'
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de exportación no soportado: '{formato}'")
+
+    with open(ruta, 'w', encoding='utf-8', newline='') as fichero:
+        return escribir_informe(db, anio, ESCRITORES[formato](fichero))
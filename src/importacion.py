@@ -0,0 +1,269 @@
+"""
+Importación de extractos bancarios en CSV para FinanzApp.
+
+El fichero se lee en streaming, fila a fila, y se inserta en bloques a
+través de Database.agregar_gastos_lote / agregar_ingresos_lote, de modo que
+la memoria usada no depende del tamaño del extracto.
+
+Cada banco exporta con su propio formato, así que las columnas, el formato de
+fecha y los separadores se describen con una ConfiguracionCSV.
+"""
+
+import csv
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# Filas leídas del CSV antes de volcarlas a la base de datos
+TAMANO_BLOQUE = 5000
+
+# Máximo de errores que se guardan con detalle (el resto solo se cuenta)
+MAX_ERRORES = 1000
+
+# Campos que se pueden mapear a columnas del CSV
+CAMPOS = ('fecha', 'descripcion', 'cantidad', 'categoria', 'metodo_pago', 'fuente')
+CAMPOS_OBLIGATORIOS = ('fecha', 'descripcion', 'cantidad')
+
+
+class ConfiguracionCSV:
+    """
+    Describe el formato de un extracto bancario en CSV.
+
+    Attributes:
+        columnas (dict): Campo -> nombre de columna de la cabecera o índice (0..n)
+        formato_fecha (str): Formato strptime de las fechas del fichero
+        separador_decimal (str): Carácter decimal de las cantidades ('.' o ',')
+        delimitador (str): Separador de campos del CSV
+        codificacion (str): Codificación del fichero
+        tiene_cabecera (bool): Si la primera fila contiene los nombres de columna
+        tipo (str): 'auto' (negativos = gastos, positivos = ingresos),
+            'gastos' o 'ingresos'
+        categoria_por_defecto (str): Categoría de los gastos sin columna de categoría
+            o con una categoría desconocida
+        fuente_por_defecto (str): Fuente de los ingresos sin columna de fuente
+    """
+
+    def __init__(
+        self,
+        columnas: Optional[Dict[str, Union[str, int]]] = None,
+        formato_fecha: str = "%Y-%m-%d",
+        separador_decimal: str = ".",
+        delimitador: str = ",",
+        codificacion: str = "utf-8-sig",
+        tiene_cabecera: bool = True,
+        tipo: str = "auto",
+        categoria_por_defecto: str = "Otros",
+        fuente_por_defecto: str = "Otros"
+    ):
+        self.columnas = columnas or {
+            'fecha': 'fecha',
+            'descripcion': 'descripcion',
+            'cantidad': 'cantidad'
+        }
+        self.formato_fecha = formato_fecha
+        self.separador_decimal = separador_decimal
+        self.delimitador = delimitador
+        self.codificacion = codificacion
+        self.tiene_cabecera = tiene_cabecera
+        self.tipo = tipo
+        self.categoria_por_defecto = categoria_por_defecto
+        self.fuente_por_defecto = fuente_por_defecto
+
+    def validar(self):
+        """
+        Comprueba que la configuración es coherente.
+
+        Raises:
+            ValueError: Si falta un campo obligatorio, hay un campo desconocido,
+                el tipo no es válido o los separadores no lo son
+        """
+        for campo in CAMPOS_OBLIGATORIOS:
+            if campo not in self.columnas:
+                raise ValueError(f"Falta la columna del campo obligatorio '{campo}'")
+        for campo in self.columnas:
+            if campo not in CAMPOS:
+                raise ValueError(f"Campo desconocido: '{campo}'")
+        if self.tipo not in ('auto', 'gastos', 'ingresos'):
+            raise ValueError(f"Tipo de importación desconocido: '{self.tipo}'")
+        if self.separador_decimal not in ('.', ','):
+            raise ValueError(f"Separador decimal no válido: '{self.separador_decimal}' (usa '.' o ',')")
+        if len(self.delimitador) != 1:
+            raise ValueError(f"El delimitador debe ser un único carácter: '{self.delimitador}'")
+        if not self.tiene_cabecera:
+            for campo, columna in self.columnas.items():
+                if not isinstance(columna, int):
+                    raise ValueError(
+                        f"Sin cabecera las columnas deben ser índices (campo '{campo}')"
+                    )
+
+
+def convertir_cantidad(texto: str, separador_decimal: str = ".") -> float:
+    """
+    Convierte una cantidad escrita como en el extracto a float.
+
+    Acepta separadores de miles, símbolo de moneda y espacios:
+    "-1.234,56 €" con separador_decimal="," da -1234.56.
+
+    Args:
+        texto: Cantidad tal como aparece en el fichero
+        separador_decimal: Carácter decimal ('.' o ',')
+
+    Returns:
+        Cantidad como float (con signo)
+
+    Raises:
+        ValueError: Si el texto no es una cantidad
+    """
+    separador_miles = "." if separador_decimal == "," else ","
+    limpio = texto.strip().replace("€", "").replace("\u00a0", "").replace(" ", "")
+    limpio = limpio.replace(separador_miles, "").replace(separador_decimal, ".")
+    if not limpio:
+        raise ValueError("Cantidad vacía")
+    return float(limpio)
+
+
+def leer_filas(fichero, config: ConfiguracionCSV) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lee un CSV abierto fila a fila y devuelve solo los campos mapeados.
+
+    Args:
+        fichero: Fichero de texto abierto (con newline='')
+        config: Formato del extracto
+
+    Yields:
+        Tuplas (número de línea, {campo: texto})
+
+    Raises:
+        ValueError: Si una columna de la configuración no está en la cabecera
+    """
+    lector = csv.reader(fichero, delimiter=config.delimitador)
+
+    indices = {}
+    if config.tiene_cabecera:
+        cabecera = [col.strip() for col in next(lector, [])]
+        for campo, columna in config.columnas.items():
+            if isinstance(columna, int):
+                indices[campo] = columna
+            elif columna in cabecera:
+                indices[campo] = cabecera.index(columna)
+            else:
+                raise ValueError(f"La columna '{columna}' no está en la cabecera")
+    else:
+        indices = dict(config.columnas)
+
+    for fila in lector:
+        if not any(celda.strip() for celda in fila):
+            continue
+        yield lector.line_num, {
+            campo: fila[indice] if indice < len(fila) else ""
+            for campo, indice in indices.items()
+        }
+
+
+def importar_csv(db, ruta: str, config: ConfiguracionCSV = None,
+                 progreso: Callable[[int], None] = None) -> Dict:
+    """
+    Importa un extracto bancario CSV en la base de datos del usuario.
+
+    Las filas con error (fecha o cantidad ilegibles, cantidad cero...) se
+    anotan con su número de línea y no detienen la importación.
+
+    No cambia el perfil de `db`: para importar rápido conviene pasar una
+    Database propia abierta con perfil='carga_masiva', no la que usa la
+    interfaz (cambiar su perfil reabriría las conexiones de todos sus hilos).
+
+    Args:
+        db: Instancia de Database con usuario autenticado
+        ruta: Ruta del fichero CSV
+        config: Formato del extracto (por defecto ConfiguracionCSV())
+        progreso: Función opcional a la que se pasa el número de filas leídas
+            tras cada bloque
+
+    Returns:
+        Diccionario con 'gastos' e 'ingresos' insertados, 'filas' leídas,
+        'total_errores' y 'errores' [(línea, mensaje), ...] (como mucho MAX_ERRORES)
+
+    Raises:
+        ValueError: Si la configuración no es válida
+        OSError: Si no se puede leer el fichero
+        sqlite3.Error: Si falla el acceso a la base de datos
+    """
+    config = config or ConfiguracionCSV()
+    config.validar()
+
+    categorias = {nombre: cat_id for cat_id, nombre, _ in db.obtener_categorias()}
+    categoria_defecto = categorias.get(config.categoria_por_defecto)
+    if categoria_defecto is None and config.tipo != 'ingresos':
+        raise ValueError(f"No existe la categoría '{config.categoria_por_defecto}'")
+
+    resultado = {'gastos': 0, 'ingresos': 0, 'filas': 0, 'total_errores': 0, 'errores': []}
+    fechas = {}
+
+    def anotar_error(linea, mensaje):
+        resultado['total_errores'] += 1
+        if len(resultado['errores']) < MAX_ERRORES:
+            resultado['errores'].append((linea, mensaje))
+
+    def convertir_fecha(texto):
+        fecha = fechas.get(texto)
+        if fecha is None:
+            fecha = datetime.strptime(texto.strip(), config.formato_fecha).strftime("%Y-%m-%d")
+            fechas[texto] = fecha
+        return fecha
+
+    def volcar(gastos, lineas_gastos, ingresos, lineas_ingresos):
+        if gastos:
+            lote = db.agregar_gastos_lote(gastos)
+            resultado['gastos'] += lote['insertados']
+            for indice, mensaje in lote['errores']:
+                anotar_error(lineas_gastos[indice], mensaje)
+        if ingresos:
+            lote = db.agregar_ingresos_lote(ingresos)
+            resultado['ingresos'] += lote['insertados']
+            for indice, mensaje in lote['errores']:
+                anotar_error(lineas_ingresos[indice], mensaje)
+
+    with open(ruta, newline='', encoding=config.codificacion) as fichero:
+        gastos: List[Tuple] = []
+        ingresos: List[Tuple] = []
+        lineas_gastos: List[int] = []
+        lineas_ingresos: List[int] = []
+
+        for linea, campos in leer_filas(fichero, config):
+            resultado['filas'] += 1
+            try:
+                fecha = convertir_fecha(campos['fecha'])
+                cantidad = convertir_cantidad(campos['cantidad'], config.separador_decimal)
+            except ValueError as e:
+                anotar_error(linea, str(e))
+                continue
+
+            if cantidad == 0:
+                anotar_error(linea, "Cantidad cero")
+                continue
+
+            es_gasto = config.tipo == 'gastos' or (config.tipo == 'auto' and cantidad < 0)
+            descripcion = campos['descripcion'].strip()
+
+            if es_gasto:
+                categoria_id = categorias.get(campos.get('categoria', '').strip(),
+                                              categoria_defecto)
+                metodo_pago = campos.get('metodo_pago', '').strip() or 'tarjeta'
+                gastos.append((descripcion, abs(cantidad), categoria_id, fecha, metodo_pago))
+                lineas_gastos.append(linea)
+            else:
+                fuente = campos.get('fuente', '').strip() or config.fuente_por_defecto
+                ingresos.append((descripcion, abs(cantidad), fuente, fecha))
+                lineas_ingresos.append(linea)
+
+            if len(gastos) + len(ingresos) >= TAMANO_BLOQUE:
+                volcar(gastos, lineas_gastos, ingresos, lineas_ingresos)
+                gastos, ingresos, lineas_gastos, lineas_ingresos = [], [], [], []
+                if progreso:
+                    progreso(resultado['filas'])
+
+        volcar(gastos, lineas_gastos, ingresos, lineas_ingresos)
+        if progreso:
+            progreso(resultado['filas'])
+
+    return resultado
@@ -0,0 +1,385 @@
+"""
+Instrumentación opcional de Database: tiempos, filas y planes de consulta.
+
+Desactivada no cuesta nada: las conexiones y los métodos son los de siempre.
+Al activarla (Database.activar_instrumentacion o la variable de entorno
+FINANZAPP_INSTRUMENTACION) se registran:
+    - la latencia de cada método público de Database, en un histograma;
+    - la latencia y las filas de cada sentencia SQL;
+    - las conexiones abiertas;
+    - el EXPLAIN QUERY PLAN de las sentencias que superan un umbral.
+
+Los datos se leen con informe() o se vuelcan a JSON con volcar().
+"""
+
+import atexit
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from .conexiones import ConexionPersistente
+except ImportError:
+    from conexiones import ConexionPersistente
+
+
+# Límites superiores (ms) de las cubetas de los histogramas
+LIMITES_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+# Sentencias más lentas que esto (ms) guardan su plan de ejecución
+UMBRAL_LENTA_MS = 50.0
+
+# Máximo de sentencias lentas distintas que se guardan
+MAX_LENTAS = 100
+
+# Variable de entorno que activa la instrumentación; su valor es la ruta del
+# fichero JSON donde se vuelca el informe al salir
+VARIABLE_ENTORNO = 'FINANZAPP_INSTRUMENTACION'
+
+
+class Histograma:
+    """Cuenta latencias en cubetas fijas (ver LIMITES_MS)."""
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES_MS) + 1)
+        self.veces = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def registrar(self, ms: float):
+        self.cubetas[bisect.bisect_left(LIMITES_MS, ms)] += 1
+        self.veces += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentil(self, p: float) -> float:
+        """Cota superior aproximada del percentil p (0-100)."""
+        objetivo = self.veces * p / 100
+        acumulado = 0
+        for indice, cantidad in enumerate(self.cubetas):
+            acumulado += cantidad
+            if cantidad and acumulado >= objetivo:
+                return LIMITES_MS[indice] if indice < len(LIMITES_MS) else self.max_ms
+        return 0.0
+
+    def a_dict(self) -> Dict:
+        etiquetas = [f"<={limite}" for limite in LIMITES_MS] + [f">{LIMITES_MS[-1]}"]
+        return {
+            'veces': self.veces,
+            'total_ms': round(self.total_ms, 3),
+            'media_ms': round(self.total_ms / self.veces, 4) if self.veces else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentil(50),
+            'p95_ms': self.percentil(95),
+            'p99_ms': self.percentil(99),
+            'cubetas': dict(zip(etiquetas, self.cubetas)),
+        }
+
+
+def _normalizar(sql: str) -> str:
+    """Junta los espacios de una sentencia para agrupar las iguales."""
+    return ' '.join(sql.split())
+
+
+class Instrumentacion:
+    """Acumula las mediciones de una o varias instancias de Database."""
+
+    def __init__(self, umbral_lenta_ms: float = UMBRAL_LENTA_MS, capturar_planes: bool = True):
+        """
+        Args:
+            umbral_lenta_ms: Duración a partir de la cual una sentencia es lenta
+            capturar_planes: Si se guarda el EXPLAIN QUERY PLAN de las lentas
+        """
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self.capturar_planes = capturar_planes
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta todo lo medido hasta ahora."""
+        with self._lock:
+            self.desde = datetime.now()
+            self._metodos: Dict[str, Histograma] = {}
+            self._sql: Dict[str, Histograma] = {}
+            self._filas: Dict[str, int] = {}
+            self._lentas: Dict[str, Dict] = {}
+            self._conexiones: Dict[str, int] = {}
+
+    def registrar_metodo(self, nombre: str, ms: float):
+        """Anota la duración de una llamada a un método de Database."""
+        with self._lock:
+            histograma = self._metodos.get(nombre)
+            if histograma is None:
+                histograma = self._metodos[nombre] = Histograma()
+            histograma.registrar(ms)
+
+    def registrar_sql(self, sql: str, ms: float, filas: int = 0):
+        """Anota la duración y las filas de una sentencia (o de su lectura)."""
+        with self._lock:
+            histograma = self._sql.get(sql)
+            if histograma is None:
+                histograma = self._sql[sql] = Histograma()
+                self._filas[sql] = 0
+            histograma.registrar(ms)
+            self._filas[sql] += filas
+
+    def registrar_filas(self, sql: str, filas: int, ms: float):
+        """Suma filas leídas y su tiempo a la última ejecución de una sentencia."""
+        with self._lock:
+            histograma = self._sql.get(sql)
+            if histograma is None:
+                return
+            histograma.total_ms += ms
+            self._filas[sql] += filas
+
+    def registrar_lenta(self, conn, sql: str, parametros, ms: float):
+        """Guarda una sentencia lenta y, la primera vez, su plan de ejecución."""
+        clave = _normalizar(sql)
+        with self._lock:
+            lenta = self._lentas.get(clave)
+            if lenta is not None:
+                lenta['veces'] += 1
+                lenta['max_ms'] = max(lenta['max_ms'], round(ms, 3))
+                return
+            if len(self._lentas) >= MAX_LENTAS:
+                return
+            lenta = self._lentas[clave] = {'sql': clave, 'veces': 1, 'max_ms': round(ms, 3), 'plan': None}
+
+        if self.capturar_planes and parametros is not None:
+            lenta['plan'] = explicar(conn, sql, parametros)
+
+    def conexion_abierta(self, ruta: str):
+        """Anota que se ha abierto una conexión a un fichero."""
+        with self._lock:
+            nombre = os.path.basename(ruta)
+            self._conexiones[nombre] = self._conexiones.get(nombre, 0) + 1
+
+    def informe(self) -> Dict:
+        """
+        Obtiene todo lo medido.
+
+        Returns:
+            Diccionario con:
+                - 'desde': inicio de las mediciones
+                - 'metodos': {método: histograma}
+                - 'sql': {sentencia: histograma + 'filas'}
+                - 'lentas': sentencias lentas con su plan, de más a menos lenta
+                - 'conexiones': {fichero: conexiones abiertas}
+        """
+        with self._lock:
+            sql = {}
+            for sentencia, histograma in self._sql.items():
+                datos = histograma.a_dict()
+                datos['filas'] = self._filas[sentencia]
+                sql[sentencia] = datos
+
+            return {
+                'desde': self.desde.isoformat(timespec='seconds'),
+                'metodos': {nombre: h.a_dict() for nombre, h in self._metodos.items()},
+                'sql': sql,
+                'lentas': sorted((dict(l) for l in self._lentas.values()),
+                                 key=lambda lenta: lenta['max_ms'], reverse=True),
+                'conexiones': dict(self._conexiones),
+            }
+
+    def mas_costosos(self, n: int = 10) -> List[Dict]:
+        """
+        Obtiene los métodos y sentencias con más tiempo acumulado.
+
+        Args:
+            n: Número de elementos
+
+        Returns:
+            Lista de {'tipo', 'nombre', 'total_ms', 'veces'} ordenada por total_ms
+        """
+        informe = self.informe()
+        elementos = [
+            {'tipo': tipo, 'nombre': nombre, 'total_ms': datos['total_ms'], 'veces': datos['veces']}
+            for tipo in ('metodos', 'sql')
+            for nombre, datos in informe[tipo].items()
+        ]
+        elementos.sort(key=lambda elemento: elemento['total_ms'], reverse=True)
+        return elementos[:n]
+
+    def volcar(self, ruta: str):
+        """
+        Escribe el informe en un fichero JSON.
+
+        Args:
+            ruta: Ruta del fichero
+        """
+        with open(ruta, 'w', encoding='utf-8') as fichero:
+            json.dump(self.informe(), fichero, indent=2, ensure_ascii=False)
+
+
+def explicar(conn, sql: str, parametros=()) -> Optional[List[str]]:
+    """
+    Obtiene el EXPLAIN QUERY PLAN de una sentencia.
+
+    Args:
+        conn: Conexión donde ejecutarlo
+        sql: Sentencia a explicar
+        parametros: Parámetros de la sentencia
+
+    Returns:
+        Líneas del plan, o None si la sentencia no se puede explicar
+    """
+    try:
+        cursor = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", parametros)
+        return [fila[3] for fila in cursor.fetchall()]
+    except sqlite3.Error:
+        return None
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mide cada sentencia y las filas que se leen de ella."""
+
+    _sql = None
+
+    def _medir(self, metodo, sql, parametros, *args):
+        instrumentacion = self.connection.instrumentacion
+        inicio = time.perf_counter()
+        resultado = metodo(self, sql, *args)
+        ms = (time.perf_counter() - inicio) * 1000
+
+        self._sql = _normalizar(sql)
+        instrumentacion.registrar_sql(self._sql, ms, max(self.rowcount, 0))
+        if ms >= instrumentacion.umbral_lenta_ms:
+            instrumentacion.registrar_lenta(self.connection, sql, parametros, ms)
+        return resultado
+
+    def execute(self, sql, parametros=()):
+        return self._medir(sqlite3.Cursor.execute, sql, parametros, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self._medir(sqlite3.Cursor.executemany, sql, None, secuencia)
+
+    def executescript(self, script):
+        return self._medir(sqlite3.Cursor.executescript, script, None)
+
+    def _leer(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(self, *args)
+        ms = (time.perf_counter() - inicio) * 1000
+
+        if self._sql is not None:
+            if isinstance(resultado, list):
+                filas = len(resultado)
+            else:
+                filas = 0 if resultado is None else 1
+            self.connection.instrumentacion.registrar_filas(self._sql, filas, ms)
+        return resultado
+
+    def fetchone(self):
+        return self._leer(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        return self._leer(sqlite3.Cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._leer(sqlite3.Cursor.fetchall)
+
+    def __next__(self):
+        fila = self._leer(sqlite3.Cursor.fetchone)
+        if fila is None:
+            raise StopIteration
+        return fila
+
+
+class ConexionInstrumentada(ConexionPersistente):
+    """Conexión persistente cuyos cursores miden cada sentencia."""
+
+    instrumentacion: Instrumentacion = None
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    # Los atajos de Connection crean su cursor sin pasar por cursor()
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+def instrumentar_metodos(objeto, instrumentacion: Instrumentacion, excluir=()) -> List[str]:
+    """
+    Sustituye en una instancia sus métodos públicos por versiones medidas.
+
+    Solo se tocan los atributos de la instancia; la clase queda igual y
+    desinstrumentar_metodos() devuelve la instancia a su estado original.
+
+    Args:
+        objeto: Instancia a instrumentar
+        instrumentacion: Dónde se anotan los tiempos
+        excluir: Nombres de métodos que no se miden
+
+    Returns:
+        Nombres de los métodos instrumentados
+    """
+    nombres = []
+    clase = type(objeto).__name__
+    for nombre in dir(type(objeto)):
+        if nombre.startswith('_') or nombre in excluir:
+            continue
+        if not callable(getattr(type(objeto), nombre)):
+            continue
+
+        metodo = getattr(objeto, nombre)
+        etiqueta = f"{clase}.{nombre}"
+
+        def envoltura(*args, _metodo=metodo, _etiqueta=etiqueta, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return _metodo(*args, **kwargs)
+            finally:
+                instrumentacion.registrar_metodo(_etiqueta, (time.perf_counter() - inicio) * 1000)
+
+        envoltura.__wrapped__ = metodo
+        setattr(objeto, nombre, envoltura)
+        nombres.append(nombre)
+    return nombres
+
+
+def desinstrumentar_metodos(objeto, nombres: List[str]):
+    """Quita de una instancia las envolturas puestas por instrumentar_metodos."""
+    for nombre in nombres:
+        objeto.__dict__.pop(nombre, None)
+
+
+_global: Optional[Instrumentacion] = None
+_lock_global = threading.Lock()
+
+
+def desde_entorno() -> Optional[Instrumentacion]:
+    """
+    Devuelve la instrumentación compartida si FINANZAPP_INSTRUMENTACION está definida.
+
+    La primera vez se crea y se programa su volcado al fichero indicado en
+    la variable al terminar el proceso.
+
+    Returns:
+        Instrumentación del proceso, o None si la variable no está definida
+    """
+    global _global
+
+    ruta = os.environ.get(VARIABLE_ENTORNO)
+    if not ruta:
+        return None
+
+    with _lock_global:
+        if _global is None:
+            _global = Instrumentacion()
+            atexit.register(_global.volcar, ruta)
+        return _global
@@ -0,0 +1,381 @@
+"""
+Migraciones versionadas del esquema de FinanzApp.
+
+La versión de cada fichero se guarda en PRAGMA user_version. Al abrir una
+base de datos basta con leer ese número: si ya está en la última versión no
+se ejecuta nada más; si no, se aplican en orden los pasos pendientes dentro
+de una única transacción.
+
+Para cambiar el esquema (o el conjunto de índices) se añade un paso nuevo al
+final de la lista correspondiente; nunca se modifican los pasos existentes.
+Los pasos son idempotentes porque las BDs creadas antes de este sistema
+tienen user_version = 0 aunque ya tengan tablas.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Tuple
+
+
+# Conjunto de índices gestionados de la BD de finanzas, pensados para las
+# consultas reales: listados/agregados por (anio, mes) ordenados por fecha y
+# listados por categoría, también ordenados por fecha para poder paginarlos
+# por clave sin ordenar en memoria. Los índices con prefijo "idx_" que no estén aquí se
+# consideran obsoletos y se eliminan al sincronizar.
+# Al cambiarlo hay que añadir un paso de migración que cree y borre los índices
+# afectados; los pasos existentes no dependen de este diccionario.
+INDICES_FINANZAS = {
+    'idx_gastos_anio_mes_fecha': 'CREATE INDEX IF NOT EXISTS idx_gastos_anio_mes_fecha ON gastos (anio, mes, fecha)',
+    'idx_gastos_categoria_anio_mes_fecha': (
+        'CREATE INDEX IF NOT EXISTS idx_gastos_categoria_anio_mes_fecha ON gastos (categoria_id, anio, mes, fecha)'
+    ),
+    'idx_ingresos_anio_mes_fecha': 'CREATE INDEX IF NOT EXISTS idx_ingresos_anio_mes_fecha ON ingresos (anio, mes, fecha)',
+}
+
+# Índices que creó la migración 4. Está fijado aquí para que ese paso haga
+# siempre lo mismo aunque INDICES_FINANZAS cambie en pasos posteriores.
+_INDICES_V4 = {
+    'idx_gastos_anio_mes_fecha': 'CREATE INDEX IF NOT EXISTS idx_gastos_anio_mes_fecha ON gastos (anio, mes, fecha)',
+    'idx_gastos_categoria_anio': 'CREATE INDEX IF NOT EXISTS idx_gastos_categoria_anio ON gastos (categoria_id, anio, mes)',
+    'idx_ingresos_anio_mes_fecha': 'CREATE INDEX IF NOT EXISTS idx_ingresos_anio_mes_fecha ON ingresos (anio, mes, fecha)',
+}
+
+CATEGORIAS_POR_DEFECTO = [
+    ("Alimentación", "Gastos en comida y bebidas"),
+    ("Transporte", "Gastos de transporte y combustible"),
+    ("Servicios", "Facturas de luz, agua, internet, etc."),
+    ("Entretenimiento", "Ocio, salidas, hobbies"),
+    ("Salud", "Médicos, medicamentos, seguros"),
+    ("Educación", "Cursos, libros, materiales"),
+    ("Hogar", "Alquiler, mantenimiento, muebles"),
+    ("Otros", "Gastos varios")
+]
+
+# Evita que dos hilos del mismo proceso migren a la vez el mismo fichero
+_lock_migraciones = threading.Lock()
+
+
+def _columnas(cursor, tabla: str) -> List[str]:
+    """Devuelve los nombres de columna de una tabla."""
+    cursor.execute(f"PRAGMA table_info({tabla})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def sincronizar_indices(cursor, indices: Dict[str, str] = None):
+    """
+    Deja los índices de la BD de finanzas igual que un conjunto dado.
+
+    Crea los que falten y elimina los índices gestionados que ya no forman
+    parte del conjunto.
+
+    Args:
+        cursor: Cursor sobre la base de datos de finanzas
+        indices: {nombre: DDL} (por defecto INDICES_FINANZAS)
+    """
+    indices = INDICES_FINANZAS if indices is None else indices
+    cursor.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'
+    ''')
+    existentes = {fila[0] for fila in cursor.fetchall()}
+
+    for nombre in existentes - set(indices):
+        cursor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+    nuevos = set(indices) - existentes
+    for nombre in nuevos:
+        cursor.execute(indices[nombre])
+
+    # Estadísticas para que el planificador elija bien los índices nuevos
+    if nuevos:
+        cursor.execute('ANALYZE gastos')
+        cursor.execute('ANALYZE ingresos')
+
+
+# ==================== BASE DE DATOS DE USUARIOS ====================
+
+def _usuarios_v1_tabla(cursor):
+    """Crea la tabla de usuarios."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            rol TEXT DEFAULT 'usuario',
+            activo INTEGER DEFAULT 1,
+            fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultimo_acceso TIMESTAMP
+        )
+    ''')
+
+
+def _usuarios_v2_roles_y_accesos(cursor):
+    """Agrega rol, activo y ultimo_acceso a tablas de versiones antiguas."""
+    columnas = _columnas(cursor, 'usuarios')
+
+    if 'rol' not in columnas:
+        cursor.execute("ALTER TABLE usuarios ADD COLUMN rol TEXT DEFAULT 'usuario'")
+    if 'activo' not in columnas:
+        cursor.execute("ALTER TABLE usuarios ADD COLUMN activo INTEGER DEFAULT 1")
+    if 'ultimo_acceso' not in columnas:
+        cursor.execute("ALTER TABLE usuarios ADD COLUMN ultimo_acceso TIMESTAMP")
+
+
+def _usuarios_v3_indice_registro(cursor):
+    """Índice para listar los usuarios por fecha de registro, por páginas."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_usuarios_fecha_registro
+        ON usuarios(fecha_registro)
+    ''')
+
+
+MIGRACIONES_USUARIOS: List[Tuple[int, str, Callable]] = [
+    (1, "Tabla de usuarios", _usuarios_v1_tabla),
+    (2, "Columnas rol, activo y ultimo_acceso", _usuarios_v2_roles_y_accesos),
+    (3, "Índice por fecha de registro", _usuarios_v3_indice_registro),
+]
+
+
+# ==================== BASE DE DATOS DE FINANZAS ====================
+
+def _finanzas_v1_tablas(cursor):
+    """Crea las tablas de categorías, gastos e ingresos."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS categorias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT UNIQUE NOT NULL,
+            descripcion TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gastos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descripcion TEXT NOT NULL,
+            cantidad REAL NOT NULL,
+            categoria_id INTEGER NOT NULL,
+            fecha DATE NOT NULL,
+            mes INTEGER NOT NULL,
+            anio INTEGER NOT NULL,
+            metodo_pago TEXT DEFAULT 'tarjeta',
+            FOREIGN KEY (categoria_id) REFERENCES categorias(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingresos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descripcion TEXT NOT NULL,
+            cantidad REAL NOT NULL,
+            fuente TEXT NOT NULL,
+            fecha DATE NOT NULL,
+            mes INTEGER NOT NULL,
+            anio INTEGER NOT NULL
+        )
+    ''')
+
+
+def _finanzas_v2_metodo_pago(cursor):
+    """Agrega la columna metodo_pago a BDs creadas antes de existir."""
+    if 'metodo_pago' not in _columnas(cursor, 'gastos'):
+        cursor.execute("ALTER TABLE gastos ADD COLUMN metodo_pago TEXT DEFAULT 'tarjeta'")
+
+
+def _finanzas_v3_categorias_por_defecto(cursor):
+    """Inserta las categorías por defecto que falten."""
+    cursor.executemany(
+        "INSERT OR IGNORE INTO categorias (nombre, descripcion) VALUES (?, ?)",
+        CATEGORIAS_POR_DEFECTO
+    )
+
+
+def _finanzas_v4_indices(cursor):
+    """Crea los índices de consulta por mes, año y categoría."""
+    sincronizar_indices(cursor, _INDICES_V4)
+
+
+def _finanzas_v5_resumenes(cursor):
+    """
+    Crea las tablas de resumen mensual y los triggers que las mantienen.
+
+    resumen_gastos guarda total y número de gastos por (anio, mes, categoria,
+    metodo_pago) y resumen_ingresos por (anio, mes, fuente). Los triggers las
+    actualizan en cada INSERT/UPDATE/DELETE, así que los agregados se leen de
+    aquí sin recorrer las tablas de movimientos. Un grupo que se queda sin
+    movimientos se borra para que no arrastre restos de redondeo.
+    """
+    # metodo_pago puede ser NULL en filas antiguas; en la clave se guarda ''
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumen_gastos (
+            anio INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            categoria_id INTEGER NOT NULL,
+            metodo_pago TEXT NOT NULL,
+            total REAL NOT NULL,
+            cantidad INTEGER NOT NULL,
+            PRIMARY KEY (anio, mes, categoria_id, metodo_pago)
+        ) WITHOUT ROWID
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumen_ingresos (
+            anio INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            fuente TEXT NOT NULL,
+            total REAL NOT NULL,
+            cantidad INTEGER NOT NULL,
+            PRIMARY KEY (anio, mes, fuente)
+        ) WITHOUT ROWID
+    ''')
+
+    sumar_gasto = '''
+        INSERT INTO resumen_gastos (anio, mes, categoria_id, metodo_pago, total, cantidad)
+        VALUES (NEW.anio, NEW.mes, NEW.categoria_id, IFNULL(NEW.metodo_pago, ''), NEW.cantidad, 1)
+        ON CONFLICT (anio, mes, categoria_id, metodo_pago)
+        DO UPDATE SET total = total + excluded.total, cantidad = cantidad + 1;
+    '''
+    restar_gasto = '''
+        UPDATE resumen_gastos
+        SET total = total - OLD.cantidad, cantidad = cantidad - 1
+        WHERE anio = OLD.anio AND mes = OLD.mes AND categoria_id = OLD.categoria_id
+            AND metodo_pago = IFNULL(OLD.metodo_pago, '');
+        DELETE FROM resumen_gastos
+        WHERE anio = OLD.anio AND mes = OLD.mes AND categoria_id = OLD.categoria_id
+            AND metodo_pago = IFNULL(OLD.metodo_pago, '') AND cantidad <= 0;
+    '''
+    sumar_ingreso = '''
+        INSERT INTO resumen_ingresos (anio, mes, fuente, total, cantidad)
+        VALUES (NEW.anio, NEW.mes, NEW.fuente, NEW.cantidad, 1)
+        ON CONFLICT (anio, mes, fuente)
+        DO UPDATE SET total = total + excluded.total, cantidad = cantidad + 1;
+    '''
+    restar_ingreso = '''
+        UPDATE resumen_ingresos
+        SET total = total - OLD.cantidad, cantidad = cantidad - 1
+        WHERE anio = OLD.anio AND mes = OLD.mes AND fuente = OLD.fuente;
+        DELETE FROM resumen_ingresos
+        WHERE anio = OLD.anio AND mes = OLD.mes AND fuente = OLD.fuente AND cantidad <= 0;
+    '''
+
+    triggers = {
+        'trg_gastos_insert': f"AFTER INSERT ON gastos BEGIN {sumar_gasto} END",
+        'trg_gastos_delete': f"AFTER DELETE ON gastos BEGIN {restar_gasto} END",
+        'trg_gastos_update': (
+            "AFTER UPDATE OF cantidad, categoria_id, metodo_pago, mes, anio ON gastos "
+            f"BEGIN {restar_gasto} {sumar_gasto} END"
+        ),
+        'trg_ingresos_insert': f"AFTER INSERT ON ingresos BEGIN {sumar_ingreso} END",
+        'trg_ingresos_delete': f"AFTER DELETE ON ingresos BEGIN {restar_ingreso} END",
+        'trg_ingresos_update': (
+            "AFTER UPDATE OF cantidad, fuente, mes, anio ON ingresos "
+            f"BEGIN {restar_ingreso} {sumar_ingreso} END"
+        ),
+    }
+    for nombre, cuerpo in triggers.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        cursor.execute(f"CREATE TRIGGER {nombre} {cuerpo}")
+
+    # Rellenar con los movimientos que ya existían
+    cursor.execute("DELETE FROM resumen_gastos")
+    cursor.execute('''
+        INSERT INTO resumen_gastos (anio, mes, categoria_id, metodo_pago, total, cantidad)
+        SELECT anio, mes, categoria_id, IFNULL(metodo_pago, ''), SUM(cantidad), COUNT(*)
+        FROM gastos
+        GROUP BY anio, mes, categoria_id, IFNULL(metodo_pago, '')
+    ''')
+    cursor.execute("DELETE FROM resumen_ingresos")
+    cursor.execute('''
+        INSERT INTO resumen_ingresos (anio, mes, fuente, total, cantidad)
+        SELECT anio, mes, fuente, SUM(cantidad), COUNT(*)
+        FROM ingresos
+        GROUP BY anio, mes, fuente
+    ''')
+
+
+def _finanzas_v6_indice_categoria_fecha(cursor):
+    """Sustituye el índice por categoría por uno que incluye la fecha."""
+    cursor.execute('DROP INDEX IF EXISTS idx_gastos_categoria_anio')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_gastos_categoria_anio_mes_fecha ON gastos (categoria_id, anio, mes, fecha)'
+    )
+    cursor.execute('ANALYZE gastos')
+
+
+MIGRACIONES_FINANZAS: List[Tuple[int, str, Callable]] = [
+    (1, "Tablas de categorías, gastos e ingresos", _finanzas_v1_tablas),
+    (2, "Columna metodo_pago en gastos", _finanzas_v2_metodo_pago),
+    (3, "Categorías por defecto", _finanzas_v3_categorias_por_defecto),
+    (4, "Índices de consulta", _finanzas_v4_indices),
+    (5, "Resúmenes mensuales mantenidos por triggers", _finanzas_v5_resumenes),
+    (6, "Índice por categoría ordenado por fecha", _finanzas_v6_indice_categoria_fecha),
+]
+
+
+# ==================== MOTOR ====================
+
+def version_actual(conn: sqlite3.Connection) -> int:
+    """
+    Lee la versión de esquema de una base de datos.
+
+    Args:
+        conn: Conexión a la base de datos
+
+    Returns:
+        Valor de PRAGMA user_version
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migraciones(conn: sqlite3.Connection, migraciones: List[Tuple[int, str, Callable]]) -> int:
+    """
+    Lleva una base de datos a la última versión de su lista de migraciones.
+
+    Si ya está al día solo cuesta una lectura de PRAGMA user_version. Los
+    pasos pendientes se aplican en una transacción BEGIN IMMEDIATE, de modo
+    que otro proceso que migre a la vez espera y después no repite nada.
+
+    Args:
+        conn: Conexión a la base de datos
+        migraciones: Lista ordenada de (version, descripcion, funcion)
+
+    Returns:
+        Versión final de la base de datos
+    """
+    ultima = migraciones[-1][0]
+    version = version_actual(conn)
+    if version >= ultima:
+        return version
+
+    with _lock_migraciones:
+        if conn.in_transaction:
+            conn.rollback()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Releer dentro de la transacción por si otro proceso ya migró
+            version = version_actual(conn)
+            cursor = conn.cursor()
+
+            for numero, _descripcion, paso in migraciones:
+                if numero > version:
+                    paso(cursor)
+                    cursor.execute(f"PRAGMA user_version = {int(numero)}")
+                    version = numero
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return version
+
+
+def migrar_usuarios(conn: sqlite3.Connection) -> int:
+    """Aplica las migraciones pendientes de la BD de usuarios."""
+    return aplicar_migraciones(conn, MIGRACIONES_USUARIOS)
+
+
+def migrar_finanzas(conn: sqlite3.Connection) -> int:
+    """Aplica las migraciones pendientes de una BD de finanzas."""
+    return aplicar_migraciones(conn, MIGRACIONES_FINANZAS)
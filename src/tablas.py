@@ -0,0 +1,263 @@
+"""
+Actualización incremental de Treeviews.
+
+Vaciar un Treeview y volver a insertar todas las filas en cada recarga
+cuesta una llamada a Tk por fila, hace parpadear la tabla y pierde la
+selección y el scroll. TablaSincronizada identifica cada fila por su clave
+(el id del gasto, el número de mes...) y en cada recarga aplica solo la
+diferencia con lo que ya se muestra: borra las filas que sobran, inserta
+las nuevas, actualiza las que han cambiado y mueve las que cambian de sitio.
+
+ListaPaginada va un paso más allá para listados que pueden tener decenas de
+miles de filas: solo mantiene en el Treeview una ventana de unas pocas
+páginas alrededor de lo visible y pide a la base de datos la página
+siguiente o la anterior (paginación por clave) según se desplaza el scroll.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .tareas import EjecutorSincrono
+except ImportError:
+    from tareas import EjecutorSincrono
+
+
+# Filas que se piden en cada página
+TAMANO_PAGINA = 200
+
+# Fracción del scroll a la que se pide la página siguiente o la anterior
+UMBRAL_SCROLL = 0.1
+
+
+class TablaSincronizada:
+    """Mantiene un Treeview igual a una lista de filas con clave."""
+
+    def __init__(self, tree):
+        """
+        Args:
+            tree: ttk.Treeview que se va a mantener
+        """
+        self.tree = tree
+        # iid -> (values, tags) de lo que hay pintado
+        self._filas: Dict[str, Tuple[tuple, tuple]] = {}
+        self._orden = []
+
+    def actualizar(self, filas: Iterable[tuple]) -> Dict[str, int]:
+        """
+        Deja el Treeview con exactamente estas filas y en este orden.
+
+        Args:
+            filas: Tuplas (clave, values) o (clave, values, tags). La clave
+                debe ser única y se usa como iid del Treeview
+
+        Returns:
+            Diccionario con el número de filas 'insertadas', 'actualizadas',
+            'eliminadas' y 'movidas'
+        """
+        nuevas = []
+        datos = {}
+        for fila in filas:
+            iid = str(fila[0])
+            values = tuple(fila[1])
+            tags = tuple(fila[2]) if len(fila) > 2 else ()
+            nuevas.append(iid)
+            datos[iid] = (values, tags)
+
+        resumen = {'insertadas': 0, 'actualizadas': 0, 'eliminadas': 0, 'movidas': 0}
+
+        # Borrar de una vez las filas que ya no están
+        sobrantes = [iid for iid in self._orden if iid not in datos]
+        if sobrantes:
+            self.tree.delete(*sobrantes)
+            resumen['eliminadas'] = len(sobrantes)
+        orden = [iid for iid in self._orden if iid in datos]
+
+        # Se recorre el orden nuevo dejando colocado el prefijo [0, indice).
+        # Lo que queda detrás conserva el orden antiguo, así que la fila que
+        # ocupa ahora la posición indice es la primera de `orden` aún sin
+        # colocar: basta un puntero que solo avanza, sin insertar ni quitar
+        # en listas, y solo se insertan o mueven las filas que no coinciden
+        colocadas = set()
+        siguiente = 0
+        for indice, iid in enumerate(nuevas):
+            while siguiente < len(orden) and orden[siguiente] in colocadas:
+                siguiente += 1
+
+            values, tags = datos[iid]
+            anterior = self._filas.get(iid)
+
+            if anterior is None:
+                self.tree.insert('', indice, iid=iid, values=values, tags=tags)
+                resumen['insertadas'] += 1
+                continue
+
+            if anterior != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+                resumen['actualizadas'] += 1
+
+            if siguiente < len(orden) and orden[siguiente] == iid:
+                siguiente += 1
+            else:
+                self.tree.move(iid, '', indice)
+                resumen['movidas'] += 1
+            colocadas.add(iid)
+
+        self._filas = datos
+        self._orden = nuevas
+        return resumen
+
+    def vaciar(self):
+        """Quita todas las filas."""
+        self.actualizar(())
+
+
+class ListaPaginada:
+    """
+    Treeview que solo tiene cargada una ventana de filas alrededor de lo visible.
+
+    El listado se lee por páginas con una función consultar(limite, despues,
+    antes) que recibe la clave de la última fila cargada (para avanzar) o la
+    de la primera (para retroceder). Al acercarse el scroll a un extremo se
+    pide la página contigua y, si la ventana supera max_paginas, se descartan
+    las filas del extremo opuesto. La memoria y el coste de pintar dependen
+    así del tamaño de la ventana y no del número total de filas.
+    """
+
+    def __init__(self, tree, consultar: Callable[..., List[tuple]],
+                 formatear: Callable[[tuple], tuple], clave: Callable[[tuple], tuple],
+                 scrollbar=None, ejecutor=None, tamano_pagina: int = TAMANO_PAGINA,
+                 max_paginas: int = 3):
+        """
+        Args:
+            tree: ttk.Treeview donde se muestran las filas
+            consultar: Función (limite, despues=None, antes=None) que devuelve
+                las filas en el orden en que se muestran
+            formatear: Convierte una fila en (iid, values) o (iid, values, tags)
+            clave: Devuelve la clave de paginación de una fila
+            scrollbar: Scrollbar vertical asociada al tree (opcional)
+            ejecutor: EjecutorTareas para consultar en segundo plano
+                (None para consultar en el hilo principal)
+            tamano_pagina: Filas por página
+            max_paginas: Páginas que se mantienen cargadas como máximo
+        """
+        self.tree = tree
+        self.consultar = consultar
+        self.formatear = formatear
+        self.clave = clave
+        self.scrollbar = scrollbar
+        self.ejecutor = ejecutor or EjecutorSincrono()
+        self.tamano_pagina = tamano_pagina
+        self.max_filas = tamano_pagina * max_paginas
+
+        self.tabla = TablaSincronizada(tree)
+        self.filas: List[tuple] = []
+        # Clave de la fila anterior a la ventana (None si empieza en la primera)
+        self.inicio: Optional[tuple] = None
+        # Si quedan filas después de la ventana
+        self.hay_mas = False
+        self._cargando = False
+
+        self.tree.configure(yscrollcommand=self._al_desplazar)
+
+    def cargar(self):
+        """Carga la primera página y vuelve al principio del listado."""
+        limite = self.tamano_pagina + 1
+        self._pedir(lambda: self.consultar(limite), self._al_cargar)
+
+    def recargar(self):
+        """Vuelve a leer la ventana actual sin mover el scroll."""
+        limite = max(len(self.filas), self.tamano_pagina) + 1
+        inicio = self.inicio
+        self._pedir(lambda: self.consultar(limite, despues=inicio),
+                    lambda filas: self._al_recargar(filas, limite))
+
+    def _pedir(self, consulta, al_terminar):
+        """Lanza una consulta; una nueva deja obsoleta a la anterior."""
+        self._cargando = True
+        self.ejecutor.ejecutar((id(self), 'pagina'), consulta, al_terminar,
+                               al_fallar=self._al_fallar, ocupado=self.tree)
+
+    def _al_fallar(self, error):
+        # Sin esto un fallo dejaría _cargando activo y no se pedirían más páginas
+        self._cargando = False
+        print(f"Error al cargar la página: {error}")
+
+    def _al_cargar(self, filas):
+        self._cargando = False
+        self.hay_mas = len(filas) > self.tamano_pagina
+        self.inicio = None
+        self._mostrar(filas[:self.tamano_pagina])
+        self.tree.yview_moveto(0)
+
+    def _al_recargar(self, filas, limite):
+        self._cargando = False
+        if not filas and self.inicio is not None:
+            # La ventana se ha quedado vacía: volver al principio
+            self.cargar()
+            return
+        self.hay_mas = len(filas) >= limite
+        self._mostrar(filas[:limite - 1])
+
+    def _siguiente(self):
+        """Añade la página siguiente al final de la ventana."""
+        if self._cargando or not self.hay_mas or not self.filas:
+            return
+        limite = self.tamano_pagina + 1
+        despues = self.clave(self.filas[-1])
+        self._pedir(lambda: self.consultar(limite, despues=despues), self._al_siguiente)
+
+    def _al_siguiente(self, nuevas):
+        self._cargando = False
+        self.hay_mas = len(nuevas) > self.tamano_pagina
+        filas = self.filas + nuevas[:self.tamano_pagina]
+
+        sobrantes = len(filas) - self.max_filas
+        if sobrantes > 0:
+            self.inicio = self.clave(filas[sobrantes - 1])
+            filas = filas[sobrantes:]
+        self._mostrar(filas)
+
+        # Las filas quitadas por arriba desplazan la vista; compensarlo
+        if sobrantes > 0:
+            self.tree.yview_scroll(-sobrantes, 'units')
+
+    def _anterior(self):
+        """Añade la página anterior al principio de la ventana."""
+        if self._cargando or self.inicio is None or not self.filas:
+            return
+        limite = self.tamano_pagina + 1
+        antes = self.clave(self.filas[0])
+        self._pedir(lambda: self.consultar(limite, antes=antes), self._al_anterior)
+
+    def _al_anterior(self, nuevas):
+        self._cargando = False
+        # La fila sobrante, si la hay, es la anterior a la nueva ventana
+        if len(nuevas) > self.tamano_pagina:
+            self.inicio = self.clave(nuevas[0])
+            nuevas = nuevas[1:]
+        else:
+            self.inicio = None
+
+        filas = nuevas + self.filas
+        if len(filas) > self.max_filas:
+            filas = filas[:self.max_filas]
+            self.hay_mas = True
+        self._mostrar(filas)
+
+        # Las filas añadidas por arriba desplazan la vista; compensarlo
+        if nuevas:
+            self.tree.yview_scroll(len(nuevas), 'units')
+
+    def _mostrar(self, filas: List[tuple]):
+        self.filas = list(filas)
+        self.tabla.actualizar(self.formatear(fila) for fila in self.filas)
+
+    def _al_desplazar(self, primero, ultimo):
+        """yscrollcommand del tree: mueve la scrollbar y pide páginas."""
+        if self.scrollbar is not None:
+            self.scrollbar.set(primero, ultimo)
+
+        if float(ultimo) >= 1 - UMBRAL_SCROLL:
+            self._siguiente()
+        elif float(primero) <= UMBRAL_SCROLL:
+            self._anterior()
@@ -0,0 +1,175 @@
+"""
+Ejecución de consultas en segundo plano para las vistas Tk.
+
+Tkinter solo puede tocarse desde el hilo principal, así que las consultas a
+la base de datos se lanzan en un pool de hilos y sus resultados se recogen
+desde el hilo principal con after(). Database es segura para esto porque
+cada hilo usa su propia conexión (ver conexiones.GestorConexiones).
+
+Cada petición lleva una clave (por ejemplo, la vista y lo que carga). Si se
+lanza otra petición con la misma clave antes de que termine la anterior, la
+anterior queda obsoleta: se cancela si aún no había empezado y su resultado
+se descarta si llega tarde. Así, cambiar de año varias veces seguidas solo
+pinta los datos del último año elegido.
+"""
+
+import itertools
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class EjecutorTareas:
+    """Pool de hilos cuyos resultados se entregan en el hilo de Tk."""
+
+    def __init__(self, widget, max_hilos: int = 2, intervalo_ms: int = 30):
+        """
+        Inicializa el ejecutor.
+
+        Args:
+            widget: Widget Tk usado para programar after() (normalmente la raíz)
+            max_hilos: Número de hilos del pool
+            intervalo_ms: Cada cuánto se comprueban resultados pendientes
+        """
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="finanzapp-bd")
+        self._resultados = queue.Queue()
+        self._generaciones = itertools.count()
+        self._pendientes: Dict[Hashable, Dict[str, Any]] = {}
+        self._ocupados: Dict[Any, set] = {}
+        self._sondeando = False
+
+    def ejecutar(self, clave: Hashable, consulta: Callable[[], Any],
+                 al_terminar: Callable[[Any], None],
+                 al_fallar: Optional[Callable[[Exception], None]] = None,
+                 ocupado=None):
+        """
+        Lanza una consulta en segundo plano.
+
+        Args:
+            clave: Identifica la petición; una nueva con la misma clave deja
+                obsoleta a la anterior
+            consulta: Función sin argumentos que se ejecuta en el pool
+                (no debe tocar widgets)
+            al_terminar: Recibe el resultado, en el hilo de Tk
+            al_fallar: Recibe la excepción, en el hilo de Tk. Si es None se
+                imprime la traza
+            ocupado: Widget que muestra el cursor de espera mientras haya
+                peticiones suyas pendientes
+        """
+        anterior = self._pendientes.get(clave)
+        if anterior:
+            anterior['futuro'].cancel()
+
+        generacion = next(self._generaciones)
+        futuro = self._pool.submit(consulta)
+        self._pendientes[clave] = {
+            'generacion': generacion,
+            'futuro': futuro,
+            'al_terminar': al_terminar,
+            'al_fallar': al_fallar,
+            'ocupado': ocupado,
+        }
+        self._marcar_ocupado(ocupado, clave, True)
+
+        futuro.add_done_callback(lambda f: self._resultados.put((clave, generacion)))
+        self._programar_sondeo()
+
+    def cancelar(self, clave: Hashable):
+        """Descarta la petición pendiente con esa clave, si la hay."""
+        pendiente = self._pendientes.pop(clave, None)
+        if pendiente:
+            pendiente['futuro'].cancel()
+            self._marcar_ocupado(pendiente['ocupado'], clave, False)
+
+    def hay_pendientes(self) -> bool:
+        """Indica si queda alguna petición sin entregar."""
+        return bool(self._pendientes)
+
+    def cerrar(self):
+        """Cancela lo pendiente y detiene el pool sin esperar."""
+        for clave in list(self._pendientes):
+            self.cancelar(clave)
+        self._pool.shutdown(wait=False)
+
+    def _marcar_ocupado(self, widget, clave, activo: bool):
+        """Pone o quita el cursor de espera del widget."""
+        if widget is None:
+            return
+        claves = self._ocupados.setdefault(widget, set())
+        if activo:
+            claves.add(clave)
+        else:
+            claves.discard(clave)
+        try:
+            widget.config(cursor='watch' if claves else '')
+        except Exception:
+            pass  # El widget puede haberse destruido
+
+    def _programar_sondeo(self):
+        """Programa la recogida de resultados si no está ya programada."""
+        if not self._sondeando:
+            self._sondeando = True
+            self.widget.after(self.intervalo_ms, self._procesar)
+
+    def _procesar(self):
+        """Entrega los resultados terminados (se ejecuta en el hilo de Tk)."""
+        self._sondeando = False
+
+        while True:
+            try:
+                clave, generacion = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+
+            pendiente = self._pendientes.get(clave)
+            if pendiente is None or pendiente['generacion'] != generacion:
+                continue  # Petición obsoleta o cancelada
+
+            del self._pendientes[clave]
+            self._marcar_ocupado(pendiente['ocupado'], clave, False)
+
+            futuro = pendiente['futuro']
+            if futuro.cancelled():
+                continue
+
+            error = futuro.exception()
+            if error is None:
+                pendiente['al_terminar'](futuro.result())
+            elif pendiente['al_fallar']:
+                pendiente['al_fallar'](error)
+            else:
+                traceback.print_exception(type(error), error, error.__traceback__)
+
+        if self._pendientes:
+            self._programar_sondeo()
+
+
+class EjecutorSincrono:
+    """
+    Ejecutor con la misma interfaz que EjecutorTareas pero sin hilos.
+
+    Lo usan las vistas creadas sin ejecutor (scripts, tests): la consulta y
+    su callback se ejecutan en el momento.
+    """
+
+    def ejecutar(self, clave, consulta, al_terminar, al_fallar=None, ocupado=None):
+        try:
+            resultado = consulta()
+        except Exception as e:
+            if al_fallar is None:
+                raise
+            al_fallar(e)
+            return
+        al_terminar(resultado)
+
+    def cancelar(self, clave):
+        pass
+
+    def hay_pendientes(self) -> bool:
+        return False
+
+    def cerrar(self):
+        pass
@@ -1,5 +1,6 @@
 import sys
 from src import Database
+from src.exportacion import exportar_anio, ESCRITORES
 
 
 def mostrar_menu():
@@ -114,7 +115,7 @@ def ver_gastos_mes():
             print(f"{'Fecha':<12} {'Descripción':<25} {'Categoría':<15} {'Cantidad':>10}")
             print("-"*60)
 
-            for gasto_id, descripcion, cantidad, categoria, fecha in gastos:
+            for gasto_id, descripcion, cantidad, categoria, fecha, metodo_pago in gastos:
                 desc_corta = descripcion[:23] + "..." if len(descripcion) > 23 else descripcion
                 print(f"{fecha:<12} {desc_corta:<25} {categoria:<15} €{cantidad:>8.2f}")
 
@@ -154,76 +155,25 @@ def limpiar_base_datos():
 
 
 def exportar_datos():
-    """Exporta los datos a un archivo de texto."""
-    db = Database()
-
+    """Exporta el informe anual de gastos a TXT, CSV o JSON."""
     print("\n" + "-"*60)
     print("EXPORTAR DATOS")
     print("-"*60)
 
     try:
+        usuario_id = int(input("ID del usuario: "))
         anio = int(input("Año a exportar: "))
+        formato = input(f"Formato ({', '.join(ESCRITORES)}) [txt]: ").strip().lower() or "txt"
 
-        nombre_archivo = f"gastos_{anio}.txt"
-
-        with open(nombre_archivo, 'w', encoding='utf-8') as f:
-            f.write(f"REPORTE DE GASTOS - AÑO {anio}\n")
-            f.write("="*80 + "\n\n")
-
-            # Total anual
-            total_anual = db.obtener_total_anual(anio)
-            f.write(f"TOTAL ANUAL: €{total_anual:.2f}\n")
-            f.write("="*80 + "\n\n")
-
-            # Por mes
-            meses_nombres = [
-                "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-                "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
-            ]
-
-            for i, mes_nombre in enumerate(meses_nombres, 1):
-                gastos = db.obtener_gastos_mes(i, anio)
-                total_mes = db.obtener_total_mes(i, anio)
-
-                if gastos:
-                    f.write(f"\n{mes_nombre.upper()} {anio}\n")
-                    f.write("-"*80 + "\n")
-
-                    for gasto_id, descripcion, cantidad, categoria, fecha in gastos:
-                        f.write(f"{fecha}  |  {categoria:<15}  |  {descripcion:<30}  |  €{cantidad:>8.2f}\n")
+        nombre_archivo = f"gastos_{anio}.{formato}"
 
-                    f.write("-"*80 + "\n")
-                    f.write(f"Total {mes_nombre}: €{total_mes:.2f}\n")
-                    f.write("\n")
+        with Database(usuario_id=usuario_id) as db:
+            resultado = exportar_anio(db, anio, nombre_archivo, formato)
 
-            # Estadísticas por categoría
-            f.write("\n" + "="*80 + "\n")
-            f.write("ESTADÍSTICAS POR CATEGORÍA\n")
-            f.write("="*80 + "\n\n")
+        print(f"✓ {resultado['gastos']} gastos exportados a '{nombre_archivo}'")
 
-            conn = db.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT c.nombre, SUM(g.cantidad) as total, COUNT(g.id) as cantidad
-                FROM categorias c
-                LEFT JOIN gastos g ON c.id = g.categoria_id AND g.anio = ?
-                GROUP BY c.nombre
-                HAVING total > 0
-                ORDER BY total DESC
-            ''', (anio,))
-
-            resultados = cursor.fetchall()
-            conn.close()
-
-            for categoria, total, cantidad in resultados:
-                porcentaje = (total / total_anual * 100) if total_anual > 0 else 0
-                f.write(f"{categoria:<20}  |  €{total:>10.2f}  |  {cantidad:>3} gastos  |  {porcentaje:>5.1f}%\n")
-
-        print(f"✓ Datos exportados a '{nombre_archivo}'")
-
-    except ValueError:
-        print("❌ Formato inválido")
+    except ValueError as e:
+        print(f"❌ Formato inválido: {e}")
     except Exception as e:
         print(f"❌ Error al exportar: {e}")
 
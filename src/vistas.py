@@ -4,14 +4,20 @@ from datetime import datetime
 
 try:
     from .estilos import crear_tarjeta_balance, crear_boton_moderno, COLORES
+    from .tareas import EjecutorSincrono
+    from .eventos import RefrescoDiferido
+    from .tablas import TablaSincronizada, ListaPaginada
 except ImportError:
     from estilos import crear_tarjeta_balance, crear_boton_moderno, COLORES
+    from tareas import EjecutorSincrono
+    from eventos import RefrescoDiferido
+    from tablas import TablaSincronizada, ListaPaginada
 
 
 class VistaGastosMensual:
     """Vista para mostrar y gestionar los gastos de un mes específico."""
 
-    def __init__(self, parent, db, mes: int, anio: int):
+    def __init__(self, parent, db, mes: int, anio: int, ejecutor=None):
         """
         Inicializa la vista mensual.
 
@@ -20,19 +26,24 @@ class VistaGastosMensual:
             db: Instancia de la base de datos
             mes: Número del mes (1-12)
             anio: Año
+            ejecutor: EjecutorTareas para consultar en segundo plano
+                (None para consultar en el hilo principal)
         """
         self.db = db
         self.mes = mes
         self.anio = anio
+        self.ejecutor = ejecutor or EjecutorSincrono()
 
         # Frame principal (usar tk.Frame para soportar bg)
         self.frame = tk.Frame(parent, bg=COLORES['fondo'])
 
-        # Crear interfaz
-        self.crear_interfaz()
+        # Partes ('gastos', 'ingresos') pendientes de recargar
+        self.partes_sucias = set()
+        self.refresco = RefrescoDiferido(self.frame, self.recargar_sucio)
+        self.db.cambios.suscribir(self.al_cambiar_datos)
 
-        # Cargar gastos
-        self.cargar_gastos()
+        # Crear interfaz (también carga gastos e ingresos)
+        self.crear_interfaz()
 
     def crear_interfaz(self):
         """Crea la interfaz de la vista mensual con diseño moderno."""
@@ -180,7 +191,17 @@ class VistaGastosMensual:
 
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree_gastos.yview)
-        self.tree_gastos.configure(yscrollcommand=scrollbar.set)
+
+        # Solo se cargan las páginas cercanas a lo visible, por (fecha, id)
+        self.lista_gastos = ListaPaginada(
+            self.tree_gastos,
+            self.consultar_pagina_gastos,
+            self.formatear_gasto,
+            clave=lambda gasto: (gasto[4], gasto[0]),
+            scrollbar=scrollbar,
+            ejecutor=self.ejecutor
+        )
+        self.periodo_gastos = None
 
         self.tree_gastos.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -317,6 +338,8 @@ class VistaGastosMensual:
         self.tree_ingresos.column("Fuente", width=150)
         self.tree_ingresos.column("Monto", width=100, anchor=tk.E)
 
+        self.tabla_ingresos = TablaSincronizada(self.tree_ingresos)
+
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree_ingresos.yview)
         self.tree_ingresos.configure(yscrollcommand=scrollbar.set)
@@ -413,10 +436,6 @@ class VistaGastosMensual:
             fecha_hoy = datetime.now()
             self.fecha_gasto.establecer_valores(fecha_hoy.day, fecha_hoy.month, fecha_hoy.year)
             self.combo_metodo_pago.current(1)  # Tarjeta por defecto
-
-
-            # Recargar gastos
-            self.cargar_gastos()
         else:
             messagebox.showerror("Error", "No se pudo agregar el gasto")
 
@@ -470,66 +489,121 @@ class VistaGastosMensual:
             # Resetear fecha a hoy
             fecha_hoy = datetime.now()
             self.fecha_ingreso.establecer_valores(fecha_hoy.day, fecha_hoy.month, fecha_hoy.year)
-
-            # Recargar ingresos
-            self.cargar_ingresos()
         else:
             messagebox.showerror("Error", "No se pudo agregar el ingreso")
 
+    def al_cambiar_datos(self, cambio):
+        """
+        Marca como sucias las partes de la vista afectadas por un cambio.
+
+        Args:
+            cambio: Cambio publicado por la base de datos
+        """
+        if cambio.entidad == 'categorias':
+            # Los gastos muestran el nombre de la categoría
+            self.marcar_sucio('gastos')
+        elif (cambio.anio, cambio.mes) == (self.anio, self.mes):
+            self.marcar_sucio(cambio.entidad)
+
+    def marcar_sucio(self, *partes):
+        """
+        Marca partes de la vista para recargarlas cuando se muestre.
+
+        Args:
+            partes: 'gastos' y/o 'ingresos' (ninguna para marcar ambas)
+        """
+        self.partes_sucias.update(partes or ('gastos', 'ingresos'))
+        self.refresco.marcar()
+
+    def recargar_sucio(self):
+        """Recarga solo las partes marcadas como sucias."""
+        partes, self.partes_sucias = self.partes_sucias, set()
+        if 'gastos' in partes:
+            self.cargar_gastos()
+        if 'ingresos' in partes:
+            self.cargar_ingresos()
+
     def cargar_gastos(self):
-        """Carga los gastos del mes en el Treeview."""
-        # Limpiar tree
-        for item in self.tree_gastos.get_children():
-            self.tree_gastos.delete(item)
+        """Carga en segundo plano los gastos visibles del mes y el balance."""
+        # Al cambiar de periodo se vuelve al principio; si no, se relee la
+        # ventana que se está viendo
+        if self.periodo_gastos != (self.mes, self.anio):
+            self.periodo_gastos = (self.mes, self.anio)
+            self.lista_gastos.cargar()
+        else:
+            self.lista_gastos.recargar()
 
-        # Obtener gastos
-        gastos = self.db.obtener_gastos_mes(self.mes, self.anio)
+        mes, anio = self.mes, self.anio
+        self.ejecutor.ejecutar(
+            (id(self), 'balance'),
+            lambda: self.db.obtener_balance_mes(mes, anio),
+            self.actualizar_balance,
+            ocupado=self.frame
+        )
 
-        # Agregar al tree
-        for gasto in gastos:
-            # Manejar ambos formatos: con y sin metodo_pago
-            if len(gasto) == 6:
-                gasto_id, descripcion, cantidad, categoria, fecha, metodo_pago = gasto
-            else:
-                gasto_id, descripcion, cantidad, categoria, fecha = gasto
-                metodo_pago = 'tarjeta'  # Valor por defecto
+    def consultar_pagina_gastos(self, limite: int, despues: tuple = None, antes: tuple = None):
+        """Lee una página de gastos del mes (se ejecuta en el pool)."""
+        return self.db.obtener_gastos_mes_pagina(self.mes, self.anio, limite, despues, antes)
 
-            # Mostrar icono según método de pago
-            metodo_texto = "💵 Efectivo" if metodo_pago == 'efectivo' else "💳 Tarjeta"
+    def formatear_gasto(self, gasto) -> tuple:
+        """
+        Convierte un gasto en una fila del Treeview.
 
-            self.tree_gastos.insert(
-                "",
-                tk.END,
-                values=(gasto_id, fecha, descripcion, categoria, metodo_texto, f"{cantidad:.2f}")
-            )
+        Args:
+            gasto: Tupla devuelta por obtener_gastos_mes_pagina
 
-        # Actualizar totales y balance
-        self.actualizar_balance()
+        Returns:
+            Tupla (id, values)
+        """
+        # Manejar ambos formatos: con y sin metodo_pago
+        if len(gasto) == 6:
+            gasto_id, descripcion, cantidad, categoria, fecha, metodo_pago = gasto
+        else:
+            gasto_id, descripcion, cantidad, categoria, fecha = gasto
+            metodo_pago = 'tarjeta'  # Valor por defecto
+
+        # Mostrar icono según método de pago
+        metodo_texto = "💵 Efectivo" if metodo_pago == 'efectivo' else "💳 Tarjeta"
+
+        return gasto_id, (gasto_id, fecha, descripcion, categoria, metodo_texto, f"{cantidad:.2f}")
 
     def cargar_ingresos(self):
-        """Carga los ingresos del mes en el Treeview."""
-        # Limpiar tree
-        for item in self.tree_ingresos.get_children():
-            self.tree_ingresos.delete(item)
+        """Carga en segundo plano los ingresos del mes y el balance."""
+        mes, anio = self.mes, self.anio
+        self.ejecutor.ejecutar(
+            (id(self), 'ingresos'),
+            lambda: (self.db.obtener_ingresos_mes(mes, anio), self.db.obtener_balance_mes(mes, anio)),
+            self.mostrar_ingresos,
+            ocupado=self.frame
+        )
 
-        # Obtener ingresos
-        ingresos = self.db.obtener_ingresos_mes(self.mes, self.anio)
+    def mostrar_ingresos(self, datos):
+        """
+        Pinta los ingresos del mes en el Treeview.
 
-        # Agregar al tree
-        for ingreso in ingresos:
-            ingreso_id, descripcion, cantidad, fuente, fecha = ingreso
-            self.tree_ingresos.insert(
-                "",
-                tk.END,
-                values=(ingreso_id, fecha, descripcion, fuente, f"{cantidad:.2f}")
-            )
+        Args:
+            datos: Tupla (ingresos, balance) devuelta por la consulta
+        """
+        ingresos, balance_data = datos
+
+        # Aplicar solo las diferencias con lo que ya se muestra
+        self.tabla_ingresos.actualizar(
+            (ingreso_id, (ingreso_id, fecha, descripcion, fuente, f"{cantidad:.2f}"))
+            for ingreso_id, descripcion, cantidad, fuente, fecha in ingresos
+        )
 
         # Actualizar totales y balance
-        self.actualizar_balance()
+        self.actualizar_balance(balance_data)
 
-    def actualizar_balance(self):
-        """Actualiza los labels de balance, ingresos y gastos con estilo moderno."""
-        balance_data = self.db.obtener_balance_mes(self.mes, self.anio)
+    def actualizar_balance(self, balance_data: dict = None):
+        """
+        Actualiza los labels de balance, ingresos y gastos con estilo moderno.
+
+        Args:
+            balance_data: Balance ya consultado; si es None se consulta ahora
+        """
+        if balance_data is None:
+            balance_data = self.db.obtener_balance_mes(self.mes, self.anio)
 
         ingresos = balance_data['ingresos']
         gastos = balance_data['gastos']
@@ -566,7 +640,6 @@ class VistaGastosMensual:
 
             if self.db.eliminar_gasto(gasto_id):
                 messagebox.showinfo("Éxito", "Gasto eliminado correctamente")
-                self.cargar_gastos()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el gasto")
 
@@ -584,7 +657,6 @@ class VistaGastosMensual:
 
             if self.db.eliminar_ingreso(ingreso_id):
                 messagebox.showinfo("Éxito", "Ingreso eliminado correctamente")
-                self.cargar_ingresos()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el ingreso")
 
@@ -767,7 +839,6 @@ class VistaGastosMensual:
             if self.db.actualizar_gasto(gasto_id, nueva_desc, nueva_cant, nueva_cat_id, nueva_fecha, nuevo_metodo_pago):
                 messagebox.showinfo("Éxito", "Gasto actualizado correctamente")
                 ventana.destroy()
-                self.cargar_gastos()
             else:
                 messagebox.showerror("Error", "No se pudo actualizar el gasto")
 
@@ -917,7 +988,6 @@ class VistaGastosMensual:
             if self.db.actualizar_ingreso(ingreso_id, nueva_desc, nueva_cant, nueva_fuente, nueva_fecha):
                 messagebox.showinfo("Éxito", "Ingreso actualizado correctamente")
                 ventana.destroy()
-                self.cargar_ingresos()
             else:
                 messagebox.showerror("Error", "No se pudo actualizar el ingreso")
 
@@ -948,15 +1018,14 @@ class VistaGastosMensual:
             valores_ingreso = self.fecha_ingreso.obtener_valores()
             self.fecha_ingreso.establecer_valores(valores_ingreso['dia'], valores_ingreso['mes'], nuevo_anio)
 
-        # Recargar gastos e ingresos del nuevo año
-        self.cargar_gastos()
-        self.cargar_ingresos()
+        # Recargar gastos e ingresos del nuevo año cuando la vista se muestre
+        self.marcar_sucio('gastos', 'ingresos')
 
 
 class VistaComparacionAnual:
     """Vista para comparar los gastos de todos los meses del año."""
 
-    def __init__(self, parent, db, anio: int):
+    def __init__(self, parent, db, anio: int, ejecutor=None):
         """
         Inicializa la vista de comparación anual.
 
@@ -964,18 +1033,30 @@ class VistaComparacionAnual:
             parent: Widget padre
             db: Instancia de la base de datos
             anio: Año
+            ejecutor: EjecutorTareas para consultar en segundo plano
+                (None para consultar en el hilo principal)
         """
         self.db = db
         self.anio = anio
+        self.ejecutor = ejecutor or EjecutorSincrono()
 
         # Frame principal con fondo
         self.frame = tk.Frame(parent, bg=COLORES['fondo'])
 
-        # Crear interfaz
+        self.refresco = RefrescoDiferido(self.frame, self.cargar_datos)
+        self.db.cambios.suscribir(self.al_cambiar_datos)
+
+        # Crear interfaz (también carga los datos)
         self.crear_interfaz()
 
-        # Cargar datos
-        self.cargar_datos()
+    def al_cambiar_datos(self, cambio):
+        """Marca la vista como sucia si cambian gastos o ingresos de su año."""
+        if cambio.entidad in ('gastos', 'ingresos') and cambio.anio == self.anio:
+            self.marcar_sucio()
+
+    def marcar_sucio(self):
+        """Recarga la vista cuando se muestre."""
+        self.refresco.marcar()
 
     def crear_interfaz(self):
         """Crea la interfaz de la vista de comparación."""
@@ -1015,6 +1096,8 @@ class VistaComparacionAnual:
         self.tree.column("Balance", width=150, anchor=tk.E)
         self.tree.column("Estado", width=150, anchor=tk.CENTER)
 
+        self.tabla = TablaSincronizada(self.tree)
+
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
@@ -1114,10 +1197,22 @@ class VistaComparacionAnual:
         self.cargar_datos()
 
     def cargar_datos(self):
-        """Carga los datos de comparación anual con ingresos, gastos y balance."""
-        # Limpiar tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Carga en segundo plano los datos de comparación anual."""
+        anio = self.anio
+        self.ejecutor.ejecutar(
+            (id(self), 'comparacion'),
+            lambda: self.db.obtener_resumen_anual(anio),
+            self.mostrar_datos,
+            ocupado=self.frame
+        )
+
+    def mostrar_datos(self, resumen):
+        """
+        Pinta la comparación anual con ingresos, gastos y balance.
+
+        Args:
+            resumen: Diccionario devuelto por Database.obtener_resumen_anual
+        """
 
         # Nombres de meses
         meses_nombres = [
@@ -1125,30 +1220,17 @@ class VistaComparacionAnual:
             "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
         ]
 
-        # Obtener datos de ingresos y gastos
-        comparacion_gastos = self.db.obtener_comparacion_anual(self.anio)
-        comparacion_ingresos = self.db.obtener_comparacion_ingresos_anual(self.anio)
-
-        # Crear diccionarios
-        gastos_por_mes = {mes: 0.0 for mes in range(1, 13)}
-        ingresos_por_mes = {mes: 0.0 for mes in range(1, 13)}
-
-        for mes, total in comparacion_gastos:
-            gastos_por_mes[mes] = total
-
-        for mes, total in comparacion_ingresos:
-            ingresos_por_mes[mes] = total
-
         # Variables para totales anuales
         total_ingresos_anual = 0.0
         total_gastos_anual = 0.0
         meses_con_datos = 0
 
-        # Agregar cada mes al tree
+        # Una fila por mes, identificada por su número
+        filas = []
         for mes in range(1, 13):
-            ingresos = ingresos_por_mes[mes]
-            gastos = gastos_por_mes[mes]
-            balance = ingresos - gastos
+            ingresos = resumen['meses'][mes]['ingresos']
+            gastos = resumen['meses'][mes]['gastos']
+            balance = resumen['meses'][mes]['balance']
 
             # Determinar estado y tag
             if balance > 0:
@@ -1161,19 +1243,17 @@ class VistaComparacionAnual:
                 estado = "➖ Neutro"
                 tag = 'cero'
 
-            # Insertar fila
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
+            filas.append((
+                mes,
+                (
                     meses_nombres[mes - 1],
                     f"{ingresos:.2f}",
                     f"{gastos:.2f}",
                     f"{balance:+.2f}",  # El + muestra el signo
                     estado
                 ),
-                tags=(tag,)
-            )
+                (tag,)
+            ))
 
             # Acumular totales
             total_ingresos_anual += ingresos
@@ -1183,6 +1263,8 @@ class VistaComparacionAnual:
             if ingresos > 0 or gastos > 0:
                 meses_con_datos += 1
 
+        self.tabla.actualizar(filas)
+
         # Calcular balance anual
         balance_anual = total_ingresos_anual - total_gastos_anual
 
@@ -1222,10 +1304,8 @@ class VistaComparacionAnual:
         )
 
         # Calcular distribución por método de pago
-        metodos_pago = self.db.obtener_gastos_por_metodo_anual(self.anio)
-
-        total_efectivo = metodos_pago.get('efectivo', 0.0)
-        total_tarjeta = metodos_pago.get('tarjeta', 0.0)
+        total_efectivo = resumen['metodos'].get('efectivo', 0.0)
+        total_tarjeta = resumen['metodos'].get('tarjeta', 0.0)
 
         # Actualizar labels de métodos de pago
         total_gastos = total_efectivo + total_tarjeta
@@ -1247,14 +1327,14 @@ class VistaComparacionAnual:
             nuevo_anio: Nuevo año
         """
         self.anio = nuevo_anio
-        self.cargar_datos()
+        self.marcar_sucio()
 
 
 
 class VistaEstadisticas:
     """Vista para mostrar estadísticas detalladas de los gastos."""
 
-    def __init__(self, parent, db, anio: int):
+    def __init__(self, parent, db, anio: int, ejecutor=None):
         """
         Inicializa la vista de estadísticas.
 
@@ -1262,19 +1342,34 @@ class VistaEstadisticas:
             parent: Widget padre
             db: Instancia de la base de datos
             anio: Año
+            ejecutor: EjecutorTareas para consultar en segundo plano
+                (None para consultar en el hilo principal)
         """
         self.db = db
         self.anio = anio
+        self.ejecutor = ejecutor or EjecutorSincrono()
 
         # Frame principal con fondo
         self.frame = tk.Frame(parent, bg=COLORES['fondo'])
 
+        self.refresco = RefrescoDiferido(self.frame, self.cargar_datos)
+        self.db.cambios.suscribir(self.al_cambiar_datos)
+
         # Crear interfaz
         self.crear_interfaz()
 
         # Cargar datos
         self.cargar_datos()
 
+    def al_cambiar_datos(self, cambio):
+        """Marca la vista como sucia si cambian los gastos de su año o las categorías."""
+        if cambio.entidad == 'categorias' or (cambio.entidad == 'gastos' and cambio.anio == self.anio):
+            self.marcar_sucio()
+
+    def marcar_sucio(self):
+        """Recarga la vista cuando se muestre."""
+        self.refresco.marcar()
+
     def crear_interfaz(self):
         """Crea la interfaz de la vista de estadísticas."""
         # Frame de título
@@ -1332,6 +1427,8 @@ class VistaEstadisticas:
         self.tree.column("Porcentaje", width=150, anchor=tk.CENTER)
         self.tree.column("Cantidad", width=150, anchor=tk.CENTER)
 
+        self.tabla = TablaSincronizada(self.tree)
+
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
@@ -1370,17 +1467,15 @@ class VistaEstadisticas:
         self.label_categoria_menor.pack(pady=3)
 
     def cargar_datos(self):
-        """Carga las estadísticas por categoría."""
-        # Limpiar tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Carga en segundo plano las estadísticas por categoría."""
+        anio = self.anio
 
         # Determinar mes seleccionado
         seleccion = self.combo_mes.get()
 
         if seleccion == "Todo el Año":
             # Obtener estadísticas de todo el año
-            estadisticas = self.obtener_estadisticas_anuales()
+            consulta = lambda: self.obtener_estadisticas_anuales(anio)
         else:
             # Obtener mes
             meses_nombres = [
@@ -1388,8 +1483,18 @@ class VistaEstadisticas:
                 "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
             ]
             mes = meses_nombres.index(seleccion) + 1
-            estadisticas = self.obtener_estadisticas_mensuales(mes)
+            consulta = lambda: self.obtener_estadisticas_mensuales(mes, anio)
+
+        self.ejecutor.ejecutar((id(self), 'estadisticas'), consulta, self.mostrar_datos,
+                               ocupado=self.frame)
+
+    def mostrar_datos(self, estadisticas):
+        """
+        Pinta las estadísticas por categoría.
 
+        Args:
+            estadisticas: Lista de diccionarios devuelta por la consulta
+        """
         # Calcular total
         total_general = sum(stat['total'] for stat in estadisticas)
 
@@ -1399,19 +1504,20 @@ class VistaEstadisticas:
         mayor_gasto = 0
         menor_gasto = float('inf')
 
+        # Una fila por categoría, identificada por su nombre
+        filas = []
         for stat in estadisticas:
             porcentaje = (stat['total'] / total_general * 100) if total_general > 0 else 0
 
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
+            filas.append((
+                stat['categoria'],
+                (
                     stat['categoria'],
                     f"{stat['total']:.2f}",
                     f"{porcentaje:.1f}%",
                     stat['cantidad']
                 )
-            )
+            ))
 
             # Determinar mayor y menor
             if stat['total'] > mayor_gasto:
@@ -1422,6 +1528,8 @@ class VistaEstadisticas:
                 menor_gasto = stat['total']
                 categoria_menor = stat['categoria']
 
+        self.tabla.actualizar(filas)
+
         # Actualizar etiquetas
         if categoria_mayor:
             self.label_categoria_mayor.config(
@@ -1437,50 +1545,15 @@ class VistaEstadisticas:
         else:
             self.label_categoria_menor.config(text="Categoría con menor gasto: -")
 
-    def obtener_estadisticas_anuales(self):
+    def obtener_estadisticas_anuales(self, anio: int = None):
         """Obtiene estadísticas de todas las categorías para el año completo."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT c.nombre, SUM(g.cantidad) as total, COUNT(g.id) as cantidad
-            FROM categorias c
-            LEFT JOIN gastos g ON c.id = g.categoria_id AND g.anio = ?
-            GROUP BY c.nombre
-            HAVING total > 0
-            ORDER BY total DESC
-        ''', (self.anio,))
-
-        resultados = cursor.fetchall()
-        conn.close()
-
-        return [
-            {'categoria': cat, 'total': total, 'cantidad': cantidad}
-            for cat, total, cantidad in resultados
-        ]
+        anio = anio or self.anio
+        return self.db.obtener_resumen_anual(anio)['categorias']
 
-    def obtener_estadisticas_mensuales(self, mes: int):
+    def obtener_estadisticas_mensuales(self, mes: int, anio: int = None):
         """Obtiene estadísticas de todas las categorías para un mes específico."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT c.nombre, SUM(g.cantidad) as total, COUNT(g.id) as cantidad
-            FROM categorias c
-            LEFT JOIN gastos g ON c.id = g.categoria_id 
-                AND g.mes = ? AND g.anio = ?
-            GROUP BY c.nombre
-            HAVING total > 0
-            ORDER BY total DESC
-        ''', (mes, self.anio))
-
-        resultados = cursor.fetchall()
-        conn.close()
-
-        return [
-            {'categoria': cat, 'total': total, 'cantidad': cantidad}
-            for cat, total, cantidad in resultados
-        ]
+        anio = anio or self.anio
+        return self.db.obtener_resumen_anual(anio)['categorias_mes'][mes]
 
     def cambiar_anio(self, nuevo_anio: int):
         """
@@ -1490,7 +1563,7 @@ class VistaEstadisticas:
             nuevo_anio: Nuevo año
         """
         self.anio = nuevo_anio
-        self.cargar_datos()
+        self.marcar_sucio()
 
     def mostrar_detalles_categoria(self, event):
         """
@@ -1520,11 +1593,6 @@ class VistaEstadisticas:
             ]
             mes = meses_nombres.index(seleccion_mes) + 1
 
-        # Obtener gastos detallados
-        gastos_detallados = self.db.obtener_gastos_detallados_categoria(
-            categoria_nombre, mes, self.anio
-        )
-
         # Crear ventana popup
         popup = tk.Toplevel(self.frame)
         popup.title(f"Gastos Detallados - {categoria_nombre}")
@@ -1579,7 +1647,6 @@ class VistaEstadisticas:
 
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=tree_detalle.yview)
-        tree_detalle.configure(yscrollcommand=scrollbar.set)
 
         tree_detalle.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -1590,33 +1657,30 @@ class VistaEstadisticas:
             "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
         ]
 
-        # Agregar gastos al tree
-        if gastos_detallados:
-            for gasto in gastos_detallados:
-                # Manejar ambos formatos: con y sin metodo_pago
-                if len(gasto) == 6:
-                    gasto_id, descripcion, cantidad, fecha, mes_num, metodo_pago = gasto
-                else:
-                    gasto_id, descripcion, cantidad, fecha, mes_num = gasto
-                    metodo_pago = 'tarjeta'  # Valor por defecto
-
-                mes_texto = meses_nombres[mes_num - 1] if mes_num else ""
-
-                # Mostrar icono según método de pago
-                metodo_texto = "💵 Efectivo" if metodo_pago == 'efectivo' else "💳 Tarjeta"
-
-                tree_detalle.insert(
-                    "",
-                    tk.END,
-                    values=(
-                        fecha,
-                        descripcion,
-                        metodo_texto,
-                        f"{cantidad:.2f}",
-                        mes_texto
-                    )
-                )
-        else:
+        def formatear(gasto):
+            gasto_id, descripcion, cantidad, fecha, mes_num, metodo_pago = gasto
+            mes_texto = meses_nombres[mes_num - 1] if mes_num else ""
+
+            # Mostrar icono según método de pago
+            metodo_texto = "💵 Efectivo" if metodo_pago == 'efectivo' else "💳 Tarjeta"
+
+            return gasto_id, (fecha, descripcion, metodo_texto, f"{cantidad:.2f}", mes_texto)
+
+        # Los gastos se leen por páginas según se desplaza la lista, ordenados
+        # por (mes, fecha, id). El pop-up es modal y breve, así que las
+        # páginas se leen en el hilo principal
+        lista_detalle = ListaPaginada(
+            tree_detalle,
+            lambda limite, despues=None, antes=None: self.db.obtener_gastos_detallados_categoria_pagina(
+                categoria_nombre, self.anio, mes, limite, despues, antes
+            ),
+            formatear,
+            clave=lambda gasto: (gasto[4], gasto[3], gasto[0]),
+            scrollbar=scrollbar
+        )
+        lista_detalle.cargar()
+
+        if not lista_detalle.filas:
             # Mostrar mensaje si no hay gastos
             ttk.Label(
                 frame_tabla,
@@ -1643,25 +1707,41 @@ class VistaEstadisticas:
 class VistaGestionCategorias:
     """Vista para gestionar las categorías (agregar, editar, eliminar)."""
 
-    def __init__(self, parent, db):
+    def __init__(self, parent, db, ejecutor=None):
         """
         Inicializa la vista de gestión de categorías.
 
         Args:
             parent: Widget padre
             db: Instancia de la base de datos
+            ejecutor: EjecutorTareas para consultar en segundo plano
+                (None para consultar en el hilo principal)
         """
         self.db = db
+        self.ejecutor = ejecutor or EjecutorSincrono()
 
         # Frame principal con fondo
         self.frame = tk.Frame(parent, bg=COLORES['fondo'])
 
+        # El número de gastos por categoría cambia con cualquier gasto
+        self.refresco = RefrescoDiferido(self.frame, self.cargar_categorias)
+        self.db.cambios.suscribir(self.al_cambiar_datos)
+
         # Crear interfaz
         self.crear_interfaz()
 
         # Cargar categorías
         self.cargar_categorias()
 
+    def al_cambiar_datos(self, cambio):
+        """Marca la vista como sucia si cambian categorías o gastos."""
+        if cambio.entidad in ('categorias', 'gastos'):
+            self.marcar_sucio()
+
+    def marcar_sucio(self):
+        """Recarga la vista cuando se muestre."""
+        self.refresco.marcar()
+
     def crear_interfaz(self):
         """Crea la interfaz de gestión de categorías."""
 
@@ -1691,7 +1771,7 @@ class VistaGestionCategorias:
         frame_tabla.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
         # Crear Treeview para mostrar categorías
-        columnas = ("ID", "Nombre", "Descripción", "Gastos")
+        columnas = ("ID", "Nombre", "Descripción", "Gastos", "Total", "Último")
         self.tree = ttk.Treeview(
             frame_tabla,
             columns=columnas,
@@ -1703,11 +1783,17 @@ class VistaGestionCategorias:
         self.tree.heading("Nombre", text="Nombre")
         self.tree.heading("Descripción", text="Descripción")
         self.tree.heading("Gastos", text="Gastos Asociados")
+        self.tree.heading("Total", text="Total (€)")
+        self.tree.heading("Último", text="Último Uso")
 
         self.tree.column("ID", width=50, anchor=tk.CENTER)
         self.tree.column("Nombre", width=150, anchor=tk.W)
         self.tree.column("Descripción", width=300, anchor=tk.W)
         self.tree.column("Gastos", width=120, anchor=tk.CENTER)
+        self.tree.column("Total", width=100, anchor=tk.E)
+        self.tree.column("Último", width=100, anchor=tk.CENTER)
+
+        self.tabla = TablaSincronizada(self.tree)
 
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree.yview)
@@ -1750,35 +1836,33 @@ class VistaGestionCategorias:
         ).pack()
 
     def cargar_categorias(self):
-        """Carga las categorías en el Treeview."""
-        # Limpiar tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Carga en segundo plano las categorías con su número de gastos."""
+        # Categorías con su número de gastos, en una sola consulta
+        self.ejecutor.ejecutar((id(self), 'categorias'), self.db.obtener_uso_categorias,
+                               self.mostrar_categorias, ocupado=self.frame)
 
-        # Obtener categorías
-        categorias = self.db.obtener_categorias()
+    def mostrar_categorias(self, usos):
+        """
+        Pinta las categorías en el Treeview.
 
-        # Obtener cantidad de gastos por categoría
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        for cat_id, nombre, descripcion in categorias:
-            # Contar gastos asociados
-            cursor.execute('SELECT COUNT(*) FROM gastos WHERE categoria_id = ?', (cat_id,))
-            count = cursor.fetchone()[0]
-
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
-                    cat_id,
-                    nombre,
-                    descripcion or "(Sin descripción)",
-                    count
+        Args:
+            usos: Lista de diccionarios devuelta por obtener_uso_categorias
+        """
+        filas = []
+        for uso in usos:
+            filas.append((
+                uso['id'],
+                (
+                    uso['id'],
+                    uso['nombre'],
+                    uso['descripcion'] or "(Sin descripción)",
+                    uso['cantidad'],
+                    f"{uso['total']:.2f}",
+                    uso['ultimo_uso'] or "-"
                 )
-            )
+            ))
 
-        conn.close()
+        self.tabla.actualizar(filas)
 
     def refrescar(self):
         """Refresca los datos de la vista."""
@@ -1862,7 +1946,6 @@ class VistaGestionCategorias:
 
             if self.db.agregar_categoria(nombre, descripcion):
                 messagebox.showinfo("Éxito", "Categoría agregada correctamente")
-                self.cargar_categorias()
                 ventana.destroy()
             else:
                 messagebox.showerror("Error", "No se pudo agregar la categoría. Es posible que ya exista.")
@@ -1886,7 +1969,7 @@ class VistaGestionCategorias:
 
         # Obtener datos de la categoría seleccionada
         valores = self.tree.item(seleccion[0])['values']
-        cat_id, nombre, descripcion, _ = valores
+        cat_id, nombre, descripcion = valores[:3]
 
         # Si la descripción es el texto por defecto, ponerla vacía
         if descripcion == "(Sin descripción)":
@@ -1971,7 +2054,6 @@ class VistaGestionCategorias:
 
             if self.db.editar_categoria(cat_id, nuevo_nombre, nueva_descripcion):
                 messagebox.showinfo("Éxito", "Categoría editada correctamente")
-                self.cargar_categorias()
                 ventana.destroy()
             else:
                 messagebox.showerror("Error", "No se pudo editar la categoría. Es posible que el nombre ya exista.")
@@ -1995,7 +2077,7 @@ class VistaGestionCategorias:
 
         # Obtener datos de la categoría seleccionada
         valores = self.tree.item(seleccion[0])['values']
-        cat_id, nombre, _, gastos_count = valores
+        cat_id, nombre, _, gastos_count = valores[:4]
 
         # Confirmar eliminación
         if gastos_count > 0:
@@ -2014,7 +2096,6 @@ class VistaGestionCategorias:
         if respuesta:
             if self.db.eliminar_categoria(cat_id):
                 messagebox.showinfo("Éxito", "Categoría eliminada correctamente")
-                self.cargar_categorias()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar la categoría")
 
@@ -2022,15 +2103,27 @@ class VistaGestionCategorias:
 class VistaAdministracion:
     """Vista del panel de administración (solo para admins)."""
 
-    def __init__(self, parent, db):
+    # Milisegundos sin teclear antes de lanzar la búsqueda
+    ESPERA_BUSQUEDA_MS = 300
+
+    # Usuarios con más movimientos que se listan en el informe de uso
+    MAX_USUARIOS_ANALITICA = 50
+
+    def __init__(self, parent, db, ejecutor=None):
         """
         Inicializa la vista de administración.
 
         Args:
             parent: Widget padre
             db: Instancia de la base de datos
+            ejecutor: EjecutorTareas para leer los usuarios y sus estadísticas
+                y analizar el uso en segundo plano
         """
         self.db = db
+        self.ejecutor = ejecutor or EjecutorSincrono()
+        # Texto buscado; se copia del Entry en el hilo de Tk antes de consultar
+        self.busqueda = ""
+        self._busqueda_pendiente = None
 
         # Frame principal con fondo
         self.frame = tk.Frame(parent, bg=COLORES['fondo'])
@@ -2060,11 +2153,20 @@ class VistaAdministracion:
         btn_refrescar = crear_boton_moderno(
             titulo_frame,
             "🔄 Refrescar",
-            self.cargar_datos,
+            lambda: self.cargar_datos(refrescar=True),
             'primary'
         )
         btn_refrescar.pack(side=tk.RIGHT, padx=5)
 
+        # Botón analizar uso
+        btn_analitica = crear_boton_moderno(
+            titulo_frame,
+            "📈 Analizar Uso",
+            self.analizar_uso,
+            'secondary'
+        )
+        btn_analitica.pack(side=tk.RIGHT, padx=5)
+
         # Sección de estadísticas
         self.crear_seccion_estadisticas()
 
@@ -2172,14 +2274,28 @@ class VistaAdministracion:
         frame_tabla = tk.Frame(self.frame, bg=COLORES['fondo'])
         frame_tabla.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
-        # Título de sección
+        # Título de sección y búsqueda
+        cabecera = tk.Frame(frame_tabla, bg=COLORES['fondo'])
+        cabecera.pack(fill=tk.X, pady=(0, 10))
+
         tk.Label(
-            frame_tabla,
+            cabecera,
             text="📋 Gestión de Usuarios",
             font=('SF Pro Display', 16, 'bold'),
             bg=COLORES['fondo'],
             fg=COLORES['texto_primario']
-        ).pack(anchor=tk.W, pady=(0, 10))
+        ).pack(side=tk.LEFT)
+
+        self.var_busqueda = tk.StringVar()
+        self.var_busqueda.trace_add('write', lambda *_: self.programar_busqueda())
+        ttk.Entry(cabecera, textvariable=self.var_busqueda, width=30).pack(side=tk.RIGHT)
+        tk.Label(
+            cabecera,
+            text="🔍 Buscar nombre o email:",
+            font=('SF Pro Display', 11),
+            bg=COLORES['fondo'],
+            fg=COLORES['texto_secundario']
+        ).pack(side=tk.RIGHT, padx=5)
 
         # Crear Treeview
         columnas = ("ID", "Nombre", "Email", "Rol", "Estado", "Registro", "Último Acceso")
@@ -2208,7 +2324,16 @@ class VistaAdministracion:
 
         # Scrollbar
         scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        # Solo se cargan las páginas cercanas a lo visible, por (fecha_registro, id)
+        self.lista_usuarios = ListaPaginada(
+            self.tree,
+            self.consultar_pagina_usuarios,
+            self.formatear_usuario,
+            clave=lambda usuario: (usuario[5], usuario[0]),
+            scrollbar=scrollbar,
+            ejecutor=self.ejecutor
+        )
 
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -2259,52 +2384,197 @@ class VistaAdministracion:
             fg=COLORES['texto_secundario']
         ).pack(side=tk.RIGHT, padx=10)
 
-    def cargar_datos(self):
-        """Carga los datos de usuarios y estadísticas."""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def cargar_datos(self, refrescar: bool = False):
+        """
+        Carga las estadísticas y vuelve a leer la ventana de usuarios visible.
+
+        Args:
+            refrescar: Recalcular las estadísticas aunque no hayan caducado
+        """
+        # Las estadísticas recorren toda la tabla de usuarios: en el pool
+        self.ejecutor.ejecutar(
+            (id(self), 'estadisticas'),
+            lambda: self.db.obtener_estadisticas_admin(refrescar=refrescar),
+            self.mostrar_estadisticas,
+            ocupado=self.frame
+        )
 
-        # Obtener estadísticas
-        stats = self.db.obtener_estadisticas_admin()
+        if self.lista_usuarios.filas:
+            self.lista_usuarios.recargar()
+        else:
+            self.lista_usuarios.cargar()
+
+    def mostrar_estadisticas(self, stats):
+        """
+        Actualiza las etiquetas de estadísticas.
 
-        # Actualizar labels de estadísticas
+        Args:
+            stats: Diccionario devuelto por obtener_estadisticas_admin
+        """
         self.label_total_usuarios.config(text=str(stats['total_usuarios']))
         self.label_usuarios_activos.config(text=str(stats['usuarios_activos']))
         self.label_admins.config(text=str(stats['total_admins']))
         self.label_registros_recientes.config(text=str(stats['registros_recientes']))
 
-        # Obtener usuarios
-        usuarios = self.db.obtener_todos_usuarios()
+    def programar_busqueda(self):
+        """Lanza la búsqueda cuando se deja de teclear un momento."""
+        if self._busqueda_pendiente is not None:
+            self.frame.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.frame.after(self.ESPERA_BUSQUEDA_MS, self.buscar)
 
-        # Agregar a la tabla
-        for usuario in usuarios:
-            user_id, nombre, email, rol, activo, fecha_registro, ultimo_acceso = usuario
+    def buscar(self):
+        """Vuelve a la primera página con el filtro de búsqueda actual."""
+        self._busqueda_pendiente = None
+        self.busqueda = self.var_busqueda.get()
+        self.lista_usuarios.cargar()
 
-            # Formatear datos
-            estado = "✅ Activo" if activo else "❌ Inactivo"
-            rol_texto = "👨‍💼 Admin" if rol == 'admin' else "👤 Usuario"
+    def consultar_pagina_usuarios(self, limite: int, despues: tuple = None, antes: tuple = None):
+        """Lee una página de usuarios que coinciden con la búsqueda (se ejecuta en el pool)."""
+        return self.db.obtener_usuarios_pagina(limite, despues, antes, busqueda=self.busqueda)
 
-            # Formatear fechas
-            try:
-                fecha_reg = fecha_registro[:10] if fecha_registro else "N/A"
-            except:
-                fecha_reg = "N/A"
+    def formatear_usuario(self, usuario) -> tuple:
+        """
+        Convierte un usuario en una fila del Treeview.
 
-            try:
-                ultimo_acc = ultimo_acceso[:16] if ultimo_acceso else "Nunca"
-            except:
-                ultimo_acc = "Nunca"
-
-            # Determinar tag para color
-            tag = 'admin' if rol == 'admin' else ('activo' if activo else 'inactivo')
-
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(user_id, nombre, email, rol_texto, estado, fecha_reg, ultimo_acc),
-                tags=(tag,)
-            )
+        Args:
+            usuario: Tupla devuelta por obtener_usuarios_pagina
+
+        Returns:
+            Tupla (id, values, tags)
+        """
+        user_id, nombre, email, rol, activo, fecha_registro, ultimo_acceso = usuario
+
+        # Formatear datos
+        estado = "✅ Activo" if activo else "❌ Inactivo"
+        rol_texto = "👨‍💼 Admin" if rol == 'admin' else "👤 Usuario"
+
+        # Formatear fechas
+        fecha_reg = fecha_registro[:10] if fecha_registro else "N/A"
+        ultimo_acc = ultimo_acceso[:16] if ultimo_acceso else "Nunca"
+
+        # Determinar tag para color
+        tag = 'admin' if rol == 'admin' else ('activo' if activo else 'inactivo')
+
+        return (
+            user_id,
+            (user_id, nombre, email, rol_texto, estado, fecha_reg, ultimo_acc),
+            (tag,)
+        )
+
+    def analizar_uso(self):
+        """Analiza en segundo plano las BDs de todos los usuarios y muestra el informe."""
+        self.ejecutor.ejecutar(
+            (id(self), 'analitica'),
+            self.db.obtener_analitica_usuarios,
+            self.mostrar_analitica,
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo analizar el uso: {e}"),
+            ocupado=self.frame
+        )
+
+    def mostrar_analitica(self, informe):
+        """
+        Muestra el informe de uso en una ventana.
+
+        Args:
+            informe: Diccionario devuelto por obtener_analitica_usuarios
+        """
+        ventana = tk.Toplevel(self.frame.winfo_toplevel())
+        ventana.title("Uso de las Bases de Datos")
+        ventana.geometry("760x640")
+        ventana.configure(bg=COLORES['fondo_tarjeta'])
+        ventana.transient(self.frame.winfo_toplevel())
+
+        # Título
+        tk.Label(
+            ventana,
+            text="📈 Uso de las Bases de Datos",
+            font=('SF Pro Display', 16, 'bold'),
+            bg=COLORES['fondo_tarjeta'],
+            fg=COLORES['texto_primario']
+        ).pack(pady=15)
+
+        # Resumen global
+        filas = informe['filas']
+        versiones = ", ".join(f"v{version}: {numero}" for version, numero in informe['versiones'].items())
+        resumen = [
+            ("Bases de datos", f"{informe['bases_datos']} ({len(informe['errores'])} con errores)"),
+            ("Tamaño total", f"{informe['tamano_bytes'] / (1024 * 1024):,.1f} MB"),
+            ("Movimientos", f"{filas['gastos']:,} gastos, {filas['ingresos']:,} ingresos"),
+            ("Fechas", f"{informe['fecha_min'] or 'N/A'} → {informe['fecha_max'] or 'N/A'}"),
+            ("Versiones de esquema", f"{versiones or 'N/A'} ({informe['desactualizadas']} desactualizadas)"),
+            ("Análisis", f"{informe['segundos']:.2f} s con {informe['procesos']} proceso(s)"),
+        ]
+
+        resumen_frame = tk.Frame(ventana, bg=COLORES['fondo_tarjeta'])
+        resumen_frame.pack(fill=tk.X, padx=20)
+        for fila, (etiqueta, valor) in enumerate(resumen):
+            tk.Label(resumen_frame, text=f"{etiqueta}:", font=('SF Pro Display', 11, 'bold'),
+                     bg=COLORES['fondo_tarjeta'], fg=COLORES['texto_secundario']).grid(
+                row=fila, column=0, sticky=tk.W, pady=2)
+            tk.Label(resumen_frame, text=valor, font=('SF Pro Display', 11),
+                     bg=COLORES['fondo_tarjeta'], fg=COLORES['texto_primario']).grid(
+                row=fila, column=1, sticky=tk.W, padx=10, pady=2)
+
+        # Totales por año
+        anios_frame = ttk.LabelFrame(ventana, text="📅 Totales por año", padding="10")
+        anios_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        tree_anios = ttk.Treeview(anios_frame, columns=("Año", "Gastos", "Ingresos", "Balance"),
+                                  show="headings", height=5)
+        for columna in ("Año", "Gastos", "Ingresos", "Balance"):
+            tree_anios.heading(columna, text=columna)
+            tree_anios.column(columna, width=150, anchor=tk.CENTER if columna == "Año" else tk.E)
+        for anio, totales in informe['por_anio'].items():
+            tree_anios.insert("", tk.END, values=(
+                anio,
+                f"€{totales['gastos']:,.2f}",
+                f"€{totales['ingresos']:,.2f}",
+                f"€{totales['balance']:+,.2f}"
+            ))
+        tree_anios.pack(fill=tk.X)
+
+        # Usuarios con más movimientos
+        usuarios_frame = ttk.LabelFrame(
+            ventana, text=f"👥 Usuarios con más movimientos (máx. {self.MAX_USUARIOS_ANALITICA})", padding="10"
+        )
+        usuarios_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
+
+        columnas = ("ID", "Gastos", "Ingresos", "Tamaño", "Desde", "Hasta", "Versión")
+        tree_usuarios = ttk.Treeview(usuarios_frame, columns=columnas, show="headings", height=8)
+        for columna in columnas:
+            tree_usuarios.heading(columna, text=columna)
+            tree_usuarios.column(columna, width=95, anchor=tk.CENTER)
+
+        mayores = sorted(informe['usuarios'], key=lambda u: u['gastos'] + u['ingresos'], reverse=True)
+        for usuario in mayores[:self.MAX_USUARIOS_ANALITICA]:
+            tree_usuarios.insert("", tk.END, values=(
+                usuario['usuario_id'],
+                f"{usuario['gastos']:,}",
+                f"{usuario['ingresos']:,}",
+                f"{usuario['tamano_bytes'] / 1024:,.0f} KB",
+                usuario['fecha_min'] or "N/A",
+                usuario['fecha_max'] or "N/A",
+                usuario['version']
+            ))
+
+        scrollbar = ttk.Scrollbar(usuarios_frame, orient=tk.VERTICAL, command=tree_usuarios.yview)
+        tree_usuarios.configure(yscrollcommand=scrollbar.set)
+        tree_usuarios.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # BDs que no se pudieron leer
+        if informe['errores']:
+            usuario_id, mensaje = informe['errores'][0]
+            tk.Label(
+                ventana,
+                text=f"⚠️ {len(informe['errores'])} BD(s) no se pudieron leer (usuario {usuario_id}: {mensaje})",
+                font=('SF Pro Display', 10, 'italic'),
+                bg=COLORES['fondo_tarjeta'],
+                fg=COLORES['peligro']
+            ).pack(padx=20, anchor=tk.W)
+
+        btn_cerrar = crear_boton_moderno(ventana, "✖ Cerrar", ventana.destroy, 'secondary')
+        btn_cerrar.pack(pady=(5, 15))
 
     def cambiar_rol(self):
         """Cambia el rol del usuario seleccionado."""
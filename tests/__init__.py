@@ -0,0 +1,6 @@
+"""
+Tests de FinanzApp.
+
+Cada módulo de test importa tests.entorno, que guarda las BDs de los tests en
+un directorio temporal en lugar de en data/.
+"""
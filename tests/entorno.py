@@ -0,0 +1,19 @@
+"""
+Entorno común de los tests.
+
+Al importarlo, las Database que crean los tests pasan a guardarse en un
+directorio temporal (borrado al salir) en lugar de en data/, y cada BD nueva
+se copia de una plantilla ya migrada. Todos los módulos de test lo importan,
+así que esto también se cumple al ejecutar un fichero directamente
+(python tests/test_x.py), sin pasar por el paquete tests.
+"""
+
+import os
+import sys
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.almacenamiento import Almacenamiento, establecer_por_defecto
+
+establecer_por_defecto(Almacenamiento.temporal(usar_plantilla=True))
@@ -3,27 +3,59 @@ Test Runner Principal - Ejecuta todos los tests unitarios del proyecto.
 
 Este script ejecuta todos los tests utilizando unittest para proporcionar
 un reporte completo del estado de las pruebas.
+
+Los tests usan un directorio temporal en lugar de data/ (ver tests/__init__.py),
+así que cada módulo puede ejecutarse en un proceso propio:
+
+    python tests/run_all_tests.py --procesos 4
 """
 
+import argparse
+import io
 import unittest
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar todos los módulos de test
-from tests import test_models, test_login, test_ingresos, test_gestion_categorias, test_gastos
+from tests import test_models, test_login, test_ingresos, test_gestion_categorias, test_gastos, test_conexiones, test_migraciones, test_resumenes, test_importacion, test_exportacion, test_tareas, test_eventos, test_tablas, test_cache, test_benchmarks, test_instrumentacion, test_planes, test_almacenamiento, test_accesos, test_administracion, test_analitica
+
+
+def ejecutar_modulo(nombre: str):
+    """
+    Ejecuta la suite de un módulo de test (en un proceso del pool).
+
+    Args:
+        nombre: Nombre del módulo dentro de tests
 
+    Returns:
+        Tupla (salida, tests ejecutados, fallos, errores)
+    """
+    modulo = __import__(f"tests.{nombre}", fromlist=['suite'])
+    salida = io.StringIO()
+    result = unittest.TextTestRunner(stream=salida, verbosity=2).run(modulo.suite())
+    return salida.getvalue(), result.testsRun, len(result.failures), len(result.errors)
 
-def run_all_tests():
-    """Ejecutar todos los tests del proyecto."""
+
+def run_all_tests(procesos: int = 1):
+    """
+    Ejecutar todos los tests del proyecto.
+
+    Args:
+        procesos: Procesos entre los que repartir los módulos de test
+    """
 
     print("="*80)
     print(" 🧪 EJECUTANDO SUITE COMPLETA DE TESTS - FinanzApp")
     print("="*80)
     print()
 
+    if procesos > 1:
+        return run_all_tests_paralelo(procesos)
+
     # Crear suite principal
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
@@ -34,6 +66,22 @@ def run_all_tests():
     suite.addTests(test_ingresos.suite())
     suite.addTests(test_gestion_categorias.suite())
     suite.addTests(test_gastos.suite())
+    suite.addTests(test_conexiones.suite())
+    suite.addTests(test_migraciones.suite())
+    suite.addTests(test_resumenes.suite())
+    suite.addTests(test_importacion.suite())
+    suite.addTests(test_exportacion.suite())
+    suite.addTests(test_tareas.suite())
+    suite.addTests(test_eventos.suite())
+    suite.addTests(test_tablas.suite())
+    suite.addTests(test_cache.suite())
+    suite.addTests(test_benchmarks.suite())
+    suite.addTests(test_instrumentacion.suite())
+    suite.addTests(test_planes.suite())
+    suite.addTests(test_almacenamiento.suite())
+    suite.addTests(test_accesos.suite())
+    suite.addTests(test_administracion.suite())
+    suite.addTests(test_analitica.suite())
 
     # Ejecutar con verbosidad
     runner = unittest.TextTestRunner(verbosity=2)
@@ -54,5 +102,39 @@ def run_all_tests():
     return 0 if result.wasSuccessful() else 1
 
 
+def run_all_tests_paralelo(procesos: int):
+    """
+    Ejecutar cada módulo de test en un proceso, cada uno con su directorio temporal.
+
+    Args:
+        procesos: Número de procesos del pool
+    """
+    modulos = [nombre for nombre in sorted(globals()) if nombre.startswith('test_')]
+
+    ejecutados = fallos = errores = 0
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for salida, tests, fallos_modulo, errores_modulo in pool.map(ejecutar_modulo, modulos):
+            print(salida)
+            ejecutados += tests
+            fallos += fallos_modulo
+            errores += errores_modulo
+
+    # Resumen final
+    print()
+    print("="*80)
+    print(" 📊 RESUMEN DE TESTS")
+    print("="*80)
+    print(f" Tests ejecutados: {ejecutados} ({procesos} procesos)")
+    print(f" ✅ Exitosos: {ejecutados - fallos - errores}")
+    print(f" ❌ Fallos: {fallos}")
+    print(f" 💥 Errores: {errores}")
+    print("="*80)
+
+    return 0 if fallos == errores == 0 else 1
+
+
 if __name__ == '__main__':
-    sys.exit(run_all_tests())
+    parser = argparse.ArgumentParser(description="Ejecuta todos los tests de FinanzApp")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="Procesos en los que repartir los módulos de test")
+    sys.exit(run_all_tests(parser.parse_args().procesos))
@@ -0,0 +1,142 @@
+"""
+Tests unitarios para la escritura diferida del último acceso.
+
+Verifica que el login no escribe en usuarios.db, que las lecturas de
+administración ven los accesos pendientes y que el volcado los guarda.
+"""
+
+import unittest
+import gc
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import weakref
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.almacenamiento import Almacenamiento
+from src import accesos as acc
+from src.accesos import BufferAccesos
+
+
+class TestBufferAccesos(unittest.TestCase):
+    """Tests para el buffer de últimos accesos."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp(prefix="test_accesos_")
+        self.almacenamiento = Almacenamiento(self.directorio)
+        self.db = Database(almacenamiento=self.almacenamiento)
+        self.db.registrar_usuario("Acceso", "acceso@test.com", "clave123")
+        self.usuario_id = self.db.autenticar_usuario("acceso@test.com", "clave123")[0]
+
+    def ultimo_acceso_en_bd(self) -> str:
+        """Lee ultimo_acceso directamente de usuarios.db, sin el buffer."""
+        conn = sqlite3.connect(self.almacenamiento.ruta_usuarios)
+        try:
+            return conn.execute("SELECT ultimo_acceso FROM usuarios WHERE id = ?",
+                                (self.usuario_id,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_login_sin_escritura(self):
+        """Test: El login deja el acceso en el buffer y las lecturas lo ven."""
+        self.assertIsNone(self.ultimo_acceso_en_bd())
+
+        pendiente = self.almacenamiento.accesos.pendiente(self.usuario_id)
+        self.assertIsNotNone(pendiente)
+
+        usuarios = {fila[0]: fila for fila in self.db.obtener_todos_usuarios()}
+        self.assertEqual(usuarios[self.usuario_id][6], pendiente)
+        self.assertIsNotNone(self.db.obtener_usuario_como_objeto(self.usuario_id).ultimo_acceso)
+
+        # Otra Database del mismo almacenamiento comparte el buffer
+        with Database(almacenamiento=self.almacenamiento) as otra:
+            objetos = {u.id: u for u in otra.obtener_todos_usuarios_como_objetos()}
+            self.assertIsNotNone(objetos[self.usuario_id].ultimo_acceso)
+
+    def test_volcar(self):
+        """Test: El volcado escribe los accesos y vacía el buffer."""
+        pendiente = self.almacenamiento.accesos.pendiente(self.usuario_id)
+
+        self.assertEqual(self.db.volcar_accesos(), 1)
+        self.assertEqual(self.ultimo_acceso_en_bd(), pendiente)
+        self.assertIsNone(self.almacenamiento.accesos.pendiente(self.usuario_id))
+        self.assertEqual(self.db.volcar_accesos(), 0)
+
+        # Un acceso más antiguo no pisa el guardado
+        self.almacenamiento.accesos.registrar(self.usuario_id, "2000-01-01 00:00:00")
+        self.db.volcar_accesos()
+        self.assertEqual(self.ultimo_acceso_en_bd(), pendiente)
+
+    def test_volcado_periodico(self):
+        """Test: El hilo de fondo vuelca cada intervalo."""
+        accesos = BufferAccesos(self.almacenamiento.ruta_usuarios, intervalo=0.05)
+        accesos.registrar(self.usuario_id, "2030-01-01 12:00:00")
+
+        limite = time.monotonic() + 5
+        while self.ultimo_acceso_en_bd() != "2030-01-01 12:00:00" and time.monotonic() < limite:
+            time.sleep(0.02)
+        accesos.cerrar()
+
+        self.assertEqual(self.ultimo_acceso_en_bd(), "2030-01-01 12:00:00")
+
+    def test_fallo_conserva_pendientes(self):
+        """Test: Si el volcado falla, los accesos siguen pendientes."""
+        accesos = BufferAccesos(os.path.join(self.directorio, "no_existe", "usuarios.db"))
+        accesos.registrar(self.usuario_id, "2030-01-01 12:00:00")
+
+        self.assertEqual(accesos.volcar(), 0)
+        self.assertEqual(accesos.pendiente(self.usuario_id), "2030-01-01 12:00:00")
+        accesos.descartar(self.usuario_id)
+        accesos.cerrar()
+
+    def test_no_se_retiene_hasta_salir(self):
+        """Test: Un almacenamiento descartado no queda vivo por el volcado al salir."""
+        almacenamiento = Almacenamiento(tempfile.mkdtemp(dir=self.directorio))
+        buffer = almacenamiento.accesos
+        self.assertIn(buffer, acc._abiertos)
+        referencias = (weakref.ref(almacenamiento), weakref.ref(buffer))
+
+        del almacenamiento, buffer
+        gc.collect()
+        self.assertEqual([ref() for ref in referencias], [None, None])
+
+    def test_cerrar_quita_el_volcado_al_salir(self):
+        """Test: Tras cerrar, un almacenamiento temporal ya no se cierra al salir."""
+        almacenamiento = Almacenamiento.temporal()
+        buffer = almacenamiento.accesos
+        almacenamiento.cerrar()
+        self.assertNotIn(buffer, acc._abiertos)
+
+        referencia = weakref.ref(almacenamiento)
+        del almacenamiento, buffer
+        gc.collect()
+        self.assertIsNone(referencia())
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+        self.almacenamiento.cerrar()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBufferAccesos))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
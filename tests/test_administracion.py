@@ -0,0 +1,147 @@
+"""
+Tests unitarios para las consultas del panel de administración.
+
+Verifica las estadísticas en una consulta con su instantánea con TTL y el
+listado de usuarios paginado por clave y con búsqueda.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.almacenamiento import Almacenamiento
+from src.cache import Instantanea
+
+
+class TestAdministracion(unittest.TestCase):
+    """Tests para estadísticas y listado de usuarios."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp(prefix="test_administracion_")
+        self.almacenamiento = Almacenamiento(self.directorio)
+        self.db = Database(almacenamiento=self.almacenamiento)
+        usuarios = [(f"Usuario {i}", f"usuario{i}@test.com", "clave") for i in range(25)]
+        usuarios.append(("Ana_López", "ana%lopez@test.com", "clave"))
+        self.ids = self.db.registrar_usuarios_lote(usuarios)['registrados']
+
+        conn = self.db.get_usuarios_connection()
+        with conn:
+            # Fechas de registro distintas y algunas repetidas para probar la clave
+            conn.executemany("UPDATE usuarios SET fecha_registro = ? WHERE id = ?",
+                             [(f"2026-01-{1 + indice // 2:02d} 10:00:00", usuario_id)
+                              for indice, usuario_id in enumerate(self.ids)])
+            conn.execute("UPDATE usuarios SET fecha_registro = datetime('now') WHERE id = ?",
+                         (self.ids[0],))
+        self.db.obtener_estadisticas_admin(refrescar=True)
+
+    def test_estadisticas(self):
+        """Test: Los contadores salen de una sola consulta y son correctos."""
+        self.db.activar_desactivar_usuario(self.ids[1], False)
+        self.db.cambiar_rol_usuario(self.ids[2], 'admin')
+
+        stats = self.db.obtener_estadisticas_admin()
+        self.assertEqual(stats, {
+            'total_usuarios': 26,
+            'usuarios_activos': 25,
+            'usuarios_inactivos': 1,
+            'total_admins': 1,
+            'registros_recientes': 1,
+        })
+
+        instrumentacion = self.db.activar_instrumentacion()
+        self.db.obtener_estadisticas_admin(refrescar=True)
+        sentencias = [sql for sql in instrumentacion.informe()['sql'] if 'FROM usuarios' in sql]
+        self.assertEqual(len(sentencias), 1)
+        self.db.desactivar_instrumentacion()
+
+    def test_instantanea_con_ttl(self):
+        """Test: Las estadísticas se reutilizan hasta que caducan o hay cambios."""
+        antes = self.db.obtener_estadisticas_admin()
+
+        # Un alta desde otra instancia no se ve hasta refrescar
+        with Database(almacenamiento=self.almacenamiento) as otra:
+            otra.registrar_usuario("Otro", "otro@test.com", "clave")
+        self.assertEqual(self.db.obtener_estadisticas_admin(), antes)
+        self.assertEqual(self.db.obtener_estadisticas_admin(refrescar=True)['total_usuarios'], 27)
+
+        # Un cambio hecho por esta instancia invalida la instantánea
+        self.db.activar_desactivar_usuario(self.ids[3], False)
+        self.assertEqual(self.db.obtener_estadisticas_admin()['usuarios_activos'], 26)
+
+        # Con TTL 0 siempre se recalcula
+        instantanea = Instantanea(ttl=0)
+        valores = iter([1, 2])
+        self.assertEqual(instantanea.obtener(lambda: next(valores)), 1)
+        self.assertEqual(instantanea.obtener(lambda: next(valores)), 2)
+
+    def test_paginas_recorren_todos(self):
+        """Test: Las páginas hacia delante y hacia atrás cubren todos los usuarios."""
+        esperados = [fila[0] for fila in sorted(self.db.obtener_todos_usuarios(),
+                                                key=lambda u: (u[5], u[0]), reverse=True)]
+
+        vistos, despues = [], None
+        while True:
+            pagina = self.db.obtener_usuarios_pagina(limite=4, despues=despues)
+            if not pagina:
+                break
+            vistos.extend(usuario[0] for usuario in pagina)
+            despues = (pagina[-1][5], pagina[-1][0])
+        self.assertEqual(vistos, esperados)
+
+        # Desde la segunda página, 'antes' vuelve exactamente a la primera
+        primera = self.db.obtener_usuarios_pagina(limite=4)
+        segunda = self.db.obtener_usuarios_pagina(limite=4, despues=(primera[-1][5], primera[-1][0]))
+        anterior = self.db.obtener_usuarios_pagina(limite=4, antes=(segunda[0][5], segunda[0][0]))
+        self.assertEqual(anterior, primera)
+
+    def test_busqueda(self):
+        """Test: La búsqueda filtra por nombre o email y trata % y _ como texto."""
+        encontrados = self.db.obtener_usuarios_pagina(busqueda="USUARIO2")
+        self.assertEqual({u[2] for u in encontrados},
+                         {"usuario2@test.com", "usuario20@test.com", "usuario21@test.com",
+                          "usuario22@test.com", "usuario23@test.com", "usuario24@test.com"})
+
+        self.assertEqual([u[1] for u in self.db.obtener_usuarios_pagina(busqueda="a_l")], ["Ana_López"])
+        self.assertEqual([u[2] for u in self.db.obtener_usuarios_pagina(busqueda="%lopez")],
+                         ["ana%lopez@test.com"])
+        self.assertEqual(self.db.obtener_usuarios_pagina(busqueda="o_r"), [])
+        self.assertEqual(len(self.db.obtener_usuarios_pagina(busqueda="  ")), 26)
+
+    def test_pagina_usa_indice(self):
+        """Test: El listado paginado no ordena toda la tabla."""
+        conn = self.db.get_usuarios_connection()
+        plan = [fila[3] for fila in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM usuarios WHERE 1 = 1 AND (fecha_registro, id) < (?, ?) "
+            "ORDER BY fecha_registro DESC, id DESC LIMIT 10", ("2026-01-05", 3)
+        )]
+        self.assertTrue(any('idx_usuarios_fecha_registro' in paso for paso in plan), plan)
+        self.assertFalse(any('TEMP B-TREE' in paso for paso in plan), plan)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+        self.almacenamiento.cerrar()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestAdministracion))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
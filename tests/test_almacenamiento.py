@@ -0,0 +1,204 @@
+"""
+Tests unitarios para la ubicación configurable de las bases de datos.
+
+Verifica el modo en memoria compartida, la creación desde plantilla, la
+variable de entorno FINANZAPP_DATOS y que la suite no escribe en data/.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src import almacenamiento as alm
+from src import migraciones
+
+
+class TestAlmacenamientoMemoria(unittest.TestCase):
+    """Tests para el almacenamiento ':memory:'."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.almacenamiento = alm.Almacenamiento(alm.MEMORIA, usar_plantilla=True)
+
+    def test_datos_compartidos_entre_instancias(self):
+        """Test: Dos Database del mismo almacenamiento ven los mismos datos."""
+        with Database(almacenamiento=self.almacenamiento) as db:
+            exito, mensaje = db.registrar_usuario("Memoria", "memoria@test.com", "clave123")
+            self.assertTrue(exito, mensaje)
+
+        with Database(almacenamiento=self.almacenamiento) as db:
+            usuario_id, nombre, _ = db.autenticar_usuario("memoria@test.com", "clave123")
+        self.assertEqual(nombre, "Memoria")
+
+        with Database(usuario_id=usuario_id, almacenamiento=self.almacenamiento) as db:
+            categoria_id = db.obtener_categorias()[0][0]
+            self.assertTrue(db.agregar_gasto("Café", 2.5, categoria_id, "2026-03-01"))
+
+        with Database(usuario_id=usuario_id, almacenamiento=self.almacenamiento) as db:
+            self.assertEqual(db.obtener_total_mes(3, 2026), 2.5)
+
+        self.assertIsNone(self.almacenamiento.directorio_usuarios)
+
+    def test_almacenamientos_independientes(self):
+        """Test: Otro almacenamiento en memoria no ve los datos del primero."""
+        with Database(usuario_id=1, almacenamiento=self.almacenamiento) as db:
+            db.agregar_ingreso("Nómina", 1000.0, "Salario", "2026-03-01")
+
+        otro = alm.Almacenamiento(alm.MEMORIA)
+        with Database(usuario_id=1, almacenamiento=otro) as db:
+            self.assertEqual(db.obtener_total_ingresos_mes(3, 2026), 0)
+        otro.cerrar()
+
+    def test_eliminar_usuario(self):
+        """Test: Al eliminar la BD de un usuario vuelve a crearse vacía."""
+        with Database(usuario_id=1, almacenamiento=self.almacenamiento) as db:
+            db.agregar_ingreso("Nómina", 1000.0, "Salario", "2026-03-01")
+
+        self.almacenamiento.eliminar_usuario(1)
+
+        with Database(usuario_id=1, almacenamiento=self.almacenamiento) as db:
+            self.assertEqual(db.obtener_total_ingresos_mes(3, 2026), 0)
+            self.assertTrue(db.obtener_categorias())
+
+    def test_lectura_y_escritura_en_hilos(self):
+        """Test: Un hilo lee mientras otro escribe sin errores de bloqueo."""
+        errores = []
+        terminado = threading.Event()
+
+        with Database(usuario_id=1, almacenamiento=self.almacenamiento) as db:
+            categoria_id = db.obtener_categorias()[0][0]
+
+            def lector():
+                while not terminado.is_set():
+                    try:
+                        db.obtener_gastos_mes(3, 2026)
+                    except Exception as e:
+                        errores.append(e)
+
+            hilo = threading.Thread(target=lector)
+            hilo.start()
+            try:
+                escritos = sum(
+                    bool(db.agregar_gasto(f"Gasto {i}", 1.0, categoria_id, "2026-03-01"))
+                    for i in range(500)
+                )
+            finally:
+                terminado.set()
+                hilo.join(30)
+
+            self.assertEqual(errores, [])
+            self.assertEqual(escritos, 500)
+            self.assertEqual(db.obtener_total_mes(3, 2026), 500.0)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.almacenamiento.cerrar()
+
+
+class TestAlmacenamientoDirectorio(unittest.TestCase):
+    """Tests para el almacenamiento en un directorio."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp(prefix="test_almacenamiento_")
+
+    def test_plantilla_igual_que_migraciones(self):
+        """Test: Una BD copiada de la plantilla es igual que una migrada."""
+        esquemas = []
+        for usar_plantilla in (False, True):
+            raiz = os.path.join(self.directorio, str(usar_plantilla))
+            almacenamiento = alm.Almacenamiento(raiz, usar_plantilla=usar_plantilla)
+            with Database(usuario_id=7, almacenamiento=almacenamiento) as db:
+                self.assertEqual(db.obtener_version_esquema()['finanzas'],
+                                 migraciones.MIGRACIONES_FINANZAS[-1][0])
+                conn = db.get_connection()
+                esquemas.append((
+                    conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall(),
+                    conn.execute("SELECT nombre FROM categorias ORDER BY nombre").fetchall(),
+                ))
+            self.assertTrue(os.path.exists(almacenamiento.ruta_usuario(7)))
+
+        self.assertEqual(esquemas[0], esquemas[1])
+        self.assertTrue(esquemas[1][1])
+
+    def test_crear_usuario_copia_plantilla(self):
+        """Test: crear_usuario copia la plantilla aunque usar_plantilla sea False."""
+        almacenamiento = alm.Almacenamiento(self.directorio)
+
+        self.assertTrue(almacenamiento.crear_usuario(8))
+        self.assertFalse(almacenamiento.crear_usuario(8))
+        self.assertEqual(os.listdir(almacenamiento.directorio_usuarios), ["usuario_8_finanzas.db"])
+
+        with Database(usuario_id=8, almacenamiento=almacenamiento) as db:
+            self.assertEqual(db.obtener_version_esquema()['finanzas'],
+                             migraciones.MIGRACIONES_FINANZAS[-1][0])
+            self.assertTrue(db.agregar_ingreso("Nómina", 1000.0, "Salario", "2026-03-01"))
+
+        # Una BD que ya existe no se sobrescribe
+        almacenamiento.crear_usuario(8)
+        with Database(usuario_id=8, almacenamiento=almacenamiento) as db:
+            self.assertEqual(db.obtener_total_ingresos_mes(3, 2026), 1000.0)
+
+    def test_clonar_no_sobrescribe(self):
+        """Test: Clonar la plantilla sobre una BD creada por otro proceso no la pisa."""
+        almacenamiento = alm.Almacenamiento(self.directorio)
+        with Database(usuario_id=9, almacenamiento=almacenamiento) as db:
+            self.assertTrue(db.agregar_ingreso("Nómina", 1000.0, "Salario", "2026-03-01"))
+
+        # Como otro proceso que comprobó que no existía justo antes de crearla
+        self.assertFalse(alm.clonar_plantilla('finanzas', almacenamiento.ruta_usuario(9)))
+
+        self.assertFalse([f for f in os.listdir(almacenamiento.directorio_usuarios) if f.endswith(".tmp")])
+        with Database(usuario_id=9, almacenamiento=almacenamiento) as db:
+            self.assertEqual(db.obtener_total_ingresos_mes(3, 2026), 1000.0)
+
+    def test_raiz_desde_variable_entorno(self):
+        """Test: FINANZAPP_DATOS cambia la raíz por defecto."""
+        anterior = os.environ.get(alm.VARIABLE_ENTORNO)
+        os.environ[alm.VARIABLE_ENTORNO] = self.directorio
+        try:
+            almacenamiento = alm.Almacenamiento()
+        finally:
+            if anterior is None:
+                del os.environ[alm.VARIABLE_ENTORNO]
+            else:
+                os.environ[alm.VARIABLE_ENTORNO] = anterior
+
+        self.assertEqual(almacenamiento.ruta_usuarios, os.path.join(self.directorio, "usuarios.db"))
+        self.assertEqual(almacenamiento.ruta_usuario(3),
+                         os.path.join(self.directorio, "usuarios", "usuario_3_finanzas.db"))
+
+    def test_suite_fuera_de_data(self):
+        """Test: Las Database de los tests no usan data/."""
+        with Database(usuario_id=995) as db:
+            self.assertFalse(db.db_name.startswith(alm.DATA_DIR))
+            self.assertFalse(db.USUARIOS_DB.startswith(alm.DATA_DIR))
+            db.almacenamiento.eliminar_usuario(995)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestAlmacenamientoMemoria))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestAlmacenamientoDirectorio))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
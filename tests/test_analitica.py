@@ -0,0 +1,161 @@
+"""
+Tests unitarios para la analítica de uso entre usuarios.
+
+Verifica el resumen de cada BD, su combinación en el informe, que el pool de
+procesos da el mismo resultado que el recorrido en serie y que las BDs
+ilegibles se informan sin detener el análisis.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.almacenamiento import Almacenamiento, MEMORIA
+from src import analitica
+from src.migraciones import MIGRACIONES_FINANZAS
+
+
+def poblar(almacenamiento: Almacenamiento, usuario_id: int, gastos, ingresos):
+    """Añade gastos [(cantidad, fecha)] e ingresos [(cantidad, fecha)] a un usuario."""
+    with Database(usuario_id=usuario_id, almacenamiento=almacenamiento) as db:
+        categoria_id = db.obtener_categorias()[0][0]
+        for cantidad, fecha in gastos:
+            db.agregar_gasto("Gasto", cantidad, categoria_id, fecha)
+        for cantidad, fecha in ingresos:
+            db.agregar_ingreso("Ingreso", cantidad, "Salario", fecha)
+
+
+class TestAnalitica(unittest.TestCase):
+    """Tests para el análisis de las BDs de usuario."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp(prefix="test_analitica_")
+        self.almacenamiento = Almacenamiento(self.directorio)
+        poblar(self.almacenamiento, 1,
+               [(10.0, "2024-03-05"), (20.0, "2025-01-10")], [(1000.0, "2025-01-31")])
+        poblar(self.almacenamiento, 2,
+               [(5.5, "2025-06-15")], [(200.0, "2023-12-01"), (300.0, "2026-02-01")])
+        self.almacenamiento.crear_usuario(3)
+
+    def test_analizar_bd(self):
+        """Test: El resumen de una BD tiene filas, fechas, años y versión."""
+        resultado = analitica.analizar_bd(1, self.almacenamiento.ruta_usuario(1))
+
+        self.assertEqual(resultado['gastos'], 2)
+        self.assertEqual(resultado['ingresos'], 1)
+        self.assertEqual(resultado['categorias'], 8)
+        self.assertEqual((resultado['fecha_min'], resultado['fecha_max']), ("2024-03-05", "2025-01-31"))
+        self.assertEqual(resultado['anios'], {
+            2024: {'gastos': 10.0, 'ingresos': 0.0},
+            2025: {'gastos': 20.0, 'ingresos': 1000.0},
+        })
+        self.assertEqual(resultado['version'], MIGRACIONES_FINANZAS[-1][0])
+        self.assertGreater(resultado['tamano_bytes'], 0)
+
+        vacia = analitica.analizar_bd(3, self.almacenamiento.ruta_usuario(3))
+        self.assertEqual((vacia['gastos'], vacia['ingresos'], vacia['anios']), (0, 0, {}))
+        self.assertIsNone(vacia['fecha_min'])
+
+    def test_sin_tablas_resumen(self):
+        """Test: Una BD anterior a las tablas resumen_* da el mismo resultado."""
+        esperado = analitica.analizar_bd(1, self.almacenamiento.ruta_usuario(1))
+
+        with Database(usuario_id=1, almacenamiento=self.almacenamiento) as db:
+            conn = db.get_connection()
+            with conn:
+                for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+                    conn.execute(f"DROP TRIGGER {trigger}")
+                conn.execute("DROP TABLE resumen_gastos")
+                conn.execute("DROP TABLE resumen_ingresos")
+
+        resultado = analitica.analizar_bd(1, self.almacenamiento.ruta_usuario(1))
+        del esperado['tamano_bytes'], resultado['tamano_bytes']
+        self.assertEqual(resultado, esperado)
+
+    def test_informe(self):
+        """Test: El informe suma todas las BDs e informa de las ilegibles."""
+        with open(os.path.join(self.almacenamiento.directorio_usuarios, "usuario_9_finanzas.db"), 'wb') as f:
+            f.write(b"no es una base de datos" * 100)
+        with open(os.path.join(self.almacenamiento.directorio_usuarios, "notas.txt"), 'w') as f:
+            f.write("ignorado")
+
+        with Database(almacenamiento=self.almacenamiento) as db:
+            informe = db.obtener_analitica_usuarios()
+
+        self.assertEqual(informe['bases_datos'], 3)
+        self.assertEqual([usuario_id for usuario_id, _ in informe['errores']], [9])
+        self.assertEqual(informe['filas'], {'gastos': 3, 'ingresos': 3, 'categorias': 24})
+        self.assertEqual((informe['fecha_min'], informe['fecha_max']), ("2023-12-01", "2026-02-01"))
+        self.assertEqual(informe['por_anio'], {
+            2023: {'gastos': 0.0, 'ingresos': 200.0, 'balance': 200.0},
+            2024: {'gastos': 10.0, 'ingresos': 0.0, 'balance': -10.0},
+            2025: {'gastos': 25.5, 'ingresos': 1000.0, 'balance': 974.5},
+            2026: {'gastos': 0.0, 'ingresos': 300.0, 'balance': 300.0},
+        })
+        self.assertEqual(informe['versiones'], {MIGRACIONES_FINANZAS[-1][0]: 3})
+        self.assertEqual(informe['desactualizadas'], 0)
+        self.assertEqual([u['usuario_id'] for u in informe['usuarios']], [1, 2, 3])
+        self.assertEqual(informe['procesos'], 1)
+
+    def test_pool_igual_que_serie(self):
+        """Test: Repartir las BDs entre procesos da el mismo informe."""
+        bases_datos = self.almacenamiento.listar_usuarios()
+        serie = analitica.analizar_usuarios(bases_datos, procesos=1)
+
+        with mock.patch.object(analitica, 'BD_POR_PROCESO_MIN', 1):
+            paralelo = analitica.analizar_usuarios(bases_datos, procesos=2)
+
+        self.assertEqual(paralelo['procesos'], 2)
+        for informe in (serie, paralelo):
+            del informe['procesos'], informe['segundos']
+        self.assertEqual(paralelo, serie)
+
+    def test_procesos_necesarios(self):
+        """Test: No se arrancan más procesos de los que compensan."""
+        self.assertEqual(analitica._procesos_necesarios(10, 8), 1)
+        self.assertEqual(analitica._procesos_necesarios(analitica.BD_POR_PROCESO_MIN * 3, 8), 3)
+        self.assertEqual(analitica._procesos_necesarios(analitica.BD_POR_PROCESO_MIN * 100, 4), 4)
+        self.assertEqual(analitica._procesos_necesarios(0, 4), 1)
+
+    def test_en_memoria(self):
+        """Test: Las BDs en memoria se analizan en el propio proceso."""
+        almacenamiento = Almacenamiento(MEMORIA, usar_plantilla=True)
+        try:
+            poblar(almacenamiento, 4, [(7.0, "2025-05-05")], [])
+            with Database(almacenamiento=almacenamiento) as db:
+                informe = db.obtener_analitica_usuarios(procesos=4)
+        finally:
+            almacenamiento.cerrar()
+
+        self.assertEqual(informe['procesos'], 1)
+        self.assertEqual(informe['bases_datos'], 1)
+        self.assertEqual(informe['por_anio'][2025]['gastos'], 7.0)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.almacenamiento.cerrar()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestAnalitica))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
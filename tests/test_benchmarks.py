@@ -0,0 +1,144 @@
+"""
+Tests unitarios para el generador de datos de los benchmarks.
+
+Comprueba que los datos son reproducibles y válidos para la inserción por
+lotes, que se crean fuera de data/ y que la prueba de carga funciona.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from benchmarks.generador import GeneradorDatos, generar_gastos, generar_ingresos
+from benchmarks.ejecutar import medir
+from benchmarks.carga import ejecutar_carga, leer_mezcla, preparar_datos, resumir
+
+
+class TestGeneradorDatos(unittest.TestCase):
+    """Tests para el generador de datos sintéticos."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp(prefix="test_benchmarks_")
+        self.generador = GeneradorDatos(self.directorio, anio_final=2026, anios=2, semilla=7)
+        self.categorias = [(1, "Alimentación", ""), (2, "Hogar", ""), (3, "Nueva", "")]
+
+    def test_reproducible(self):
+        """Test: La misma semilla genera los mismos datos y otra semilla no."""
+        primera = list(generar_gastos(200, self.categorias, 2026, 2, semilla=1))
+        segunda = list(generar_gastos(200, self.categorias, 2026, 2, semilla=1))
+        otra = list(generar_gastos(200, self.categorias, 2026, 2, semilla=2))
+
+        self.assertEqual(primera, segunda)
+        self.assertNotEqual(primera, otra)
+
+    def test_filas_validas(self):
+        """Test: Los gastos e ingresos caen en el rango de años pedido."""
+        for descripcion, cantidad, cat_id, fecha, metodo in generar_gastos(
+                500, self.categorias, 2026, 2):
+            self.assertTrue(descripcion)
+            self.assertGreater(cantidad, 0)
+            self.assertIn(cat_id, (1, 2, 3))
+            self.assertIn(fecha[:4], ("2025", "2026"))
+            self.assertIn(metodo, ("efectivo", "tarjeta"))
+
+        for _, cantidad, fuente, fecha in generar_ingresos(100, 2026, 2):
+            self.assertGreater(cantidad, 0)
+            self.assertIn(fecha[:4], ("2025", "2026"))
+
+    def test_poblar(self):
+        """Test: Poblar crea los usuarios y sus datos en el directorio indicado."""
+        ids = self.generador.crear_usuarios(2)
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(self.generador.crear_usuarios(2), ids)
+
+        resultado = self.generador.poblar(ids[0], 300)
+        self.assertEqual(resultado, {'gastos': 300, 'ingresos': 30, 'reutilizada': False})
+        self.assertTrue(self.generador.poblar(ids[0], 300)['reutilizada'])
+
+        with self.generador.abrir(ids[0]) as db:
+            self.assertTrue(db.db_name.startswith(self.directorio))
+            total = db.obtener_total_anual(2025) + db.obtener_total_anual(2026)
+            self.assertGreater(total, 0)
+
+    def test_medir(self):
+        """Test: medir() ejecuta la función tantas veces como se pide."""
+        llamadas = []
+        resultado = medir(lambda: llamadas.append(1), 4)
+
+        self.assertEqual(len(llamadas), 4)
+        self.assertLessEqual(resultado['minimo_ms'], resultado['mediana_ms'])
+        self.assertLessEqual(resultado['mediana_ms'], resultado['maximo_ms'])
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+class TestCarga(unittest.TestCase):
+    """Tests para la prueba de carga de sesiones."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp(prefix="test_carga_")
+
+    def test_leer_mezcla(self):
+        """Test: Se aceptan mezclas predefinidas y 'op=peso'."""
+        self.assertEqual(leer_mezcla("login"), {'login': 100})
+        self.assertEqual(leer_mezcla("login=3,admin=1"), {'login': 3, 'admin': 1})
+        with self.assertRaises(ValueError):
+            leer_mezcla("borrar=1")
+        with self.assertRaises(ValueError):
+            leer_mezcla("login=0")
+
+    def test_carga_con_hilos(self):
+        """Test: Todas las operaciones se ejecutan sin errores y se resumen."""
+        usuarios = preparar_datos(self.directorio, usuarios=3, gastos=50)
+        self.assertEqual(len(usuarios), 3)
+
+        mezcla = {'login': 1, 'registro': 1, 'consulta': 1, 'gasto': 1, 'admin': 1}
+        resumen = ejecutar_carga(self.directorio, usuarios, mezcla, trabajadores=2, duracion=0.3)
+
+        self.assertEqual(set(resumen['operaciones']), set(mezcla))
+        self.assertGreater(resumen['total']['veces'], 0)
+        self.assertEqual(resumen['total']['errores'], 0)
+        self.assertLessEqual(resumen['total']['p50_ms'], resumen['total']['p99_ms'])
+
+    def test_resumir_cuenta_bloqueos(self):
+        """Test: Los errores y bloqueos de los trabajadores se suman."""
+        parciales = [
+            {'latencias': {'login': [1.0, 3.0]}, 'errores': {'login': 1}, 'bloqueos': {'login': 1}},
+            {'latencias': {'login': [2.0, 4.0]}, 'errores': {'login': 0}, 'bloqueos': {'login': 0}},
+        ]
+        resumen = resumir(parciales, duracion=2.0)
+
+        self.assertEqual(resumen['total']['veces'], 4)
+        self.assertEqual(resumen['total']['ops_s'], 2.0)
+        self.assertEqual(resumen['operaciones']['login']['tasa_bloqueos'], 0.25)
+        self.assertEqual(resumen['total']['max_ms'], 4.0)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestGeneradorDatos))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCarga))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
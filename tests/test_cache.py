@@ -0,0 +1,166 @@
+"""
+Tests unitarios para la caché de consultas.
+
+Comprueba la expulsión LRU, que cada cambio invalida solo lo que le afecta
+y que Database sirve de memoria las consultas repetidas.
+"""
+
+import unittest
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.cache import CacheConsultas, Instantanea
+from src.eventos import Cambio
+
+
+class TestCacheConsultas(unittest.TestCase):
+    """Tests para CacheConsultas."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.cache = CacheConsultas(max_entradas=3)
+        self.calculos = []
+
+    def obtener(self, clave, dependencias=()):
+        def calcular():
+            self.calculos.append(clave)
+            return [clave]
+        return self.cache.obtener(clave, calcular, dependencias)
+
+    def test_acierto_y_copia(self):
+        """Test: La segunda lectura no recalcula y devuelve una copia."""
+        primero = self.obtener('a')
+        primero.append('modificado')
+        segundo = self.obtener('a')
+
+        self.assertEqual(segundo, ['a'])
+        self.assertEqual(self.calculos, ['a'])
+        self.assertEqual(self.cache.estadisticas()['aciertos'], 1)
+        self.assertEqual(self.cache.estadisticas()['fallos'], 1)
+
+    def test_copia_profunda(self):
+        """Test: Modificar valores anidados del resultado no altera la caché."""
+        resumen = self.cache.obtener('resumen', lambda: {'meses': [{'total': 1.0}]}, ())
+        resumen['meses'][0]['total'] = 99.0
+        resumen['meses'].append({'total': 2.0})
+
+        self.assertEqual(self.cache.obtener('resumen', lambda: None, ()), {'meses': [{'total': 1.0}]})
+
+        instantanea = Instantanea(ttl=60)
+        estadisticas = instantanea.obtener(lambda: {'por_rol': {'admin': 1}})
+        estadisticas['por_rol']['admin'] = 5
+        self.assertEqual(instantanea.obtener(lambda: None), {'por_rol': {'admin': 1}})
+
+    def test_expulsion_lru(self):
+        """Test: Al llenarse se expulsa la entrada usada hace más tiempo."""
+        for clave in ('a', 'b', 'c'):
+            self.obtener(clave)
+        self.obtener('a')   # 'b' pasa a ser la más antigua
+        self.obtener('d')
+
+        del self.calculos[:]
+        self.obtener('a')
+        self.obtener('b')
+        self.assertEqual(self.calculos, ['b'])
+
+    def test_invalidacion_por_periodo(self):
+        """Test: Un cambio invalida su mes, su año y lo global, nada más."""
+        self.obtener('marzo', [('gastos', 2026, 3)])
+        self.obtener('abril', [('gastos', 2026, 4)])
+        self.obtener('anio', [('gastos', 2026, None)])
+
+        self.cache.invalidar(Cambio('gastos', 2026, 3))
+
+        del self.calculos[:]
+        for clave in ('marzo', 'abril', 'anio'):
+            self.obtener(clave)
+        self.assertEqual(sorted(self.calculos), ['anio', 'marzo'])
+
+    def test_cambio_sin_periodo(self):
+        """Test: Un cambio de categorías invalida todo lo que depende de ellas."""
+        self.obtener('lista', [('categorias', None, None)])
+        self.obtener('por_categoria', [('gastos', 2026, 3), ('categorias', 2026, 3)])
+        self.obtener('ingresos', [('ingresos', 2026, 3)])
+
+        self.cache.invalidar(Cambio('categorias', None, None))
+
+        self.assertEqual(self.cache.estadisticas()['entradas'], 1)
+
+    def test_resultado_desfasado_no_se_guarda(self):
+        """Test: Lo calculado mientras se invalidaba no entra en la caché."""
+        def calcular():
+            self.cache.invalidar(Cambio('gastos', 2026, 3))
+            return 'viejo'
+
+        self.cache.obtener('clave', calcular, [('gastos', 2026, 3)])
+
+        self.assertEqual(self.cache.estadisticas()['entradas'], 0)
+
+
+class TestCacheDatabase(unittest.TestCase):
+    """Tests para la caché integrada en Database."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=989)
+        self.categoria_id = self.db.obtener_categorias()[0][0]
+
+    def test_balance_repetido_desde_memoria(self):
+        """Test: Repetir el balance del mes no vuelve a consultar."""
+        self.db.obtener_balance_mes(3, 2026)
+        antes = self.db.cache.estadisticas()
+        for _ in range(10):
+            self.db.obtener_balance_mes(3, 2026)
+        despues = self.db.cache.estadisticas()
+
+        self.assertEqual(despues['fallos'], antes['fallos'])
+        self.assertEqual(despues['aciertos'], antes['aciertos'] + 10)
+
+    def test_escritura_invalida_su_mes(self):
+        """Test: Agregar un gasto actualiza el balance de su mes y no el de otros."""
+        self.assertEqual(self.db.obtener_balance_mes(3, 2026)['gastos'], 0.0)
+        self.db.obtener_balance_mes(4, 2026)
+
+        self.db.agregar_gasto("Cena", 30.0, self.categoria_id, "2026-03-20")
+        fallos = self.db.cache.estadisticas()['fallos']
+
+        self.assertEqual(self.db.obtener_balance_mes(3, 2026)['gastos'], 30.0)
+        self.assertEqual(self.db.obtener_total_anual(2026), 30.0)
+        self.db.obtener_balance_mes(4, 2026)
+        # Se recalculan el balance de marzo y el total anual; abril sigue en caché
+        self.assertEqual(self.db.cache.estadisticas()['fallos'], fallos + 2)
+
+    def test_categorias(self):
+        """Test: Editar una categoría invalida la lista de categorías."""
+        self.db.obtener_categorias()
+        self.db.editar_categoria(self.categoria_id, "Renombrada")
+
+        nombres = [c[1] for c in self.db.obtener_categorias()]
+        self.assertIn("Renombrada", nombres)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+
+        self.db.almacenamiento.eliminar_usuario(989)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCacheConsultas))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCacheDatabase))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
@@ -0,0 +1,225 @@
+"""
+Tests unitarios para el gestor de conexiones persistentes.
+
+Verifica que Database reutiliza sus conexiones, que cada hilo recibe la suya
+y que el ciclo de vida close()/with cierra todo correctamente.
+"""
+
+import unittest
+import contextlib
+import io
+import sqlite3
+import threading
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.conexiones import GestorConexiones
+from src.almacenamiento import Almacenamiento
+
+
+class TestConexiones(unittest.TestCase):
+    """Tests para el gestor de conexiones."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=997)
+
+    def test_reutiliza_conexion(self):
+        """Test: Llamadas sucesivas devuelven la misma conexión."""
+        conn1 = self.db.get_connection()
+        conn2 = self.db.get_connection()
+        self.assertIs(conn1, conn2)
+
+        conn_u1 = self.db.get_usuarios_connection()
+        conn_u2 = self.db.get_usuarios_connection()
+        self.assertIs(conn_u1, conn_u2)
+        self.assertIsNot(conn1, conn_u1)
+
+    def test_close_de_conexion_no_la_cierra(self):
+        """Test: conn.close() descarta la transacción pero deja la conexión viva."""
+        conn = self.db.get_connection()
+        conn.execute("INSERT INTO categorias (nombre, descripcion) VALUES ('Temporal', '')")
+        conn.close()
+
+        # La conexión sigue usable y el INSERT sin commit se ha descartado
+        conn = self.db.get_connection()
+        cursor = conn.execute("SELECT COUNT(*) FROM categorias WHERE nombre = 'Temporal'")
+        self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_hilos_usan_conexiones_distintas(self):
+        """Test: Cada hilo obtiene su propia conexión."""
+        conn_principal = self.db.get_connection()
+        resultado = {}
+
+        def trabajo():
+            conn = self.db.get_connection()
+            resultado['conn'] = conn
+            resultado['categorias'] = len(self.db.obtener_categorias())
+
+        hilo = threading.Thread(target=trabajo)
+        hilo.start()
+        hilo.join()
+
+        self.assertIsNot(resultado['conn'], conn_principal)
+        self.assertGreater(resultado['categorias'], 0)
+
+    def test_close_cierra_todas(self):
+        """Test: Database.close() cierra realmente las conexiones."""
+        conn = self.db.get_connection()
+        self.db.close()
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+        # Tras cerrar, se puede volver a usar la instancia
+        self.assertGreater(len(self.db.obtener_categorias()), 0)
+
+    def test_context_manager(self):
+        """Test: Usar Database con 'with' cierra las conexiones al salir."""
+        with Database(usuario_id=997) as db:
+            conn = db.get_connection()
+            self.assertGreater(len(db.obtener_categorias()), 0)
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_gestor_total_abiertas(self):
+        """Test: El gestor lleva la cuenta de conexiones abiertas."""
+        gestor = GestorConexiones()
+        gestor.obtener(":memory:")
+        gestor.obtener(":memory:")
+        self.assertEqual(gestor.total_abiertas(), 1)
+
+        gestor.cerrar()
+        self.assertEqual(gestor.total_abiertas(), 0)
+
+    def test_hilos_terminados_liberan_conexion(self):
+        """Test: Las conexiones de hilos que han terminado se cierran al abrir otra."""
+        gestor = GestorConexiones()
+        listos = threading.Barrier(11)
+        salir = threading.Event()
+
+        def trabajo():
+            gestor.obtener(":memory:")
+            listos.wait(5)
+            salir.wait(5)
+
+        hilos = [threading.Thread(target=trabajo) for _ in range(10)]
+        for hilo in hilos:
+            hilo.start()
+        listos.wait(5)
+        self.assertEqual(gestor.total_abiertas(), 10)
+
+        salir.set()
+        for hilo in hilos:
+            hilo.join(5)
+
+        gestor.obtener(":memory:")
+        self.assertEqual(gestor.total_abiertas(), 1)
+        gestor.cerrar()
+
+    def test_perfil_interactivo_por_defecto(self):
+        """Test: El perfil por defecto activa WAL y synchronous NORMAL."""
+        perfil = self.db.obtener_perfil()
+
+        self.assertEqual(perfil['perfil'], 'interactivo')
+        self.assertEqual(perfil['finanzas']['journal_mode'], 'wal')
+        self.assertEqual(perfil['finanzas']['synchronous'], 1)  # NORMAL
+        self.assertEqual(perfil['finanzas']['temp_store'], 2)   # MEMORY
+        self.assertIn('usuarios', perfil)
+
+    def test_cambiar_perfil(self):
+        """Test: Cambiar de perfil reabre las conexiones con los nuevos pragmas."""
+        self.db.establecer_perfil('carga_masiva')
+        perfil = self.db.obtener_perfil()
+
+        self.assertEqual(perfil['perfil'], 'carga_masiva')
+        self.assertEqual(perfil['finanzas']['synchronous'], 0)  # OFF
+        self.assertEqual(perfil['finanzas']['cache_size'], -64000)
+
+    def test_cambiar_perfil_no_cierra_otros_hilos(self):
+        """Test: Cambiar de perfil no cierra la conexión que usa otro hilo."""
+        abierta = threading.Event()
+        cambiado = threading.Event()
+        resultado = {}
+
+        def trabajador():
+            conn = self.db.get_connection()
+            conn.execute("SELECT COUNT(*) FROM categorias").fetchone()
+            abierta.set()
+            cambiado.wait(5)
+            # La conexión en uso sigue abierta tras el cambio
+            resultado['en_curso'] = conn.execute("SELECT COUNT(*) FROM categorias").fetchone()[0]
+            # Al pedirla de nuevo se reabre con el perfil nuevo
+            nueva = self.db.get_connection()
+            resultado['reabierta'] = nueva is not conn
+            resultado['synchronous'] = nueva.execute("PRAGMA synchronous").fetchone()[0]
+
+        hilo = threading.Thread(target=trabajador)
+        hilo.start()
+        abierta.wait(5)
+        self.db.establecer_perfil('carga_masiva')
+        cambiado.set()
+        hilo.join(5)
+
+        self.assertGreater(resultado['en_curso'], 0)
+        self.assertTrue(resultado['reabierta'])
+        self.assertEqual(resultado['synchronous'], 0)  # OFF
+
+    def test_solo_lectura_no_escribe(self):
+        """Test: Con el perfil solo_lectura cualquier escritura falla."""
+        categoria_id = self.db.obtener_categorias()[0][0]
+        self.db.close()
+
+        with Database(usuario_id=997, perfil='solo_lectura') as db:
+            self.assertEqual(db.obtener_perfil()['finanzas']['query_only'], 1)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertFalse(db.agregar_gasto("Café", 2.5, categoria_id, "2026-03-01"))
+            with self.assertRaises(sqlite3.OperationalError):
+                db.get_connection().execute("DELETE FROM categorias")
+            self.assertEqual(db.obtener_total_mes(3, 2026), 0)
+
+    def test_solo_lectura_migra_bd_nueva(self):
+        """Test: Una BD nueva se migra aunque se abra con solo_lectura."""
+        # Sin plantilla, para que las migraciones tengan que escribir
+        almacenamiento = Almacenamiento.temporal(usar_plantilla=False)
+        try:
+            with Database(usuario_id=997, perfil='solo_lectura', almacenamiento=almacenamiento) as db:
+                self.assertGreater(len(db.obtener_categorias()), 0)
+                self.assertEqual(db.obtener_perfil()['perfil'], 'solo_lectura')
+        finally:
+            almacenamiento.cerrar()
+
+    def test_perfil_desconocido(self):
+        """Test: Un perfil inexistente se rechaza."""
+        with self.assertRaises(ValueError):
+            self.db.establecer_perfil('turbo')
+
+        with self.assertRaises(ValueError):
+            GestorConexiones(perfil='turbo')
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+
+        self.db.almacenamiento.eliminar_usuario(997)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestConexiones))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
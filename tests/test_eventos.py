@@ -0,0 +1,139 @@
+"""
+Tests unitarios para los avisos de cambios.
+
+Comprueba el reparto de avisos de BusCambios y que Database publica el
+periodo afectado por cada escritura.
+"""
+
+import unittest
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.eventos import BusCambios, Cambio
+
+
+class TestBusCambios(unittest.TestCase):
+    """Tests para BusCambios."""
+
+    def test_suscribir_y_cancelar(self):
+        """Test: Solo reciben avisos los suscriptores activos."""
+        bus = BusCambios()
+        recibidos = []
+        identificador = bus.suscribir(recibidos.append)
+
+        bus.publicar('gastos', 2026, 3)
+        bus.cancelar_suscripcion(identificador)
+        bus.publicar('gastos', 2026, 4)
+
+        self.assertEqual(recibidos, [Cambio('gastos', 2026, 3)])
+
+    def test_suscriptor_que_falla(self):
+        """Test: Un suscriptor que lanza una excepción no bloquea al resto."""
+        bus = BusCambios()
+        recibidos = []
+
+        def roto(cambio):
+            raise RuntimeError("fallo")
+
+        bus.suscribir(roto)
+        bus.suscribir(recibidos.append)
+        bus.publicar('categorias')
+
+        self.assertEqual(recibidos, [Cambio('categorias', None, None)])
+
+
+class TestPublicacionCambios(unittest.TestCase):
+    """Tests para los avisos que publica Database."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=990)
+        self.categoria_id = self.db.obtener_categorias()[0][0]
+        self.recibidos = []
+        self.db.cambios.suscribir(self.recibidos.append)
+
+    def test_agregar_gasto_e_ingreso(self):
+        """Test: Agregar publica la entidad y el periodo."""
+        self.db.agregar_gasto("Café", 2.5, self.categoria_id, "2026-03-10")
+        self.db.agregar_ingreso("Sueldo", 1000.0, "Salario", "2026-04-01")
+
+        self.assertEqual(self.recibidos, [
+            Cambio('gastos', 2026, 3),
+            Cambio('ingresos', 2026, 4),
+        ])
+
+    def test_escritura_fallida_no_publica(self):
+        """Test: Una escritura que no se guarda no publica nada."""
+        self.db.agregar_gasto("Mal", 2.5, self.categoria_id, "fecha-mala")
+        self.db.eliminar_gasto(999999)
+
+        self.assertEqual(self.recibidos, [])
+
+    def test_lote_publica_cada_periodo_una_vez(self):
+        """Test: Un lote publica un aviso por mes afectado."""
+        self.db.agregar_gastos_lote([
+            ("A", 1.0, self.categoria_id, "2026-01-05"),
+            ("B", 2.0, self.categoria_id, "2026-01-20"),
+            ("C", 3.0, self.categoria_id, "2026-02-01"),
+        ])
+
+        self.assertEqual(sorted(self.recibidos), [
+            Cambio('gastos', 2026, 1),
+            Cambio('gastos', 2026, 2),
+        ])
+
+    def test_actualizar_cambiando_de_mes(self):
+        """Test: Mover un gasto de mes avisa al mes de origen y al de destino."""
+        self.db.agregar_gasto("Libro", 20.0, self.categoria_id, "2026-05-10")
+        gasto_id = self.db.obtener_gastos_mes(5, 2026)[0][0]
+        del self.recibidos[:]
+
+        self.db.actualizar_gasto(gasto_id, "Libro", 20.0, self.categoria_id, "2026-06-01")
+
+        self.assertEqual(self.recibidos, [
+            Cambio('gastos', 2026, 5),
+            Cambio('gastos', 2026, 6),
+        ])
+
+    def test_eliminar(self):
+        """Test: Eliminar publica el periodo del movimiento borrado."""
+        self.db.agregar_ingreso("Venta", 50.0, "Venta", "2026-07-15")
+        ingreso_id = self.db.obtener_ingresos_mes(7, 2026)[0][0]
+        del self.recibidos[:]
+
+        self.db.eliminar_ingreso(ingreso_id)
+
+        self.assertEqual(self.recibidos, [Cambio('ingresos', 2026, 7)])
+
+    def test_categorias(self):
+        """Test: Los cambios de categorías publican sin periodo."""
+        self.db.agregar_categoria("Mascotas")
+
+        self.assertEqual(self.recibidos, [Cambio('categorias', None, None)])
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+
+        self.db.almacenamiento.eliminar_usuario(990)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBusCambios))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPublicacionCambios))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
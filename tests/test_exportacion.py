@@ -0,0 +1,147 @@
+"""
+Tests unitarios para la exportación del informe anual.
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import csv
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.exportacion import exportar_anio, escribir_informe, EscritorInforme
+
+
+class EscritorMemoria(EscritorInforme):
+    """Escritor de prueba que registra las llamadas recibidas."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.eventos = []
+
+    def inicio(self, anio, total_anual):
+        self.eventos.append(('inicio', anio, total_anual))
+
+    def inicio_mes(self, mes):
+        self.eventos.append(('inicio_mes', mes))
+
+    def gasto(self, fecha, categoria, descripcion, metodo_pago, cantidad):
+        self.eventos.append(('gasto', fecha))
+
+    def fin_mes(self, mes, total, cantidad):
+        self.eventos.append(('fin_mes', mes, total, cantidad))
+
+    def fin(self, categorias):
+        self.eventos.append(('fin', categorias))
+
+
+class TestExportacion(unittest.TestCase):
+    """Tests para el exportador de informes."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=992)
+        self.directorio = tempfile.mkdtemp()
+
+        categorias = {nombre: cat_id for cat_id, nombre, _ in self.db.obtener_categorias()}
+        self.db.agregar_gastos_lote([
+            ("Luz", 60.0, categorias['Servicios'], "2026-02-10"),
+            ("Pan", 2.5, categorias['Alimentación'], "2026-01-20"),
+            ("Súper", 37.5, categorias['Alimentación'], "2026-01-03", "efectivo"),
+            ("Otro año", 99.0, categorias['Otros'], "2025-12-31"),
+        ])
+
+    def test_una_pasada_con_subtotales(self):
+        """Test: Meses en orden cronológico con sus subtotales y estadísticas."""
+        escritor = EscritorMemoria()
+
+        resultado = escribir_informe(self.db, 2026, escritor)
+
+        self.assertEqual(resultado, {'gastos': 3, 'total': 100.0})
+        self.assertEqual(escritor.eventos[:6], [
+            ('inicio', 2026, 100.0),
+            ('inicio_mes', 1),
+            ('gasto', '2026-01-03'),
+            ('gasto', '2026-01-20'),
+            ('fin_mes', 1, 40.0, 2),
+            ('inicio_mes', 2),
+        ])
+        self.assertEqual(escritor.eventos[-1], ('fin', [
+            ('Servicios', 60.0, 1, 60.0),
+            ('Alimentación', 40.0, 2, 40.0),
+        ]))
+
+    def test_txt(self):
+        """Test: El informe de texto mantiene el formato histórico."""
+        ruta = os.path.join(self.directorio, "gastos_2026.txt")
+        exportar_anio(self.db, 2026, ruta)
+
+        with open(ruta, encoding='utf-8') as f:
+            contenido = f.read()
+
+        self.assertIn("REPORTE DE GASTOS - AÑO 2026", contenido)
+        self.assertIn("TOTAL ANUAL: €100.00", contenido)
+        self.assertIn("Total Enero: €40.00", contenido)
+        self.assertNotIn("Otro año", contenido)
+
+    def test_csv(self):
+        """Test: El CSV tiene una fila por gasto."""
+        ruta = os.path.join(self.directorio, "gastos_2026.csv")
+        exportar_anio(self.db, 2026, ruta)
+
+        with open(ruta, encoding='utf-8', newline='') as f:
+            filas = list(csv.DictReader(f))
+
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[0]['metodo_pago'], 'efectivo')
+
+    def test_json(self):
+        """Test: El JSON escrito por trozos es válido."""
+        ruta = os.path.join(self.directorio, "gastos_2026.json")
+        exportar_anio(self.db, 2026, ruta)
+
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+
+        self.assertEqual(datos['total_anual'], 100.0)
+        self.assertEqual([mes['mes'] for mes in datos['meses']], [1, 2])
+        self.assertEqual(len(datos['meses'][0]['gastos']), 2)
+        self.assertEqual(datos['categorias'][0]['categoria'], 'Servicios')
+
+    def test_anio_vacio_y_formato_desconocido(self):
+        """Test: Un año sin gastos genera un JSON válido; un formato raro se rechaza."""
+        ruta = os.path.join(self.directorio, "vacio.json")
+        exportar_anio(self.db, 2030, ruta)
+        with open(ruta, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['meses'], [])
+
+        with self.assertRaises(ValueError):
+            exportar_anio(self.db, 2026, os.path.join(self.directorio, "x.pdf"))
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+        self.db.almacenamiento.eliminar_usuario(992)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestExportacion))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
@@ -12,6 +12,9 @@ import os
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
 from src.database import Database
 
 
@@ -56,6 +59,38 @@ class TestGestionGastos(unittest.TestCase):
                                        "2026-01-17", metodo_pago="tarjeta")
         self.assertTrue(exito)
 
+    def test_agregar_gastos_lote(self):
+        """Test: Agregar muchos gastos de una vez, en varios lotes."""
+        gastos = (
+            (f"Gasto {i}", 1.0 + i, self.categoria_id, f"2026-02-{(i % 28) + 1:02d}", "efectivo")
+            for i in range(250)
+        )
+
+        resultado = self.db.agregar_gastos_lote(gastos, tamano_lote=100)
+
+        self.assertEqual(resultado['insertados'], 250)
+        self.assertEqual(resultado['errores'], [])
+        self.assertEqual(len(self.db.obtener_gastos_mes(2, self.anio_prueba)), 250)
+        self.assertAlmostEqual(self.db.obtener_total_mes(2, self.anio_prueba),
+                               sum(1.0 + i for i in range(250)))
+
+    def test_agregar_gastos_lote_con_errores(self):
+        """Test: Las filas inválidas se informan sin abortar el resto del lote."""
+        gastos = [
+            ("Válido 1", 10.0, self.categoria_id, "2026-03-01"),
+            ("Fecha mala", 10.0, self.categoria_id, "2026-13-01"),
+            ("Cantidad negativa", -5.0, self.categoria_id, "2026-03-02"),
+            ("", 10.0, self.categoria_id, "2026-03-03"),
+            ("Categoría inexistente", 10.0, 99999, "2026-03-04"),
+            ("Válido 2", "20.5", self.categoria_id, "2026-03-05", "tarjeta"),
+        ]
+
+        resultado = self.db.agregar_gastos_lote(gastos)
+
+        self.assertEqual(resultado['insertados'], 2)
+        self.assertEqual([indice for indice, _ in resultado['errores']], [1, 2, 3, 4])
+        self.assertAlmostEqual(self.db.obtener_total_mes(3, self.anio_prueba), 30.5)
+
     def test_obtener_gastos_mes(self):
         """Test: Obtener gastos de un mes específico."""
         # Agregar algunos gastos
@@ -204,18 +239,109 @@ class TestGestionGastos(unittest.TestCase):
         self.assertIsInstance(total_anual, (int, float))
         self.assertGreaterEqual(total_anual, 450.0)
 
+    def test_indices_gestionados(self):
+        """Test: La BD del usuario tiene los índices de consulta por mes y categoría."""
+        from src.database import INDICES_FINANZAS
+
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        indices = {fila[0] for fila in cursor.fetchall()}
+
+        for nombre in INDICES_FINANZAS:
+            self.assertIn(nombre, indices)
+
+        # La consulta mensual no debe recorrer la tabla completa
+        cursor.execute('''
+            EXPLAIN QUERY PLAN
+            SELECT id FROM gastos WHERE mes = ? AND anio = ? ORDER BY fecha DESC
+        ''', (1, 2026))
+        plan = " ".join(fila[-1] for fila in cursor.fetchall())
+        self.assertIn("idx_gastos_anio_mes_fecha", plan)
+
+    def test_paginacion_mes(self):
+        """Test: Recorrer las páginas hacia delante y atrás da todos los gastos en orden."""
+        # Varias filas por fecha para que el desempate por id importe
+        self.db.agregar_gastos_lote([
+            (f"Gasto {i}", 1.0 + i, self.categoria_id, f"2026-04-{1 + i % 7:02d}")
+            for i in range(25)
+        ])
+        esperado = sorted(self.db.obtener_gastos_mes(4, 2026), key=lambda g: (g[4], g[0]), reverse=True)
+
+        paginas = []
+        despues = None
+        while True:
+            pagina = self.db.obtener_gastos_mes_pagina(4, 2026, limite=10, despues=despues)
+            if not pagina:
+                break
+            paginas.append(pagina)
+            despues = (pagina[-1][4], pagina[-1][0])
+
+        self.assertEqual([len(p) for p in paginas], [10, 10, 5])
+        self.assertEqual([g for p in paginas for g in p], esperado)
+
+        # Hacia atrás desde la última página se obtiene la anterior, en orden
+        ultima = paginas[-1][0]
+        anterior = self.db.obtener_gastos_mes_pagina(4, 2026, limite=10, antes=(ultima[4], ultima[0]))
+        self.assertEqual(anterior, paginas[1])
+
+    def test_paginacion_categoria(self):
+        """Test: Las páginas de una categoría recorren el año sin repetir gastos."""
+        self.db.agregar_gastos_lote([
+            (f"Gasto {i}", 5.0, self.categoria_id, f"2026-{1 + i % 12:02d}-10")
+            for i in range(30)
+        ])
+        nombre = dict((c[0], c[1]) for c in self.db.obtener_categorias())[self.categoria_id]
+
+        vistos = []
+        despues = None
+        while True:
+            pagina = self.db.obtener_gastos_detallados_categoria_pagina(
+                nombre, 2026, limite=7, despues=despues
+            )
+            if not pagina:
+                break
+            vistos.extend(pagina)
+            despues = (pagina[-1][4], pagina[-1][3], pagina[-1][0])
+
+        self.assertEqual(len(vistos), 30)
+        self.assertEqual(vistos, sorted(vistos, key=lambda g: (g[4], g[3], g[0]), reverse=True))
+
+        marzo = self.db.obtener_gastos_detallados_categoria_pagina(nombre, 2026, mes=3)
+        self.assertTrue(marzo)
+        self.assertTrue(all(g[4] == 3 for g in marzo))
+
+        # La consulta paginada usa el índice sin ordenar en memoria
+        cursor = self.db.get_connection().cursor()
+        cursor.execute('''
+            EXPLAIN QUERY PLAN
+            SELECT id FROM gastos WHERE categoria_id = ? AND anio = ? AND (mes, fecha, id) < (?, ?, ?)
+            ORDER BY mes DESC, fecha DESC, id DESC LIMIT 10
+        ''', (self.categoria_id, 2026, 6, '2026-06-10', 100))
+        plan = " ".join(fila[-1] for fila in cursor.fetchall())
+        self.assertIn("idx_gastos_categoria_anio_mes_fecha", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_indices_obsoletos_se_eliminan(self):
+        """Test: Los índices gestionados que ya no existen en el conjunto se borran."""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("CREATE INDEX idx_gastos_obsoleto ON gastos (descripcion)")
+        conn.commit()
+
+        self.db.sincronizar_indices(cursor)
+        conn.commit()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'idx_gastos_obsoleto'")
+        self.assertIsNone(cursor.fetchone())
+
     def tearDown(self):
         """Limpiar después de cada test."""
+        # Cerrar las conexiones persistentes antes de borrar el fichero
+        self.db.close()
+
         # Eliminar la base de datos de prueba
-        try:
-            db_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                "data", "usuarios", "usuario_998_finanzas.db"
-            )
-            if os.path.exists(db_path):
-                os.remove(db_path)
-        except:
-            pass
+        self.db.almacenamiento.eliminar_usuario(998)
 
 
 def suite():
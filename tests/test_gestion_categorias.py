@@ -7,10 +7,14 @@ Verifica las operaciones CRUD (Create, Read, Update, Delete) de categorías.
 import unittest
 import sys
 import os
+from datetime import datetime, timedelta
 
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
 from src.database import Database
 
 
@@ -155,18 +159,38 @@ class TestGestionCategorias(unittest.TestCase):
             self.assertEqual(categoria[0], cat_id)
             self.assertEqual(categoria[1], nombre_esperado)
 
+    def test_uso_categorias(self):
+        """Test: El uso de categorías cuenta gastos, importes y fechas de cada una."""
+        categorias = self.db.obtener_categorias()
+        cat_id = categorias[0][0]
+        hoy = datetime.now()
+        reciente = hoy.strftime("%Y-%m-%d")
+        antigua = (hoy - timedelta(days=800)).strftime("%Y-%m-%d")
+
+        self.db.agregar_gasto("Antiguo", 40.0, cat_id, antigua)
+        self.db.agregar_gasto("Reciente", 10.0, cat_id, reciente)
+
+        uso = {u['id']: u for u in self.db.obtener_uso_categorias()}
+
+        self.assertEqual(len(uso), len(categorias))
+        self.assertEqual(uso[cat_id]['cantidad'], 2)
+        self.assertAlmostEqual(uso[cat_id]['total'], 50.0)
+        self.assertAlmostEqual(uso[cat_id]['total_12_meses'], 10.0)
+        self.assertEqual(uso[cat_id]['primer_uso'], antigua)
+        self.assertEqual(uso[cat_id]['ultimo_uso'], reciente)
+
+        # Las categorías sin gastos también aparecen, a cero
+        sin_uso = uso[categorias[1][0]]
+        self.assertEqual((sin_uso['cantidad'], sin_uso['total'], sin_uso['ultimo_uso']),
+                         (0, 0, None))
+
     def tearDown(self):
         """Limpiar después de cada test."""
+        # Cerrar las conexiones persistentes antes de borrar el fichero
+        self.db.close()
+
         # Eliminar la base de datos de prueba
-        try:
-            db_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                "data", "usuarios", "usuario_999_finanzas.db"
-            )
-            if os.path.exists(db_path):
-                os.remove(db_path)
-        except:
-            pass
+        self.db.almacenamiento.eliminar_usuario(999)
 
 
 def suite():
@@ -0,0 +1,148 @@
+"""
+Tests unitarios para la importación de extractos bancarios en CSV.
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.importacion import ConfiguracionCSV, convertir_cantidad, importar_csv
+
+
+class TestImportacion(unittest.TestCase):
+    """Tests para el importador CSV."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=994)
+        self.directorio = tempfile.mkdtemp()
+
+    def escribir_csv(self, contenido: str, codificacion: str = 'utf-8') -> str:
+        """Escribe un CSV temporal y devuelve su ruta."""
+        ruta = os.path.join(self.directorio, "extracto.csv")
+        with open(ruta, 'w', encoding=codificacion, newline='') as f:
+            f.write(contenido)
+        return ruta
+
+    def test_convertir_cantidad(self):
+        """Test: Cantidades con separadores de miles, moneda y signo."""
+        self.assertEqual(convertir_cantidad("-1.234,56 €", ","), -1234.56)
+        self.assertEqual(convertir_cantidad("1,234.56", "."), 1234.56)
+        self.assertEqual(convertir_cantidad(" 12 ", "."), 12.0)
+        with self.assertRaises(ValueError):
+            convertir_cantidad("", ".")
+
+    def test_formato_por_defecto(self):
+        """Test: Negativos se importan como gastos y positivos como ingresos."""
+        ruta = self.escribir_csv(
+            "fecha,descripcion,cantidad\n"
+            "2026-01-05,Supermercado,-45.20\n"
+            "2026-01-31,Nómina,2000\n"
+            "\n"
+            "2026-02-02,Gasolina,-60\n"
+        )
+
+        resultado = importar_csv(self.db, ruta)
+
+        self.assertEqual(resultado['gastos'], 2)
+        self.assertEqual(resultado['ingresos'], 1)
+        self.assertEqual(resultado['total_errores'], 0)
+        self.assertAlmostEqual(self.db.obtener_total_mes(1, 2026), 45.20)
+        self.assertAlmostEqual(self.db.obtener_total_ingresos_mes(1, 2026), 2000.0)
+
+    def test_mapeo_de_columnas_y_formato_espanol(self):
+        """Test: Columnas, fecha y decimales configurables; errores por línea."""
+        ruta = self.escribir_csv(
+            "Fecha;Concepto;Importe;Saldo;Categoría\n"
+            "05/03/2026;Mercadona;-1.045,50;100;Alimentación\n"
+            "06/03/2026;Fecha rota;-10,00;100;\n"
+            "32/03/2026;Día imposible;-10,00;100;\n"
+            "07/03/2026;Cero;0;100;\n",
+            codificacion='utf-8-sig'
+        )
+        config = ConfiguracionCSV(
+            columnas={'fecha': 'Fecha', 'descripcion': 'Concepto',
+                      'cantidad': 'Importe', 'categoria': 'Categoría'},
+            formato_fecha="%d/%m/%Y",
+            separador_decimal=",",
+            delimitador=";"
+        )
+
+        resultado = importar_csv(self.db, ruta, config)
+
+        self.assertEqual(resultado['gastos'], 2)
+        self.assertEqual([linea for linea, _ in resultado['errores']], [4, 5])
+        por_categoria = dict(self.db.obtener_gastos_por_categoria_mes(3, 2026))
+        self.assertAlmostEqual(por_categoria['Alimentación'], 1045.50)
+        self.assertAlmostEqual(por_categoria['Otros'], 10.0)
+
+    def test_sin_cabecera_por_indices(self):
+        """Test: Sin cabecera las columnas se indican por índice."""
+        ruta = self.escribir_csv("2026-04-01|Alquiler|700\n")
+        config = ConfiguracionCSV(
+            columnas={'fecha': 0, 'descripcion': 1, 'cantidad': 2},
+            delimitador="|",
+            tiene_cabecera=False,
+            tipo='gastos'
+        )
+
+        resultado = importar_csv(self.db, ruta, config)
+
+        self.assertEqual(resultado['gastos'], 1)
+        self.assertAlmostEqual(self.db.obtener_total_mes(4, 2026), 700.0)
+
+    def test_configuracion_invalida(self):
+        """Test: Columnas ausentes o campos desconocidos se rechazan."""
+        ruta = self.escribir_csv("fecha,descripcion\n2026-01-01,Algo\n")
+
+        with self.assertRaises(ValueError):
+            importar_csv(self.db, ruta, ConfiguracionCSV(columnas={'fecha': 'fecha'}))
+        with self.assertRaises(ValueError):
+            importar_csv(self.db, ruta)  # 'cantidad' no está en la cabecera
+
+    def test_separadores_invalidos(self):
+        """Test: Un separador decimal o delimitador no válido se rechaza."""
+        for opciones in ({'separador_decimal': ''}, {'separador_decimal': ';'},
+                         {'delimitador': ''}, {'delimitador': ';;'}):
+            with self.subTest(**opciones):
+                with self.assertRaises(ValueError):
+                    ConfiguracionCSV(**opciones).validar()
+
+        ConfiguracionCSV(separador_decimal=',', delimitador=';').validar()
+
+    def test_no_cambia_perfil(self):
+        """Test: Importar no cambia el perfil de la Database recibida."""
+        ruta = self.escribir_csv("fecha,descripcion,cantidad\n2026-01-01,Algo,-1\n")
+
+        importar_csv(self.db, ruta)
+
+        self.assertEqual(self.db.obtener_perfil()['perfil'], 'interactivo')
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+        self.db.almacenamiento.eliminar_usuario(994)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestImportacion))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
@@ -11,6 +11,9 @@ import os
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
 from src.database import Database
 
 
@@ -19,8 +22,8 @@ class TestIngresos(unittest.TestCase):
 
     def setUp(self):
         """Configurar el entorno de prueba antes de cada test."""
-        # Usar usuario_id=1 para pruebas (debe existir en la BD)
-        self.db = Database(usuario_id=1)
+        # Usuario de pruebas propio; su BD se crea vacía al abrirla
+        self.db = Database(usuario_id=993)
         self.mes_prueba = 1
         self.anio_prueba = 2026
 
@@ -92,7 +95,7 @@ class TestIngresos(unittest.TestCase):
         fecha = "2026-01-15"
 
         # Agregar ingreso
-        exito = self.db.agregar_ingreso(descripcion, cantidad, fecha)
+        exito = self.db.agregar_ingreso(descripcion, cantidad, "Salario", fecha)
         self.assertTrue(exito, "No se pudo agregar el ingreso")
 
         # Verificar que se agregó
@@ -103,6 +106,22 @@ class TestIngresos(unittest.TestCase):
         )
         self.assertTrue(ingreso_agregado, "El ingreso no se encuentra en la BD")
 
+    def test_agregar_ingresos_lote(self):
+        """Test: Agregar varios ingresos de una vez informando las filas inválidas."""
+        total_antes = self.db.obtener_total_ingresos_mes(self.mes_prueba, self.anio_prueba)
+        ingresos = [
+            ("Lote 1", 100.0, "Salario", "2026-01-05"),
+            ("Lote 2", 50.0, "Freelance", "2026-01-06"),
+            ("Lote mal", 50.0, "Freelance", "06/01/2026"),
+        ]
+
+        resultado = self.db.agregar_ingresos_lote(ingresos)
+
+        self.assertEqual(resultado['insertados'], 2)
+        self.assertEqual([indice for indice, _ in resultado['errores']], [2])
+        total_despues = self.db.obtener_total_ingresos_mes(self.mes_prueba, self.anio_prueba)
+        self.assertAlmostEqual(total_despues - total_antes, 150.0)
+
     def test_comparacion_ingresos_vs_gastos(self):
         """Test: Comparar ingresos vs gastos."""
         balance = self.db.obtener_balance_mes(self.mes_prueba, self.anio_prueba)
@@ -122,6 +141,11 @@ class TestIngresos(unittest.TestCase):
         else:
             self.assertEqual(balance['balance'], 0, "Balance neutro esperado")
 
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+        self.db.almacenamiento.eliminar_usuario(993)
+
 
 def suite():
     """Crear suite de tests."""
@@ -0,0 +1,131 @@
+"""
+Tests unitarios para la instrumentación de Database.
+
+Comprueba que desactivada no cambia nada y que activada mide métodos,
+sentencias, filas, conexiones y planes de las consultas lentas.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.conexiones import ConexionPersistente
+from src.instrumentacion import Histograma, Instrumentacion, ConexionInstrumentada
+
+
+class TestHistograma(unittest.TestCase):
+    """Tests para Histograma."""
+
+    def test_cubetas_y_percentiles(self):
+        """Test: Cada latencia cae en su cubeta y los percentiles las acotan."""
+        histograma = Histograma()
+        for ms in [0.05] * 90 + [7.0] * 9 + [2000.0]:
+            histograma.registrar(ms)
+
+        datos = histograma.a_dict()
+        self.assertEqual(datos['veces'], 100)
+        self.assertEqual(datos['cubetas']['<=0.1'], 90)
+        self.assertEqual(datos['cubetas']['<=10'], 9)
+        self.assertEqual(datos['cubetas']['>1000'], 1)
+        self.assertEqual(datos['p50_ms'], 0.1)
+        self.assertEqual(datos['p95_ms'], 10)
+        self.assertEqual(datos['max_ms'], 2000.0)
+
+
+class TestInstrumentacionDatabase(unittest.TestCase):
+    """Tests para la instrumentación integrada en Database."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=988)
+        self.categoria_id = self.db.obtener_categorias()[0][0]
+
+    def test_desactivada_por_defecto(self):
+        """Test: Sin activarla las conexiones y los métodos son los normales."""
+        self.assertIsNone(self.db.instrumentacion)
+        self.assertIs(type(self.db.get_connection()), ConexionPersistente)
+        self.assertNotIn('obtener_total_mes', vars(self.db))
+
+    def test_mide_metodos_y_sentencias(self):
+        """Test: Se cuentan llamadas, sentencias, filas y conexiones."""
+        instrumentacion = self.db.activar_instrumentacion()
+        self.assertIsInstance(self.db.get_connection(), ConexionInstrumentada)
+
+        self.db.agregar_gastos_lote([("Gasto", 5.0, self.categoria_id, "2026-03-01")] * 12)
+        for _ in range(3):
+            self.db.obtener_gastos_mes(3, 2026)
+        filas_iteradas = sum(1 for _ in self.db.iterar_gastos_anio(2026))
+
+        informe = instrumentacion.informe()
+        self.assertEqual(informe['metodos']['Database.obtener_gastos_mes']['veces'], 3)
+        self.assertNotIn('Database.get_connection', informe['metodos'])
+
+        inserciones = [datos for sql, datos in informe['sql'].items()
+                       if sql.startswith("INSERT INTO gastos")]
+        self.assertEqual(inserciones[0]['filas'], 12)
+
+        consulta_mes = [datos for sql, datos in informe['sql'].items()
+                        if "WHERE g.mes = ? AND g.anio = ?" in sql]
+        self.assertEqual(consulta_mes[0]['veces'], 3)
+        self.assertEqual(consulta_mes[0]['filas'], 36)
+        self.assertEqual(filas_iteradas, 12)
+
+        self.assertEqual(informe['conexiones'], {'usuario_988_finanzas.db': 1})
+
+    def test_plan_de_sentencias_lentas(self):
+        """Test: Las sentencias sobre el umbral guardan su EXPLAIN QUERY PLAN."""
+        self.db.activar_instrumentacion(Instrumentacion(umbral_lenta_ms=0))
+        self.db.obtener_gastos_mes(3, 2026)
+
+        lentas = [lenta for lenta in self.db.instrumentacion.informe()['lentas']
+                  if "FROM gastos g" in lenta['sql']]
+        self.assertTrue(lentas)
+        self.assertTrue(any('idx_gastos_anio_mes_fecha' in paso for paso in lentas[0]['plan']))
+
+    def test_volcar_y_desactivar(self):
+        """Test: El informe se vuelca a JSON y desactivar deja todo como estaba."""
+        instrumentacion = self.db.activar_instrumentacion()
+        self.db.obtener_total_mes(3, 2026)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "informe.json")
+            instrumentacion.volcar(ruta)
+            with open(ruta, encoding='utf-8') as fichero:
+                volcado = json.load(fichero)
+        self.assertIn('Database.obtener_total_mes', volcado['metodos'])
+
+        self.db.desactivar_instrumentacion()
+        self.db.obtener_total_mes(4, 2026)
+
+        self.assertNotIn('obtener_total_mes', vars(self.db))
+        self.assertIs(type(self.db.get_connection()), ConexionPersistente)
+        self.assertEqual(instrumentacion.informe()['metodos']['Database.obtener_total_mes']['veces'], 1)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+
+        self.db.almacenamiento.eliminar_usuario(988)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestHistograma))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestInstrumentacionDatabase))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
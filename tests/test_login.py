@@ -11,6 +11,9 @@ import os
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
 from src.database import Database
 
 
@@ -60,6 +63,28 @@ class TestLogin(unittest.TestCase):
         self.assertFalse(exito)
         self.assertIn("ya está registrado", mensaje.lower())
 
+    def test_registrar_usuarios_lote(self):
+        """Test: Registrar varios usuarios de una vez, cada uno con su BD."""
+        emails = [f"lote{i}@finanzapp.com" for i in range(3)]
+        usuarios = [(f"Lote {i}", email, "lote123") for i, email in enumerate(emails)]
+        usuarios.append(("Repetido", emails[0], "lote123"))
+        usuarios.append(("", "vacio@finanzapp.com", "lote123"))
+
+        resultado = self.db.registrar_usuarios_lote(usuarios, tamano_lote=2)
+
+        self.assertEqual(len(resultado['registrados']), 3)
+        self.assertEqual([indice for indice, _ in resultado['errores']], [3, 4])
+        self.assertIn("ya está registrado", resultado['errores'][0][1])
+
+        for usuario_id in resultado['registrados']:
+            self.assertTrue(os.path.exists(self.db.almacenamiento.ruta_usuario(usuario_id)))
+            with Database(usuario_id=usuario_id) as db_usuario:
+                self.assertTrue(db_usuario.obtener_categorias())
+        self.assertIsNotNone(self.db.autenticar_usuario(emails[2], "lote123"))
+
+        for usuario_id in resultado['registrados']:
+            self.db.eliminar_usuario_admin(usuario_id)
+
     def test_autenticar_usuario_existente(self):
         """Test: Autenticar usuario existente correctamente."""
         # Crear usuario si no existe
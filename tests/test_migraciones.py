@@ -0,0 +1,152 @@
+"""
+Tests unitarios para el motor de migraciones versionadas.
+
+Verifica que las BDs nuevas y antiguas llegan a la última versión y que una
+BD al día no vuelve a ejecutar ningún paso.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import shutil
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src import migraciones
+
+
+class TestMigraciones(unittest.TestCase):
+    """Tests para las migraciones de esquema."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.directorio = tempfile.mkdtemp()
+        self.ruta = os.path.join(self.directorio, "finanzas.db")
+        self.conn = sqlite3.connect(self.ruta)
+
+    def test_bd_nueva_llega_a_ultima_version(self):
+        """Test: Una BD vacía queda en la última versión con tablas y categorías."""
+        version = migraciones.migrar_finanzas(self.conn)
+
+        self.assertEqual(version, migraciones.MIGRACIONES_FINANZAS[-1][0])
+        self.assertEqual(migraciones.version_actual(self.conn), version)
+
+        cursor = self.conn.execute("SELECT COUNT(*) FROM categorias")
+        self.assertEqual(cursor.fetchone()[0], len(migraciones.CATEGORIAS_POR_DEFECTO))
+
+    def test_bd_antigua_se_actualiza(self):
+        """Test: Una BD previa al sistema de versiones (sin metodo_pago) se migra."""
+        self.conn.execute('''
+            CREATE TABLE categorias (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nombre TEXT UNIQUE NOT NULL,
+                descripcion TEXT
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE gastos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                descripcion TEXT NOT NULL,
+                cantidad REAL NOT NULL,
+                categoria_id INTEGER NOT NULL,
+                fecha DATE NOT NULL,
+                mes INTEGER NOT NULL,
+                anio INTEGER NOT NULL
+            )
+        ''')
+        self.conn.execute("INSERT INTO categorias (nombre) VALUES ('Alimentación')")
+        self.conn.execute(
+            "INSERT INTO gastos (descripcion, cantidad, categoria_id, fecha, mes, anio) "
+            "VALUES ('Pan', 1.5, 1, '2026-01-02', 1, 2026)"
+        )
+        self.conn.commit()
+
+        migraciones.migrar_finanzas(self.conn)
+
+        columnas = [col[1] for col in self.conn.execute("PRAGMA table_info(gastos)")]
+        self.assertIn('metodo_pago', columnas)
+
+        cursor = self.conn.execute("SELECT metodo_pago FROM gastos")
+        self.assertEqual(cursor.fetchone()[0], 'tarjeta')
+
+        indices = {fila[0] for fila in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+        for nombre in migraciones.INDICES_FINANZAS:
+            self.assertIn(nombre, indices)
+
+    def test_pasos_de_indices_fijos(self):
+        """Test: La migración 4 crea sus índices originales y la 6 los sustituye."""
+        def indices():
+            return {fila[0] for fila in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+            )}
+
+        migraciones.aplicar_migraciones(self.conn, migraciones.MIGRACIONES_FINANZAS[:4])
+        self.assertEqual(indices(), {'idx_gastos_anio_mes_fecha', 'idx_gastos_categoria_anio',
+                                     'idx_ingresos_anio_mes_fecha'})
+
+        migraciones.migrar_finanzas(self.conn)
+        self.assertEqual(indices(), set(migraciones.INDICES_FINANZAS))
+
+    def test_bd_al_dia_no_repite_pasos(self):
+        """Test: Con el esquema al día no se vuelve a ejecutar ningún paso."""
+        migraciones.migrar_finanzas(self.conn)
+
+        # Si se repitieran los pasos, volvería a aparecer la categoría borrada
+        self.conn.execute("DELETE FROM categorias WHERE nombre = 'Otros'")
+        self.conn.commit()
+
+        migraciones.migrar_finanzas(self.conn)
+
+        cursor = self.conn.execute("SELECT COUNT(*) FROM categorias WHERE nombre = 'Otros'")
+        self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_paso_fallido_no_deja_migracion_a_medias(self):
+        """Test: Si un paso falla, la versión y los cambios previos se revierten."""
+        def paso_roto(cursor):
+            raise RuntimeError("fallo simulado")
+
+        lista = migraciones.MIGRACIONES_FINANZAS + [(99, "Paso roto", paso_roto)]
+
+        with self.assertRaises(RuntimeError):
+            migraciones.aplicar_migraciones(self.conn, lista)
+
+        self.assertEqual(migraciones.version_actual(self.conn), 0)
+        cursor = self.conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'gastos'"
+        )
+        self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_usuarios(self):
+        """Test: La BD de usuarios llega a la última versión."""
+        version = migraciones.migrar_usuarios(self.conn)
+
+        self.assertEqual(version, migraciones.MIGRACIONES_USUARIOS[-1][0])
+        columnas = [col[1] for col in self.conn.execute("PRAGMA table_info(usuarios)")]
+        for columna in ('rol', 'activo', 'ultimo_acceso'):
+            self.assertIn(columna, columnas)
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.conn.close()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestMigraciones))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
@@ -0,0 +1,196 @@
+"""
+Tests de regresión de los planes de consulta.
+
+Ejecuta cada forma de consulta registrada en REGISTRO contra una BD con
+varios años de datos, captura el EXPLAIN QUERY PLAN de todas sus sentencias
+(con la instrumentación de Database) y falla si alguna recorre entera la
+tabla gastos o ingresos en lugar de buscar por un índice.
+"""
+
+import unittest
+import sys
+import os
+import re
+import shutil
+import tempfile
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+from src.instrumentacion import Instrumentacion
+from benchmarks.generador import GeneradorDatos
+
+
+# Tablas grandes que nunca deben recorrerse enteras sin motivo
+TABLAS_VIGILADAS = ('gastos', 'ingresos')
+
+# Formas de consulta: (método, argumentos, tablas que sí puede recorrer)
+REGISTRO = [
+    ('obtener_gastos_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_mes_pagina', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_mes_pagina', {'mes': 3, 'anio': 2026, 'despues': ('2026-03-15', 10**9)}, ()),
+    ('obtener_gastos_mes_pagina', {'mes': 3, 'anio': 2026, 'antes': ('2026-03-15', 0)}, ()),
+    ('iterar_gastos_anio', {'anio': 2026}, ()),
+    ('obtener_total_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_por_categoria_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_comparacion_anual', {'anio': 2026}, ()),
+    ('obtener_total_anual', {'anio': 2026}, ()),
+    ('obtener_categorias', {}, ()),
+    ('obtener_uso_categorias', {}, ()),
+    ('obtener_gasto_por_id', {'gasto_id': 1}, ()),
+    ('obtener_gastos_por_metodo_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_por_metodo_anual', {'anio': 2026}, ()),
+    ('obtener_gastos_por_categoria_y_metodo', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_por_categoria_y_metodo', {'anio': 2026}, ()),
+    ('obtener_gastos_por_categoria_y_metodo', {}, ()),
+    ('obtener_ingresos_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_total_ingresos_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_total_ingresos_anual', {'anio': 2026}, ()),
+    ('obtener_ingresos_por_fuente_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_comparacion_ingresos_anual', {'anio': 2026}, ()),
+    ('obtener_ingreso_por_id', {'ingreso_id': 1}, ()),
+    ('obtener_balance_mes', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_balance_anual', {'anio': 2026}, ()),
+    ('obtener_resumen_anual', {'anio': 2026}, ()),
+    ('obtener_gastos_detallados_categoria', {'categoria_nombre': 'Hogar', 'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_detallados_categoria', {'categoria_nombre': 'Hogar', 'anio': 2026}, ()),
+    ('obtener_gastos_detallados_categoria_pagina', {'categoria_nombre': 'Hogar', 'anio': 2026}, ()),
+    ('obtener_gastos_detallados_categoria_pagina',
+     {'categoria_nombre': 'Hogar', 'anio': 2026, 'despues': (6, '2026-06-15', 10**9)}, ()),
+    ('obtener_gastos_como_objetos', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_gastos_como_objetos', {'anio': 2026}, ()),
+    # Sin filtros devuelve todos los gastos: recorrerlos es lo esperado
+    ('obtener_gastos_como_objetos', {}, ('gastos',)),
+    ('obtener_categorias_como_objetos', {}, ()),
+    ('obtener_ingresos_como_objetos', {'mes': 3, 'anio': 2026}, ()),
+    ('obtener_ingresos_como_objetos', {'anio': 2026}, ()),
+    ('obtener_ingresos_como_objetos', {}, ('ingresos',)),
+    ('eliminar_categoria', {'categoria_id': 1}, ()),
+]
+
+# Métodos obtener_* que no leen gastos ni ingresos
+SIN_MOVIMIENTOS = {
+    'obtener_perfil', 'obtener_version_esquema', 'obtener_usuario', 'obtener_todos_usuarios',
+    'obtener_estadisticas_admin', 'obtener_usuario_como_objeto',
+    'obtener_todos_usuarios_como_objetos', 'obtener_usuarios_pagina', 'obtener_analitica_usuarios',
+}
+
+# Nombre y alias de cada tabla en FROM / JOIN
+_TABLAS_SQL = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_PALABRAS_CLAVE = {'where', 'join', 'left', 'inner', 'on', 'group', 'order', 'limit', 'union', 'using'}
+
+# "SCAN g", "SCAN gastos USING COVERING INDEX ..." o "SCAN TABLE gastos AS g"
+_ESCANEO = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?')
+
+
+def tablas_escaneadas(sql: str, plan) -> set:
+    """
+    Obtiene las tablas vigiladas que un plan recorre enteras.
+
+    Args:
+        sql: Sentencia explicada
+        plan: Líneas de su EXPLAIN QUERY PLAN
+
+    Returns:
+        Conjunto de nombres de tabla de TABLAS_VIGILADAS
+    """
+    alias = {}
+    for tabla, nombre in _TABLAS_SQL.findall(sql):
+        tabla = tabla.lower()
+        alias[tabla] = tabla
+        if nombre and nombre.lower() not in _PALABRAS_CLAVE:
+            alias[nombre.lower()] = tabla
+
+    escaneadas = set()
+    for paso in plan or ():
+        coincidencia = _ESCANEO.match(paso)
+        if coincidencia:
+            nombre = (coincidencia.group(2) or coincidencia.group(1)).lower()
+            tabla = alias.get(nombre, nombre)
+            if tabla in TABLAS_VIGILADAS:
+                escaneadas.add(tabla)
+    return escaneadas
+
+
+class TestPlanesConsulta(unittest.TestCase):
+    """Comprueba que las consultas usan índices sobre gastos e ingresos."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Crea una BD con tres años de datos, una vez para todos los tests."""
+        cls.directorio = tempfile.mkdtemp(prefix="test_planes_")
+        cls.generador = GeneradorDatos(cls.directorio, anio_final=2026, anios=3, semilla=3)
+        cls.usuario_id = cls.generador.crear_usuarios(1)[0]
+        cls.generador.poblar(cls.usuario_id, 5000)
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = self.generador.abrir(self.usuario_id)
+
+    def planes(self, metodo: str, argumentos: dict):
+        """Ejecuta un método y devuelve [(sql, plan)] de todas sus sentencias."""
+        instrumentacion = self.db.activar_instrumentacion(Instrumentacion(umbral_lenta_ms=0))
+        self.db.cache.vaciar()
+
+        resultado = getattr(self.db, metodo)(**argumentos)
+        if metodo.startswith('iterar_'):
+            list(resultado)
+
+        self.db.desactivar_instrumentacion()
+        return [(lenta['sql'], lenta['plan']) for lenta in instrumentacion.informe()['lentas']]
+
+    def test_sin_escaneos_completos(self):
+        """Test: Ninguna forma registrada recorre gastos o ingresos enteras."""
+        for metodo, argumentos, permitidas in REGISTRO:
+            with self.subTest(metodo=metodo, argumentos=argumentos):
+                sentencias = self.planes(metodo, argumentos)
+                self.assertTrue(sentencias, "El método no ejecutó ninguna sentencia")
+
+                for sql, plan in sentencias:
+                    self.assertIsNotNone(plan, f"No se pudo explicar: {sql}")
+                    escaneadas = tablas_escaneadas(sql, plan) - set(permitidas)
+                    self.assertFalse(
+                        escaneadas,
+                        f"{metodo} recorre {sorted(escaneadas)} entera:\n{sql}\n" + "\n".join(plan)
+                    )
+
+    def test_todos_los_metodos_registrados(self):
+        """Test: Cada método obtener_* de Database tiene su forma registrada."""
+        registrados = {metodo for metodo, _, _ in REGISTRO}
+        metodos = {nombre for nombre in dir(Database) if nombre.startswith('obtener_')}
+
+        self.assertEqual(metodos - registrados - SIN_MOVIMIENTOS, set())
+
+    def test_detecta_escaneo(self):
+        """Test: El analizador reconoce un escaneo con alias y uno por índice."""
+        sql = "SELECT * FROM gastos g JOIN categorias c ON g.categoria_id = c.id"
+        self.assertEqual(tablas_escaneadas(sql, ["SCAN g", "SEARCH c USING INTEGER PRIMARY KEY (rowid=?)"]),
+                         {'gastos'})
+        self.assertEqual(tablas_escaneadas(sql, ["SEARCH g USING INDEX idx (anio=?)", "SCAN c"]),
+                         set())
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Borra la BD generada."""
+        shutil.rmtree(cls.directorio, ignore_errors=True)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPlanesConsulta))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
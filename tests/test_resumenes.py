@@ -0,0 +1,155 @@
+"""
+Tests unitarios para las tablas de resumen mensual.
+
+Verifica que los triggers mantienen resumen_gastos y resumen_ingresos iguales
+a los agregados calculados sobre los movimientos.
+"""
+
+import unittest
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.database import Database
+
+
+class TestResumenes(unittest.TestCase):
+    """Tests para los resúmenes mensuales mantenidos por triggers."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.db = Database(usuario_id=996)
+        categorias = self.db.obtener_categorias()
+        self.cat1 = categorias[0][0]
+        self.cat2 = categorias[1][0]
+
+    def assertResumenCoincide(self):
+        """Compara las tablas de resumen con los agregados sobre los movimientos."""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT anio, mes, categoria_id, IFNULL(metodo_pago, ''), ROUND(SUM(cantidad), 6), COUNT(*)
+            FROM gastos GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4
+        ''')
+        esperado = cursor.fetchall()
+        cursor.execute('''
+            SELECT anio, mes, categoria_id, metodo_pago, ROUND(total, 6), cantidad
+            FROM resumen_gastos ORDER BY 1, 2, 3, 4
+        ''')
+        self.assertEqual(cursor.fetchall(), esperado)
+
+        cursor.execute('''
+            SELECT anio, mes, fuente, ROUND(SUM(cantidad), 6), COUNT(*)
+            FROM ingresos GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ''')
+        esperado = cursor.fetchall()
+        cursor.execute('''
+            SELECT anio, mes, fuente, ROUND(total, 6), cantidad
+            FROM resumen_ingresos ORDER BY 1, 2, 3
+        ''')
+        self.assertEqual(cursor.fetchall(), esperado)
+
+    def test_insertar(self):
+        """Test: Los INSERT se acumulan en el resumen."""
+        self.db.agregar_gasto("A", 10.0, self.cat1, "2026-03-01", "efectivo")
+        self.db.agregar_gasto("B", 5.5, self.cat1, "2026-03-02", "efectivo")
+        self.db.agregar_gasto("C", 7.0, self.cat2, "2026-03-03", "tarjeta")
+        self.db.agregar_ingreso("Sueldo", 1000.0, "Salario", "2026-03-01")
+
+        self.assertResumenCoincide()
+        self.assertAlmostEqual(self.db.obtener_total_mes(3, 2026), 22.5)
+        self.assertEqual(self.db.obtener_gastos_por_metodo_mes(3, 2026),
+                         {'efectivo': 15.5, 'tarjeta': 7.0})
+        self.assertAlmostEqual(self.db.obtener_total_ingresos_mes(3, 2026), 1000.0)
+
+    def test_actualizar_mueve_entre_grupos(self):
+        """Test: Un UPDATE que cambia mes, categoría o método mueve el importe."""
+        self.db.agregar_gasto("A", 10.0, self.cat1, "2026-03-01", "efectivo")
+        gasto_id = self.db.obtener_gastos_mes(3, 2026)[0][0]
+
+        self.db.actualizar_gasto(gasto_id, "A", 12.0, self.cat2, "2026-04-15", "tarjeta")
+
+        self.assertResumenCoincide()
+        self.assertEqual(self.db.obtener_total_mes(3, 2026), 0.0)
+        self.assertAlmostEqual(self.db.obtener_total_mes(4, 2026), 12.0)
+
+        self.db.agregar_ingreso("Extra", 50.0, "Freelance", "2026-03-10")
+        ingreso_id = self.db.obtener_ingresos_mes(3, 2026)[0][0]
+        self.db.actualizar_ingreso(ingreso_id, "Extra", 60.0, "Venta", "2026-05-10")
+
+        self.assertResumenCoincide()
+        self.assertEqual(self.db.obtener_ingresos_por_fuente_mes(5, 2026), [("Venta", 60.0)])
+
+    def test_eliminar_vacia_grupo(self):
+        """Test: Al borrar el último movimiento de un grupo, el grupo desaparece."""
+        self.db.agregar_gasto("A", 0.1, self.cat1, "2026-06-01", "efectivo")
+        self.db.agregar_gasto("B", 0.2, self.cat1, "2026-06-02", "efectivo")
+        for gasto in self.db.obtener_gastos_mes(6, 2026):
+            self.db.eliminar_gasto(gasto[0])
+
+        self.assertResumenCoincide()
+        self.assertEqual(self.db.obtener_comparacion_anual(2026), [])
+
+    def test_estadisticas_anuales(self):
+        """Test: Comparación anual y desglose por categoría leen del resumen."""
+        self.db.agregar_gasto("Enero", 100.0, self.cat1, "2026-01-10")
+        self.db.agregar_gasto("Febrero", 50.0, self.cat2, "2026-02-10")
+        self.db.agregar_gasto("Febrero 2", 25.0, self.cat2, "2026-02-11")
+
+        self.assertEqual(self.db.obtener_comparacion_anual(2026), [(1, 100.0), (2, 75.0)])
+        self.assertAlmostEqual(self.db.obtener_total_anual(2026), 175.0)
+
+        por_categoria = dict(self.db.obtener_gastos_por_categoria_mes(2, 2026))
+        nombre_cat2 = [c[1] for c in self.db.obtener_categorias() if c[0] == self.cat2][0]
+        self.assertEqual(por_categoria, {nombre_cat2: 75.0})
+
+    def test_resumen_anual(self):
+        """Test: El resumen anual coincide con las consultas individuales."""
+        self.db.agregar_gasto("A", 100.0, self.cat1, "2026-01-10", "efectivo")
+        self.db.agregar_gasto("B", 50.0, self.cat2, "2026-02-10", "tarjeta")
+        self.db.agregar_gasto("C", 25.0, self.cat2, "2026-02-11", "efectivo")
+        self.db.agregar_gasto("Otro año", 9.0, self.cat1, "2025-02-11")
+        self.db.agregar_ingreso("Sueldo", 1000.0, "Salario", "2026-02-01")
+
+        resumen = self.db.obtener_resumen_anual(2026)
+
+        for mes in range(1, 13):
+            self.assertEqual(resumen['meses'][mes], self.db.obtener_balance_mes(mes, 2026))
+        self.assertEqual(self.db.obtener_balance_anual(2026),
+                         {'ingresos': 1000.0, 'gastos': 175.0, 'balance': 825.0})
+        self.assertEqual(resumen['metodos'], self.db.obtener_gastos_por_metodo_anual(2026))
+        self.assertEqual(resumen['fuentes'], {'Salario': 1000.0})
+
+        nombres = {c[0]: c[1] for c in self.db.obtener_categorias()}
+        self.assertEqual(resumen['categorias'], [
+            {'categoria': nombres[self.cat1], 'total': 100.0, 'cantidad': 1},
+            {'categoria': nombres[self.cat2], 'total': 75.0, 'cantidad': 2},
+        ])
+        self.assertEqual(resumen['categorias_mes'][2],
+                         [{'categoria': nombres[self.cat2], 'total': 75.0, 'cantidad': 2}])
+        self.assertEqual(resumen['categorias_mes'][3], [])
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.db.close()
+
+        self.db.almacenamiento.eliminar_usuario(996)
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestResumenes))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
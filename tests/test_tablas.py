@@ -0,0 +1,267 @@
+"""
+Tests unitarios para la actualización incremental de Treeviews.
+
+Usa un Treeview simulado que registra cada llamada, de modo que los tests
+no necesitan pantalla y pueden contar cuánto trabajo hace cada recarga.
+"""
+
+import contextlib
+import io
+import random
+import sqlite3
+import unittest
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.tablas import TablaSincronizada, ListaPaginada
+
+
+class TreeviewSimulado:
+    """Sustituto mínimo de ttk.Treeview con la misma semántica de índices."""
+
+    def __init__(self):
+        self.hijos = []
+        self.items = {}
+        self.seleccion = ()
+        self.llamadas = []
+        self.desplazamiento = 0
+
+    def insert(self, padre, indice, iid, values=(), tags=()):
+        self.llamadas.append('insert')
+        self.hijos.insert(indice, iid)
+        self.items[iid] = {'values': tuple(values), 'tags': tuple(tags)}
+
+    def delete(self, *iids):
+        self.llamadas.append('delete')
+        for iid in iids:
+            self.hijos.remove(iid)
+            del self.items[iid]
+        self.seleccion = tuple(i for i in self.seleccion if i not in iids)
+
+    def item(self, iid, values=(), tags=()):
+        self.llamadas.append('item')
+        self.items[iid] = {'values': tuple(values), 'tags': tuple(tags)}
+
+    def move(self, iid, padre, indice):
+        # Como en Tk: el índice se cuenta con el elemento aún en la lista
+        self.llamadas.append('move')
+        anterior = self.hijos[indice - 1] if indice > 0 else None
+        if anterior == iid:
+            anterior = self.hijos[indice - 2] if indice > 1 else None
+        self.hijos.remove(iid)
+        posicion = self.hijos.index(anterior) + 1 if anterior is not None else 0
+        self.hijos.insert(posicion, iid)
+
+    def get_children(self):
+        return tuple(self.hijos)
+
+    def configure(self, **opciones):
+        pass
+
+    def yview_moveto(self, fraccion):
+        self.desplazamiento = 0
+
+    def yview_scroll(self, cantidad, unidad):
+        self.desplazamiento += cantidad
+
+    def valores(self):
+        return [self.items[iid]['values'] for iid in self.hijos]
+
+
+class TestTablaSincronizada(unittest.TestCase):
+    """Tests para TablaSincronizada."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.tree = TreeviewSimulado()
+        self.tabla = TablaSincronizada(self.tree)
+        self.filas = [(i, (i, f"Gasto {i}", f"{i:.2f}")) for i in range(1, 1001)]
+        self.tabla.actualizar(self.filas)
+        self.tree.llamadas.clear()
+
+    def assertMuestra(self, filas):
+        self.assertEqual(self.tree.get_children(), tuple(str(f[0]) for f in filas))
+        self.assertEqual(self.tree.valores(), [tuple(f[1]) for f in filas])
+
+    def test_carga_inicial(self):
+        """Test: La primera carga inserta todas las filas en orden."""
+        self.assertMuestra(self.filas)
+
+    def test_sin_cambios_no_toca_el_tree(self):
+        """Test: Recargar los mismos datos no hace ninguna llamada a Tk."""
+        resumen = self.tabla.actualizar(self.filas)
+
+        self.assertEqual(self.tree.llamadas, [])
+        self.assertEqual(sum(resumen.values()), 0)
+
+    def test_editar_una_fila(self):
+        """Test: Editar una fila solo actualiza esa fila y conserva la selección."""
+        self.tree.seleccion = ('500',)
+        self.filas[499] = (500, (500, "Editado", "1.00"))
+
+        self.tabla.actualizar(self.filas)
+
+        self.assertEqual(self.tree.llamadas, ['item'])
+        self.assertEqual(self.tree.seleccion, ('500',))
+        self.assertMuestra(self.filas)
+
+    def test_insertar_y_eliminar(self):
+        """Test: Altas y bajas en medio no mueven el resto de filas."""
+        del self.filas[10]
+        self.filas.insert(300, (5000, (5000, "Nuevo", "9.99")))
+
+        resumen = self.tabla.actualizar(self.filas)
+
+        self.assertEqual(resumen, {'insertadas': 1, 'actualizadas': 0, 'eliminadas': 1, 'movidas': 0})
+        self.assertMuestra(self.filas)
+
+    def test_reordenar(self):
+        """Test: Un cambio de orden deja el tree en el orden nuevo."""
+        self.filas.reverse()
+        self.tabla.actualizar(self.filas)
+        self.assertMuestra(self.filas)
+
+        # Una fila que cambia de fecha sube al principio con un solo movimiento
+        fila = self.filas.pop(700)
+        self.filas.insert(0, fila)
+        resumen = self.tabla.actualizar(self.filas)
+
+        self.assertEqual(resumen['movidas'], 1)
+        self.assertMuestra(self.filas)
+
+    def test_cambios_aleatorios(self):
+        """Test: Mezclar, insertar y borrar a la vez deja siempre el orden pedido."""
+        aleatorio = random.Random(7)
+        self.tabla.actualizar(self.filas)
+        siguiente = len(self.filas) + 1
+
+        for _ in range(20):
+            filas = aleatorio.sample(self.filas, k=len(self.filas) - 50)
+            for _ in range(50):
+                filas.insert(aleatorio.randrange(len(filas) + 1), (siguiente, (siguiente,)))
+                siguiente += 1
+
+            self.tabla.actualizar(filas)
+            self.assertMuestra(filas)
+            self.filas = filas
+
+    def test_etiquetas(self):
+        """Test: Cambiar solo las etiquetas también actualiza la fila."""
+        tabla = TablaSincronizada(TreeviewSimulado())
+        tabla.actualizar([(1, ("Enero",), ('positivo',))])
+        resumen = tabla.actualizar([(1, ("Enero",), ('negativo',))])
+
+        self.assertEqual(resumen['actualizadas'], 1)
+        self.assertEqual(tabla.tree.items['1']['tags'], ('negativo',))
+
+    def test_vaciar(self):
+        """Test: vaciar() quita todas las filas de una sola llamada."""
+        self.tabla.vaciar()
+
+        self.assertEqual(self.tree.get_children(), ())
+        self.assertEqual(self.tree.llamadas, ['delete'])
+
+
+class TestListaPaginada(unittest.TestCase):
+    """Tests para ListaPaginada."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        # 1000 filas ordenadas de mayor a menor por su clave
+        self.datos = list(range(1000, 0, -1))
+        self.consultas = 0
+        self.tree = TreeviewSimulado()
+        self.lista = ListaPaginada(
+            self.tree, self.consultar,
+            formatear=lambda n: (n, (n,)),
+            clave=lambda n: (n,),
+            tamano_pagina=50, max_paginas=3
+        )
+        self.lista.cargar()
+
+    def consultar(self, limite, despues=None, antes=None):
+        """Imita _consultar_pagina sobre una lista en memoria."""
+        self.consultas += 1
+        if despues is not None:
+            return [n for n in self.datos if n < despues[0]][:limite]
+        if antes is not None:
+            return [n for n in self.datos if n > antes[0]][-limite:]
+        return self.datos[:limite]
+
+    def test_primera_pagina(self):
+        """Test: Al cargar solo se pide y se pinta una página."""
+        self.assertEqual(self.consultas, 1)
+        self.assertEqual(self.lista.filas, self.datos[:50])
+        self.assertEqual(len(self.tree.get_children()), 50)
+        self.assertTrue(self.lista.hay_mas)
+
+    def test_la_ventana_no_crece(self):
+        """Test: Bajar hasta el final mantiene como mucho max_paginas páginas."""
+        while self.lista.hay_mas:
+            self.lista._al_desplazar(0.5, 1.0)
+            self.assertLessEqual(len(self.tree.get_children()), 150)
+
+        self.assertEqual(self.lista.filas, self.datos[-150:])
+        self.assertEqual(self.lista.inicio, (self.datos[-151],))
+        # Cada página quitada por arriba se compensa en el scroll
+        self.assertEqual(self.tree.desplazamiento, -(1000 - 150))
+
+    def test_volver_hacia_arriba(self):
+        """Test: Subir recupera las páginas anteriores hasta el principio."""
+        while self.lista.hay_mas:
+            self.lista._al_desplazar(0.5, 1.0)
+        while self.lista.inicio is not None:
+            self.lista._al_desplazar(0.0, 0.5)
+            self.assertLessEqual(len(self.tree.get_children()), 150)
+
+        self.assertEqual(self.lista.filas, self.datos[:150])
+        self.assertTrue(self.lista.hay_mas)
+
+    def test_recargar_conserva_la_ventana(self):
+        """Test: Recargar relee la ventana actual con los datos nuevos."""
+        for _ in range(4):
+            self.lista._al_desplazar(0.5, 1.0)
+        ventana = list(self.lista.filas)
+
+        self.datos.remove(ventana[10])
+        self.lista.recargar()
+
+        self.assertEqual(self.lista.filas[0], ventana[0])
+        self.assertNotIn(ventana[10], self.lista.filas)
+        self.assertEqual(len(self.lista.filas), len(ventana))
+
+    def test_fallo_no_bloquea_la_paginacion(self):
+        """Test: Tras una consulta fallida se pueden seguir pidiendo páginas."""
+        consultar = self.lista.consultar
+
+        def fallar(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        self.lista.consultar = fallar
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.lista._al_desplazar(0.5, 1.0)
+        self.assertEqual(self.lista.filas, self.datos[:50])
+
+        self.lista.consultar = consultar
+        self.lista._al_desplazar(0.5, 1.0)
+        self.assertEqual(self.lista.filas, self.datos[:100])
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestTablaSincronizada))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestListaPaginada))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())
@@ -0,0 +1,155 @@
+"""
+Tests unitarios para el ejecutor de consultas en segundo plano.
+
+Usa un widget simulado cuyo after() guarda las llamadas, de modo que los
+tests no necesitan pantalla ni bucle de Tk.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Las BDs de los tests van a un directorio temporal, nunca a data/
+from tests import entorno  # noqa: F401
+
+from src.tareas import EjecutorTareas, EjecutorSincrono
+
+
+class WidgetSimulado:
+    """Sustituto mínimo de un widget Tk."""
+
+    def __init__(self):
+        self.programadas = []
+        self.cursor = ''
+
+    def after(self, ms, funcion):
+        self.programadas.append(funcion)
+
+    def config(self, cursor=''):
+        self.cursor = cursor
+
+    def bucle(self, limite: float = 2.0):
+        """Ejecuta las llamadas programadas hasta que no quede ninguna."""
+        fin = time.time() + limite
+        while self.programadas and time.time() < fin:
+            funcion = self.programadas.pop(0)
+            funcion()
+            time.sleep(0.005)
+
+
+class TestTareas(unittest.TestCase):
+    """Tests para EjecutorTareas."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba antes de cada test."""
+        self.widget = WidgetSimulado()
+        self.ejecutor = EjecutorTareas(self.widget)
+
+    def test_resultado_en_hilo_principal(self):
+        """Test: La consulta corre en otro hilo y el callback en el principal."""
+        hilos = {}
+        resultados = []
+
+        def consulta():
+            hilos['consulta'] = threading.get_ident()
+            return 42
+
+        def al_terminar(valor):
+            hilos['callback'] = threading.get_ident()
+            resultados.append(valor)
+
+        self.ejecutor.ejecutar('clave', consulta, al_terminar)
+        self.widget.bucle()
+
+        self.assertEqual(resultados, [42])
+        self.assertNotEqual(hilos['consulta'], threading.get_ident())
+        self.assertEqual(hilos['callback'], threading.get_ident())
+        self.assertFalse(self.ejecutor.hay_pendientes())
+
+    def test_peticion_obsoleta_se_descarta(self):
+        """Test: Con la misma clave solo se entrega el último resultado."""
+        liberar = threading.Event()
+        resultados = []
+
+        def lenta():
+            liberar.wait(1)
+            return 'antigua'
+
+        self.ejecutor.ejecutar('anio', lenta, resultados.append)
+        self.ejecutor.ejecutar('anio', lambda: 'nueva', resultados.append)
+        liberar.set()
+        self.widget.bucle()
+
+        self.assertEqual(resultados, ['nueva'])
+
+    def test_claves_distintas_no_se_pisan(self):
+        """Test: Peticiones con claves distintas se entregan todas."""
+        resultados = []
+        self.ejecutor.ejecutar('a', lambda: 1, resultados.append)
+        self.ejecutor.ejecutar('b', lambda: 2, resultados.append)
+        self.widget.bucle()
+
+        self.assertEqual(sorted(resultados), [1, 2])
+
+    def test_error_va_a_al_fallar(self):
+        """Test: Las excepciones de la consulta llegan a al_fallar."""
+        errores = []
+
+        def rota():
+            raise RuntimeError("fallo")
+
+        self.ejecutor.ejecutar('clave', rota, lambda r: None, al_fallar=errores.append)
+        self.widget.bucle()
+
+        self.assertEqual(len(errores), 1)
+        self.assertIsInstance(errores[0], RuntimeError)
+
+    def test_cursor_de_espera(self):
+        """Test: El widget ocupado muestra el cursor de espera hasta terminar."""
+        liberar = threading.Event()
+        self.ejecutor.ejecutar('clave', lambda: liberar.wait(1), lambda r: None,
+                               ocupado=self.widget)
+        self.assertEqual(self.widget.cursor, 'watch')
+
+        liberar.set()
+        self.widget.bucle()
+        self.assertEqual(self.widget.cursor, '')
+
+    def test_cancelar(self):
+        """Test: Una petición cancelada no entrega resultado."""
+        liberar = threading.Event()
+        resultados = []
+        self.ejecutor.ejecutar('clave', lambda: liberar.wait(1), resultados.append)
+        self.ejecutor.cancelar('clave')
+        liberar.set()
+        self.widget.bucle()
+
+        self.assertEqual(resultados, [])
+
+    def test_ejecutor_sincrono(self):
+        """Test: El ejecutor síncrono llama al callback inmediatamente."""
+        resultados = []
+        EjecutorSincrono().ejecutar('clave', lambda: 7, resultados.append)
+        self.assertEqual(resultados, [7])
+
+    def tearDown(self):
+        """Limpiar después de cada test."""
+        self.ejecutor.cerrar()
+
+
+def suite():
+    """Crear suite de tests."""
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(loader.loadTestsFromTestCase(TestTareas))
+    return test_suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite())